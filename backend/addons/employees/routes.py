@@ -9,7 +9,7 @@ from .models import (
     EmploymentType, EmploymentTypeCreate, EmploymentTypeRead,
 )
 from app.models.user import UserRole, User, UserStatus
-from app.core import security
+from app.core import security, auth_cache
 import shutil
 import os
 import time
@@ -194,7 +194,7 @@ def create_employee(
         new_user = User(
             username=emp_in.username,
             email=emp_in.work_email if emp_in.work_email else None,
-            hashed_password=security.get_password_hash(emp_in.user_password),
+            hashed_password=security.get_password_hash_limited(emp_in.user_password),
             full_name=f"{emp_in.first_name} {emp_in.last_name or ''}".strip(),
             role=emp_in.user_role or UserRole.INTERNAL_USER,
             role_id=emp_in.role_id,
@@ -330,7 +330,7 @@ def update_employee(
         if user:
             # Update Password
             if emp_in.user_password:
-                user.hashed_password = security.get_password_hash(emp_in.user_password)
+                user.hashed_password = security.get_password_hash_limited(emp_in.user_password)
             
             # Update System Role
             if emp_in.user_role:
@@ -347,5 +347,7 @@ def update_employee(
 
     session.add(emp)
     session.commit()
+    if emp.user_id:
+        auth_cache.invalidate_user(emp.user_id)
     session.refresh(emp)
     return emp
@@ -1,11 +1,12 @@
 from typing import Generator, Annotated
-from fastapi import Depends, HTTPException, status
+import httpx
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
-from app.core import security
+from app.core import security, http_client, auth_cache
 from app.core.config import settings
 from app.database import get_session
 from app.models.user import User, UserRole
@@ -15,19 +16,40 @@ reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login/ac
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 SessionDep = Annotated[Session, Depends(get_session)]
 
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """Shared outbound HTTP client owned by the app lifespan."""
+    client = getattr(request.app.state, "http_client", None)
+    if client is None or client.is_closed:
+        client = http_client.get_http_client()
+    return client
+
+HttpClientDep = Annotated[httpx.AsyncClient, Depends(get_http_client)]
+
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
-        token_data = payload.get("sub")
-    except (InvalidTokenError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate credentials",
-        )
-    user = session.get(User, int(token_data))
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
+    """
+    The user of the bearer token. Repeated calls with the same token are answered from
+    auth_cache without decoding or a DB lookup; the returned User then only carries
+    id, role, status and company_id (load it from the session for anything else).
+    """
+    cache_key = auth_cache.token_key(token)
+    principal = auth_cache.get(cache_key)
+    if principal is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+            token_data = payload.get("sub")
+        except (InvalidTokenError, ValidationError):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Could not validate credentials",
+            )
+        user = session.get(User, int(token_data))
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = {"id": user.id, "role": user.role, "status": user.status, "company_id": user.company_id}
+        auth_cache.put(cache_key, principal, token_expires_at=payload.get("exp"))
+    else:
+        user = User(**principal)
+
     from app.models.user import UserStatus
     if user.status != UserStatus.ACTIVE:
         detail_msg = "Inactive user"
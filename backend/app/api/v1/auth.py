@@ -2,10 +2,11 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from app.api.deps import SessionDep
+from app.api.deps import SessionDep, CurrentUser
 from app.core import security
+from app.core.password_pool import PasswordPoolBusy, get_password_pool
 from app.core.config import settings
-from app.models.user import User, UserRead, LoginHistory
+from app.models.user import User, UserRead, LoginHistory, UserRole
 
 router = APIRouter()
 
@@ -21,7 +22,14 @@ def login_access_token(
     statement = select(User).where(or_(User.username == form_data.username, User.email == form_data.username))
     user = session.exec(statement).first()
     
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    try:
+        # Bounded: a login burst can't tie up every threadpool thread hashing
+        valid = security.verify_password_limited(form_data.password, user.hashed_password)
+    except PasswordPoolBusy:
+        raise HTTPException(status_code=503, detail="Too many logins at once. Try again shortly.", headers={"Retry-After": "2"})
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     
     from app.models.user import UserStatus
@@ -49,3 +57,10 @@ def login_access_token(
         ),
         "token_type": "bearer",
     }
+
+@router.get("/password-pool")
+def password_pool_stats(current_user: CurrentUser) -> Any:
+    """Queue depth and wait/run times of the password hashing limiter."""
+    if current_user.role != UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return get_password_pool().stats()
@@ -5,6 +5,7 @@ from app.api.deps import SessionDep, CurrentUser
 from app.models.company import Company, CompanyCreate, CompanyRead, CompanyUpdate
 from app.models.user import UserRole
 from app.models.org_structure import Branch
+from app.core import auth_cache
 
 router = APIRouter()
 
@@ -116,7 +117,10 @@ def delete_company(
         for user in users:
             user.company_id = None
             session.add(user)
+        user_ids = [user.id for user in users]
         session.commit()
+        for user_id in user_ids:
+            auth_cache.invalidate_user(user_id)
 
         # 1. Break Employee Self-Referential Links (reporting_manager_id)
         print("Step 1: Break Reporting Lines")
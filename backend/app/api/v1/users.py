@@ -2,7 +2,7 @@ from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import select, func
 from app.api.deps import SessionDep, CurrentUser
-from app.core import security
+from app.core import security, auth_cache
 from app.models.user import (
     User,
     UserCreate,
@@ -73,7 +73,7 @@ def create_user(
         )
     
     user_obj = User.model_validate(
-        user_in, update={"hashed_password": security.get_password_hash(user_in.password)}
+        user_in, update={"hashed_password": security.get_password_hash_limited(user_in.password)}
     )
     # Sanitize email: Convert empty string to None to allow multiple users without email (SQLite unique constraint)
     if user_obj.email == "":
@@ -128,11 +128,12 @@ def read_users(
     return users
 
 @router.get("/me", response_model=UserRead)
-def read_user_me(current_user: CurrentUser) -> Any:
+def read_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
     """
     Get current user.
     """
-    return current_user
+    # current_user may come from the principal cache (id, role, status, company_id only)
+    return session.get(User, current_user.id)
 
 @router.patch("/{user_id}", response_model=UserRead)
 def update_user(
@@ -179,11 +180,12 @@ def update_user(
 
     if user_in.password:
         password = user_data.pop("password")
-        user_db.hashed_password = security.get_password_hash(password)
+        user_db.hashed_password = security.get_password_hash_limited(password)
         
     user_db.sqlmodel_update(user_data)
     session.add(user_db)
     session.commit()
+    auth_cache.invalidate_user(user_db.id)
     session.refresh(user_db)
     return user_db
 
@@ -215,6 +217,7 @@ def delete_user(
 
     session.delete(user)
     session.commit()
+    auth_cache.invalidate_user(user_id)
     return {"ok": True}
 
 @router.get("/{user_id}/history", response_model=list[LoginHistory])
@@ -0,0 +1,58 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.core.config import settings
+
+# In-process cache of authenticated principals, keyed by a hash of the bearer token.
+# deps.get_current_user uses it to skip the JWT decode and the User lookup on repeated calls
+# with the same token. Entries live AUTH_PRINCIPAL_CACHE_SECONDS at most (never past the
+# token's own expiry) and are dropped by invalidate_user() when users.py changes or deletes
+# the user. Other processes pick up such changes after the TTL.
+_lock = threading.Lock()
+# token hash -> (expires_at, principal), least recently used first
+_entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    """The cached principal ({id, role, status, company_id}), or None."""
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+        return entry[1]
+
+
+def put(key: str, principal: Dict[str, Any], token_expires_at: Optional[float] = None):
+    ttl = settings.AUTH_PRINCIPAL_CACHE_SECONDS
+    if ttl <= 0:
+        return
+    expires_at = time.time() + ttl
+    if token_expires_at is not None:
+        expires_at = min(expires_at, token_expires_at)
+    with _lock:
+        _entries[key] = (expires_at, principal)
+        _entries.move_to_end(key)
+        while len(_entries) > settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def invalidate_user(user_id: int):
+    """Drops every cached token of a user (after a role, status, company or password change)."""
+    with _lock:
+        for key in [k for k, (_, p) in _entries.items() if p["id"] == user_id]:
+            del _entries[key]
+
+
+def clear():
+    with _lock:
+        _entries.clear()
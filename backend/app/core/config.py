@@ -10,6 +10,26 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./sql_app.db"
     
+    # Shared outbound HTTP client pool (app/core/http_client.py)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = True  # Needs the 'h2' package, falls back to HTTP/1.1 without it
+
+    # Image processing worker pool (app/core/image_pool.py)
+    IMAGE_POOL_WORKERS: int = 0  # 0 = one per CPU core
+    IMAGE_POOL_MAX_PENDING: int = 0  # Jobs queued or running before callers wait; 0 = 4 per worker
+    IMAGE_POOL_JOB_TIMEOUT: float = 120.0
+    IMAGE_MAX_PIXELS: int = 60_000_000  # Decoded size limit per image (after JPEG draft scaling)
+
+    # Argon2 hashing/verification limit (app/core/password_pool.py)
+    PASSWORD_POOL_WORKERS: int = 2  # Hashes running at once (each uses the Argon2 memory cost)
+    PASSWORD_POOL_MAX_WAITING: int = 16  # Logins queued beyond this get a 503 (each holds a threadpool thread); 0 = no limit
+
+    # Authenticated principal cache (app/core/auth_cache.py); 0 disables it
+    AUTH_PRINCIPAL_CACHE_SECONDS: int = 30
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
     # First Super Admin (Seeding)
     FIRST_SUPER_ADMIN_EMAIL: str = "admin@example.com"
     FIRST_SUPER_ADMIN_PASSWORD: str = "admin123"
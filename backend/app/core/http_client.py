@@ -0,0 +1,64 @@
+import http.cookiejar
+from typing import Optional
+import httpx
+from app.core.config import settings
+
+# Application-lifetime HTTP client pool.
+# Created by the FastAPI lifespan (app/main.py) and shared by every outbound call
+# (Monday GraphQL, asset downloads, image proxy) so connections and TLS sessions are reused.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_http_client() -> httpx.AsyncClient:
+    http2 = settings.HTTP2_ENABLED and _http2_available()
+    if settings.HTTP2_ENABLED and not http2:
+        print("[HTTP] HTTP/2 requested but 'h2' is not installed. Using HTTP/1.1 keep-alive.", flush=True)
+
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=httpx.Timeout(60.0, connect=10.0),
+        http2=http2,
+        # The client is shared by every company: a cookie set by one tenant's Monday
+        # response must not be sent with another's requests, so the jar stores nothing.
+        cookies=http.cookiejar.CookieJar(policy=http.cookiejar.DefaultCookiePolicy(allowed_domains=[])),
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """Creates the shared client (called on startup)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client():
+    """Closes the shared client (called on shutdown)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared client. Creates it lazily for code running outside
+    the FastAPI lifespan (scripts, standalone workers).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
@@ -0,0 +1,217 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+# Process pool for CPU-bound image work (resize / WebP encode / rotate).
+# Pillow holds the GIL for much of that work, so threads top out near one core;
+# worker processes scale with the core count. Shared by Monday sync, /proxy and the
+# rotate endpoints. Created lazily, shut down by the FastAPI lifespan (app/main.py).
+#
+# The worker functions below run in child processes: keep them top-level (picklable)
+# and this module free of import side effects ("spawn" children import it).
+
+
+# --- Worker functions (run in the pool) ---
+
+def _timed(fn: Callable, *args) -> tuple:
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+class ImageTooLarge(ValueError):
+    """The decoded image would exceed settings.IMAGE_MAX_PIXELS."""
+
+
+def _open_bounded(input_path: str, target_width: int):
+    """
+    Opens an image for downscaling to target_width without decoding more than needed.
+    JPEGs are decoded at a reduced DCT scale (draft), other formats are shrunk by an integer
+    factor (reduce) before the final resample. Raises ImageTooLarge above IMAGE_MAX_PIXELS.
+    Returns (image, original_width, original_height).
+    """
+    from PIL import Image
+    img = Image.open(input_path)
+    width, height = img.size
+    if img.format == "JPEG" and target_width < width:
+        # Picks the largest 1/2, 1/4, 1/8 scale that is still at least the requested size
+        img.draft("RGB", (target_width, max(1, int(height * target_width / width))))
+    if img.size[0] * img.size[1] > settings.IMAGE_MAX_PIXELS:
+        img.close()
+        raise ImageTooLarge(f"{input_path}: {img.size[0]}x{img.size[1]} exceeds {settings.IMAGE_MAX_PIXELS} pixels")
+    img.load()
+    factor = img.width // (target_width * 2)
+    if factor >= 2:
+        reduced = img.reduce(factor)
+        img.close()
+        img = reduced
+    return img, width, height
+
+
+def build_thumbnails(input_path: str, outputs: List[tuple]) -> Dict[str, Any]:
+    """
+    Decodes input_path once and writes one downscaled copy per output.
+    outputs: [(width, format, quality, output_path, always)]. Widths not below the source width
+    are skipped unless `always` is set (then the image is only re-encoded, never upscaled).
+    Returns {"width", "height", "written": {output_path: size_bytes}}. A failing output
+    (e.g. AVIF without encoder support) is skipped, not fatal.
+    """
+    from PIL import Image
+    written = {}
+    with Image.open(input_path) as probe:
+        width, height = probe.size
+    todo = [o for o in outputs if o[0] < width or o[4]]
+    if not todo:
+        return {"width": width, "height": height, "written": written}
+
+    img, width, height = _open_bounded(input_path, max(o[0] for o in todo))
+    with img:
+        for target_w, fmt, quality, output_path, always in sorted(todo, key=lambda o: -o[0]):
+            try:
+                out = img
+                if img.width > target_w:
+                    out = img.resize((target_w, max(1, int(height * target_w / width))), Image.Resampling.LANCZOS)
+                out.save(output_path, fmt.upper(), quality=quality)
+                written[output_path] = os.path.getsize(output_path)
+            except Exception as e:
+                print(f"[IMAGE_POOL] Could not write {fmt} {target_w}px for {input_path}: {e}", flush=True)
+    return {"width": width, "height": height, "written": written}
+
+
+def resize_to_webp_file(input_path: str, output_path: str, max_width: int = 400, quality: int = 75) -> int:
+    """Downscales to max_width (keeps aspect, never upscales) and writes WebP. Returns the output size."""
+    from PIL import Image
+    img, width, height = _open_bounded(input_path, max_width)
+    with img:
+        if img.width > max_width:
+            img = img.resize((max_width, max(1, int(height * max_width / width))), Image.Resampling.LANCZOS)
+        img.save(output_path, "WEBP", quality=quality)
+    return os.path.getsize(output_path)
+
+
+def rotate_image(path: str, angle: float, output_path: Optional[str] = None) -> Optional[bytes]:
+    """
+    Rotates by `angle` degrees counter-clockwise (Pillow convention), keeping the format.
+    Saves to output_path when given (may equal path), otherwise returns the encoded bytes.
+    """
+    from PIL import Image
+    with Image.open(path) as img:
+        fmt = img.format or "PNG"
+        rotated = img.rotate(angle, expand=True)
+    if output_path:
+        rotated.save(output_path, format=fmt)
+        return None
+    out = io.BytesIO()
+    rotated.save(out, format=fmt)
+    return out.getvalue()
+
+
+# --- Pool ---
+
+class ImagePool:
+    """
+    ProcessPoolExecutor with bounded admission and per-job timing.
+    At most `max_pending` jobs are queued or running; further callers wait, which
+    gives producers (e.g. a sync downloading thousands of images) natural backpressure.
+    """
+
+    def __init__(self, workers: int, max_pending: int, job_timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.job_timeout = job_timeout
+        self._executor = self._create_executor()
+        # asyncio primitives bind to one event loop; scripts may run several loops
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0,
+                       "in_flight": 0, "run_ms_total": 0.0, "wait_ms_total": 0.0, "run_ms_max": 0.0}
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # "spawn": never fork a process that holds an event loop, threads and DB connections
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _slots_for_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.max_pending)
+        return slots
+
+    async def run(self, fn: Callable, *args, label: str = "") -> Any:
+        """Runs fn(*args) in a worker process. Raises the worker's exception, or TimeoutError."""
+        loop = asyncio.get_running_loop()
+        queued_at = time.perf_counter()
+        self._stats["submitted"] += 1
+        async with self._slots_for_loop():
+            wait_ms = (time.perf_counter() - queued_at) * 1000
+            self._stats["in_flight"] += 1
+            try:
+                future = loop.run_in_executor(self._executor, _timed, fn, *args)
+                # On timeout the worker still finishes its job; only the caller stops waiting
+                result, run_ms = await asyncio.wait_for(future, self.job_timeout)
+            except asyncio.TimeoutError:
+                self._stats["timed_out"] += 1
+                self._stats["failed"] += 1
+                print(f"[IMAGE_POOL] {fn.__name__} {label} timed out after {self.job_timeout}s", flush=True)
+                raise
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM on a huge image). Replace the pool so later jobs still run.
+                self._stats["failed"] += 1
+                print(f"[IMAGE_POOL] Worker pool broke during {fn.__name__} {label}. Restarting it.", flush=True)
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor()
+                raise
+            except Exception:
+                self._stats["failed"] += 1
+                raise
+            finally:
+                self._stats["in_flight"] -= 1
+
+        self._stats["completed"] += 1
+        self._stats["run_ms_total"] += run_ms
+        self._stats["wait_ms_total"] += wait_ms
+        self._stats["run_ms_max"] = max(self._stats["run_ms_max"], run_ms)
+        if run_ms > 5000:
+            print(f"[IMAGE_POOL] Slow job {fn.__name__} {label}: {run_ms:.0f} ms (waited {wait_ms:.0f} ms)", flush=True)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        completed = self._stats["completed"] or 1
+        return {
+            **self._stats,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "run_ms_avg": round(self._stats["run_ms_total"] / completed, 1),
+            "wait_ms_avg": round(self._stats["wait_ms_total"] / completed, 1),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool: Optional[ImagePool] = None
+
+
+def get_image_pool() -> ImagePool:
+    """Returns the shared pool, creating it on first use (worker processes start on demand)."""
+    global _pool
+    if _pool is None:
+        workers = settings.IMAGE_POOL_WORKERS or os.cpu_count() or 1
+        max_pending = settings.IMAGE_POOL_MAX_PENDING or workers * 4
+        _pool = ImagePool(workers, max_pending, settings.IMAGE_POOL_JOB_TIMEOUT)
+    return _pool
+
+
+def shutdown_image_pool():
+    """Stops the worker processes (called on shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+    _pool = None
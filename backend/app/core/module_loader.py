@@ -2,6 +2,7 @@ import logging
 import os
 import sys
 import importlib
+import inspect
 import json
 from fastapi import FastAPI
 from sqlmodel import Session, select
@@ -20,6 +21,9 @@ logger.addHandler(fh)
 
 ADDONS_PATHS = ["backend/addons", "backend/custom_addons"]
 
+# Imported addon packages, in load order (for the startup/shutdown hooks)
+LOADED_MODULES = []
+
 def load_addons(app: FastAPI):
     """
     Scans addons directories, seeds database, and mounts routers.
@@ -132,6 +136,7 @@ def register_module(app: FastAPI, relative_addons_path: str, module_name: str, m
     try:
         # Import the module (runs __init__.py)
         mod = importlib.import_module(full_module_name)
+        LOADED_MODULES.append(mod)
         
         # Look for router in routes.py specifically? Or exposed in __init__?
         # Let's check routes submodule
@@ -157,3 +162,22 @@ def register_module(app: FastAPI, relative_addons_path: str, module_name: str, m
     except Exception as e:
         logger.error(f"Could not import module {full_module_name}: {e}")
         print(f"ERROR IMPORTING {full_module_name}: {e}")
+
+async def run_addon_hooks(app: FastAPI, hook: str):
+    """
+    Calls `hook` ("on_startup" / "on_shutdown") on every loaded addon package that defines it.
+    Hooks take the app and may be async. Shutdown runs in reverse load order.
+    A failing hook is logged and does not stop the others.
+    """
+    modules = reversed(LOADED_MODULES) if hook == "on_shutdown" else LOADED_MODULES
+    for mod in list(modules):
+        fn = getattr(mod, hook, None)
+        if not callable(fn):
+            continue
+        try:
+            result = fn(app)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"{hook} failed for {mod.__name__}: {e}")
+            print(f"ERROR IN {hook} OF {mod.__name__}: {e}")
@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+# Concurrency limit for Argon2 password hashing / verification (app/core/security.py).
+# Argon2 is deliberately slow and memory-hard. The routes that use it are sync, so FastAPI
+# runs them on its threadpool, the same threads every other sync route needs. A login burst
+# would otherwise hash on all of them at once. Here at most PASSWORD_POOL_WORKERS hashes run
+# at a time, and logins beyond PASSWORD_POOL_MAX_WAITING queued ones are refused
+# (PasswordPoolBusy -> 503), which caps the threads logins can hold. argon2-cffi releases
+# the GIL while hashing, so the running hashes don't stall the event loop either.
+
+
+class PasswordPoolBusy(RuntimeError):
+    """More than PASSWORD_POOL_MAX_WAITING callers are already waiting."""
+
+
+class PasswordPool:
+    def __init__(self, workers: int, max_waiting: int):
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()  # Guards _stats (callers are threadpool threads)
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0,
+                       "waiting": 0, "waiting_max": 0, "in_flight": 0,
+                       "run_ms_total": 0.0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+    def run(self, fn: Callable, *args, reject_when_busy: bool = True) -> Any:
+        """
+        Runs fn(*args) in the calling thread once a slot is free. Raises PasswordPoolBusy if the
+        queue is full and reject_when_busy is set (logins); admin actions just wait their turn.
+        """
+        with self._lock:
+            if reject_when_busy and self.max_waiting and self._stats["waiting"] >= self.max_waiting:
+                self._stats["rejected"] += 1
+                raise PasswordPoolBusy(f"{self._stats['waiting']} password checks already waiting")
+            self._stats["submitted"] += 1
+            self._stats["waiting"] += 1
+            self._stats["waiting_max"] = max(self._stats["waiting_max"], self._stats["waiting"])
+        queued_at = time.perf_counter()
+        try:
+            self._slots.acquire()
+        finally:
+            with self._lock:
+                self._stats["waiting"] -= 1
+        started = time.perf_counter()
+        wait_ms = (started - queued_at) * 1000
+        with self._lock:
+            self._stats["in_flight"] += 1
+        try:
+            result = fn(*args)
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            self._slots.release()
+            with self._lock:
+                self._stats["in_flight"] -= 1
+
+        run_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats["completed"] += 1
+            self._stats["run_ms_total"] += run_ms
+            self._stats["wait_ms_total"] += wait_ms
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+            waiting = self._stats["waiting"]
+        if wait_ms > 1000:
+            print(f"[PASSWORD_POOL] {fn.__name__} waited {wait_ms:.0f} ms ({waiting} still waiting)", flush=True)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        completed = stats["completed"] or 1
+        return {
+            **stats,
+            "workers": self.workers,
+            "max_waiting": self.max_waiting,
+            "run_ms_avg": round(stats["run_ms_total"] / completed, 1),
+            "wait_ms_avg": round(stats["wait_ms_total"] / completed, 1),
+        }
+
+
+_pool: Optional[PasswordPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_password_pool() -> PasswordPool:
+    """Returns the shared limiter, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordPool(max(1, settings.PASSWORD_POOL_WORKERS), settings.PASSWORD_POOL_MAX_WAITING)
+    return _pool
@@ -23,3 +23,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+# Variants for request handlers: at most PASSWORD_POOL_WORKERS Argon2 runs at once (password_pool.py)
+
+def verify_password_limited(plain_password: str, hashed_password: str) -> bool:
+    """Raises PasswordPoolBusy when too many checks are already waiting."""
+    from app.core.password_pool import get_password_pool
+    return get_password_pool().run(verify_password, plain_password, hashed_password)
+
+def get_password_hash_limited(password: str) -> str:
+    from app.core.password_pool import get_password_pool
+    return get_password_pool().run(get_password_hash, password, reject_when_busy=False)
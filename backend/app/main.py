@@ -12,7 +12,8 @@ from app.models.company import Company
 from app.models.org_structure import Branch, Designation, JobRole
 from app.models.marketplace import MarketplaceApp
 from app.core.security import get_password_hash
-from app.core.module_loader import load_addons
+from app.core.module_loader import load_addons, run_addon_hooks
+from app.core import http_client, image_pool
 
 # Seeding Logic
 def init_db():
@@ -54,9 +55,14 @@ def init_db():
 async def lifespan(app: FastAPI):
     # Startup
     init_db()
+    app.state.http_client = await http_client.init_http_client()
     load_addons(app)
+    await run_addon_hooks(app, "on_startup")
     yield
     # Shutdown
+    await run_addon_hooks(app, "on_shutdown")
+    await http_client.close_http_client()
+    image_pool.shutdown_image_pool()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -99,6 +99,7 @@ async def rotate_image(payload: dict) -> Any:
     from pathlib import Path
     from urllib.parse import unquote
     from PIL import Image, ImageOps
+    from app.core import image_pool
 
     file_path = payload.get("file_path")
     angle = payload.get("angle", 0)
@@ -122,6 +123,10 @@ async def rotate_image(payload: dict) -> Any:
     if not target_path.exists() or not target_path.is_file():
         raise HTTPException(status_code=404, detail="File not found")
 
+    # Content-addressed Monday assets may be shared by many items; rotating in place would change all of them
+    if "monday_files/blobs/" in target_path.as_posix():
+        raise HTTPException(status_code=400, detail="Shared asset: rotate it through the Monday item asset endpoint")
+
     # 3. Identify Sibling Files (Original <-> Optimized)
     # Naming convention:
     # Original:  {name}.{ext}
@@ -152,14 +157,13 @@ async def rotate_image(payload: dict) -> Any:
                 files_to_rotate.add(opt_path)
 
         # 4. Perform Rotation on ALL found files
+        # (decoding/encoding runs in the shared image worker pool; expand avoids cropping)
         rotated_count = 0
+        pool = image_pool.get_image_pool()
         for fpath in files_to_rotate:
             try:
-                with Image.open(fpath) as img:
-                    # Expand ensures true rotation without cropping
-                    rotated = img.rotate(angle, expand=True)
-                    rotated.save(fpath)
-                    rotated_count += 1
+                await pool.run(image_pool.rotate_image, str(fpath), angle, str(fpath), label=fpath.name)
+                rotated_count += 1
             except Exception as e:
                 print(f"Failed to rotate alias {fpath}: {e}")
                 # We continue trying others even if one fails
@@ -4,3 +4,47 @@ from .migrate import migrate_monday_schema
 
 # Auto-migrate schema on load
 migrate_monday_schema()
+
+# Jobs whose worker lease expired (e.g. cut off by a restart) go back in the queue and resume
+# from their checkpoint. Jobs leased by live workers in other processes are left alone.
+try:
+    from sqlmodel import Session
+    from app.database import engine
+    from .services import MondayService
+    with Session(engine) as _session:
+        _recovered = MondayService(api_key="").recover_interrupted_jobs(_session)
+        if _recovered:
+            print(f"--- Monday Connector: recovered {_recovered} interrupted sync job(s) ---")
+except Exception as e:
+    print(f"Sync job recovery failed: {e}")
+
+# Items synced before the column index existed: build it once
+try:
+    from sqlmodel import Session
+    from app.database import engine
+    from .services import MondayService
+    with Session(engine) as _session:
+        _indexed = MondayService(api_key="").backfill_column_index(_session)
+        if _indexed:
+            print(f"--- Monday Connector: indexed column values for {_indexed} item(s) ---")
+except Exception as e:
+    print(f"Column index backfill failed: {e}")
+
+
+# Lifespan hooks (called by app.core.module_loader.run_addon_hooks)
+async def on_startup(app):
+    from .scheduler import start_scheduler
+    from .webhooks import start_consumer
+    from .writeback import start_flusher
+    start_scheduler()
+    start_consumer()
+    start_flusher()
+
+
+async def on_shutdown(app):
+    from .scheduler import stop_scheduler
+    from .webhooks import stop_consumer
+    from .writeback import stop_flusher
+    await stop_flusher()
+    await stop_consumer()
+    await stop_scheduler()
@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Content-addressed storage for Monday assets.
+# Files live at {BLOB_DIR}/{sha[:2]}/{key}; the key is "{sha256}{ext}" for originals and
+# "{sha256}.{variant}.webp" for images derived from that original, so identical
+# content is stored (and optimized) once no matter how many items reference it.
+# Which items use a blob is tracked in MondayAssetRef; MondayAssetBlob.ref_count drives cleanup.
+BLOB_DIR = Path("assets/monday_files/blobs")
+
+_key_locks: Dict[str, List] = {}  # key -> [asyncio.Lock, waiters]
+
+
+@asynccontextmanager
+async def key_lock(key: str):
+    """Serializes work on one blob key, so concurrent assets with the same content derive it once."""
+    entry = _key_locks.get(key)
+    if entry is None:
+        entry = _key_locks[key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            _key_locks.pop(key, None)
+
+
+def blob_path(key: str) -> Path:
+    return BLOB_DIR / key[:2] / key
+
+
+def web_path(key: str) -> str:
+    return "/" + blob_path(key).as_posix()
+
+
+def key_from_web_path(path: Optional[str]) -> Optional[str]:
+    """Returns the blob key for a web path inside the blob store, else None (legacy per-item files)."""
+    if not path:
+        return None
+    prefix = "/" + BLOB_DIR.as_posix() + "/"
+    if not path.startswith(prefix):
+        return None
+    return path.rsplit("/", 1)[-1]
+
+
+def original_key(sha256: str, ext: str) -> str:
+    ext = (ext or "").lower()
+    if ext and not ext.startswith("."):
+        ext = "." + ext
+    # Keep keys filesystem/URL safe
+    if not ext[1:].isalnum() or len(ext) > 10:
+        ext = ""
+    return f"{sha256}{ext}"
+
+
+def variant_key(source_key: str, variant: str, fmt: str = "webp") -> str:
+    """
+    Key of an image derived from `source_key` (e.g. variant 'w800' -> '<sha>.w800.webp').
+    Derived keys keep the sha of the original, so a variant of a variant names the same family.
+    """
+    return f"{source_key.split('.', 1)[0]}.{variant}.{fmt}"
+
+
+def exists(key: str) -> bool:
+    return blob_path(key).exists()
+
+
+def _write_atomic(path: Path, content: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(content)
+    # Atomic on POSIX and Windows: concurrent writers of the same content just race to the same bytes
+    os.replace(tmp, path)
+
+
+def put_bytes(content: bytes, ext: str) -> Tuple[str, bool]:
+    """
+    Stores `content` under its SHA-256. Blocking - run in an executor.
+    Returns (key, created) where created is False if the blob already existed.
+    """
+    key = original_key(hashlib.sha256(content).hexdigest(), ext)
+    path = blob_path(key)
+    if path.exists():
+        return key, False
+    _write_atomic(path, content)
+    return key, True
+
+
+def put_variant(key: str, content: bytes):
+    """Stores a derived image under a precomputed variant key. Blocking."""
+    _write_atomic(blob_path(key), content)
+
+
+def size(key: str) -> int:
+    try:
+        return blob_path(key).stat().st_size
+    except OSError:
+        return 0
+
+
+def delete(key: str) -> int:
+    """Removes a blob file. Returns the bytes freed."""
+    path = blob_path(key)
+    try:
+        freed = path.stat().st_size
+        path.unlink()
+        return freed
+    except OSError:
+        return 0
@@ -0,0 +1,33 @@
+import asyncio
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Set
+
+# In-process wake-ups for job progress streams (GET /sync/jobs/{job_id}/events).
+# The job runner calls notify() after each write; streams waiting on that job re-read it
+# right away instead of at their next poll. Jobs run by another process (standalone
+# worker) are still picked up by the stream's periodic re-read.
+POLL_SECONDS = 2.0
+KEEPALIVE_SECONDS = 15.0
+
+_waiters: Dict[uuid.UUID, Set[asyncio.Event]] = {}
+
+
+def notify(job_id: uuid.UUID):
+    for event in _waiters.get(job_id, ()):
+        event.set()
+
+
+@contextmanager
+def subscribe(job_id: uuid.UUID):
+    """Yields an asyncio.Event that is set whenever the job is written. Clear it before waiting."""
+    event = asyncio.Event()
+    _waiters.setdefault(job_id, set()).add(event)
+    try:
+        yield event
+    finally:
+        waiters = _waiters.get(job_id)
+        if waiters is not None:
+            waiters.discard(event)
+            if not waiters:
+                del _waiters[job_id]
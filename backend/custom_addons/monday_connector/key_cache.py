@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.models.marketplace import InstalledApp
+
+# Per-company cache of the resolved Monday API key (MondayService.resolve_api_key), so the
+# connector endpoints don't look up InstalledApp/MarketplaceApp on every request.
+# Entries are dropped when an InstalledApp row of the company is written through the ORM
+# (settings saved, app installed, deactivated or removed) in this process; writes made by
+# other processes show up after TTL_SECONDS.
+TTL_SECONDS = float(os.getenv("MONDAY_API_KEY_CACHE_SECONDS", "60"))
+
+MISS = object()
+
+_lock = threading.Lock()
+_entries: Dict[Optional[int], Tuple[float, Optional[str]]] = {}  # company_id -> (expires_at, api_key)
+
+
+def get(company_id: Optional[int]):
+    """The cached key (possibly None: no key configured), or MISS."""
+    entry = _entries.get(company_id)
+    if entry is None or entry[0] < time.monotonic():
+        return MISS
+    return entry[1]
+
+
+def put(company_id: Optional[int], api_key: Optional[str]):
+    if TTL_SECONDS <= 0:
+        return
+    with _lock:
+        _entries[company_id] = (time.monotonic() + TTL_SECONDS, api_key)
+
+
+def invalidate(company_id: Optional[int] = None):
+    """Drops one company's entry, or all of them."""
+    with _lock:
+        if company_id is None:
+            _entries.clear()
+        else:
+            _entries.pop(company_id, None)
+
+
+def _on_installed_app_write(mapper, connection, target):
+    # Dropped at flush, so this process stops serving the old key right away, and again
+    # after commit: a request in between could have re-read the old committed row.
+    invalidate(target.company_id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("monday_key_cache_dirty", set()).add(target.company_id)
+
+
+def _after_commit(session):
+    for company_id in session.info.pop("monday_key_cache_dirty", ()):
+        invalidate(company_id)
+
+
+def _after_rollback(session):
+    session.info.pop("monday_key_cache_dirty", None)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(InstalledApp, _event, _on_installed_app_write)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
@@ -1,13 +1,43 @@
-from sqlmodel import Session, text
+from sqlmodel import Session, SQLModel, text
 from app.database import engine
 from sqlalchemy.exc import ProgrammingError, OperationalError
 
+def _ensure_column(session: Session, table: str, column: str, ddl: str):
+    """Adds `column` to `table` with the given DDL type/default if it is missing."""
+    try:
+        session.exec(text(f"SELECT {column} FROM {table} LIMIT 0"))
+    except (ProgrammingError, OperationalError):
+        print(f"Column '{table}.{column}' MISSING. Adding it...")
+        session.rollback()
+        session.exec(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        session.commit()
+        print(f"SUCCESS: Added '{table}.{column}'")
+
+def _ensure_index(session: Session, name: str, table: str, columns: str, unique: bool = False, where: str = None):
+    """Creates an index on an existing table (create_all only indexes tables it creates)."""
+    try:
+        session.exec(text(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+            + (f" WHERE {where}" if where else "")
+        ))
+        session.commit()
+    except (ProgrammingError, OperationalError) as e:
+        session.rollback()
+        print(f"Index '{name}' could not be created: {e}")
+
 def migrate_monday_schema():
     """
     Checks for missing columns in production database and adds them if needed.
     This is a lightweight "migration" strategy for CapRover deployments.
     """
     print("--- Checking Monday Connector Schema ---")
+    # 0. Create connector tables that don't exist yet.
+    # The app creates its tables before addons are imported, so ours are created here.
+    try:
+        SQLModel.metadata.create_all(engine)
+    except Exception as e:
+        print(f"Table Creation Failed: {e}")
+
     with Session(engine) as session:
         try:
             # 1. Check monday_barcode_config for search_column_id
@@ -50,6 +80,36 @@ def migrate_monday_schema():
                 session.exec(text("ALTER TABLE monday_barcode_config ADD COLUMN sort_direction VARCHAR DEFAULT 'asc'"))
                 session.commit()
                 print("SUCCESS: Added 'sort_direction'")
+
+            # 4. Sync job checkpoints (resume interrupted syncs)
+            _ensure_column(session, "monday_sync_job", "started_at", "TIMESTAMP NULL")
+            _ensure_column(session, "monday_sync_job", "checkpoint_cursor", "VARCHAR NULL")
+            _ensure_column(session, "monday_sync_job", "checkpoint_page", "INTEGER DEFAULT 0")
+            _ensure_column(session, "monday_sync_job", "checkpoint_at", "TIMESTAMP NULL")
+
+            # 5. Changes feed reads items by (board_id, updated_at, id)
+            _ensure_index(session, "ix_monday_item_board_updated", "monday_item_v3", "board_id, updated_at, id")
+
+            # 6. Leased sync jobs (multi-worker queue, see worker.py)
+            _ensure_column(session, "monday_sync_job", "company_id", "INTEGER NULL")
+            _ensure_column(session, "monday_sync_job", "lease_owner", "VARCHAR NULL")
+            _ensure_column(session, "monday_sync_job", "lease_expires_at", "TIMESTAMP NULL")
+            _ensure_column(session, "monday_sync_job", "heartbeat_at", "TIMESTAMP NULL")
+            _ensure_column(session, "monday_sync_job", "attempts", "INTEGER DEFAULT 0")
+            _ensure_index(session, "ix_monday_sync_job_company_id", "monday_sync_job", "company_id")
+            _ensure_index(session, "ix_monday_sync_job_status_created", "monday_sync_job", "status, created_at")
+            # The old serial queue never ran two jobs at once, so existing rows satisfy it
+            _ensure_index(session, "ux_monday_sync_job_running_board", "monday_sync_job", "board_id",
+                          unique=True, where="status = 'running'")
+
+            # 7. Per-board sync schedule
+            _ensure_column(session, "monday_board_v3", "sync_interval_minutes", "INTEGER NULL")
+            _ensure_column(session, "monday_board_v3", "next_sync_at", "TIMESTAMP NULL")
+            _ensure_column(session, "monday_board_v3", "sync_backoff_level", "INTEGER DEFAULT 0")
+            _ensure_index(session, "ix_monday_board_v3_next_sync_at", "monday_board_v3", "next_sync_at")
+
+            # 8. Job log ring (monday_sync_job_log is created by create_all)
+            _ensure_column(session, "monday_sync_job", "log_seq", "INTEGER DEFAULT 0")
                 
         except Exception as e:
             print(f"Schema Check Failed: {e}")
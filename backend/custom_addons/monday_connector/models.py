@@ -1,8 +1,8 @@
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict
 from datetime import datetime
 import uuid
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, JSON, BigInteger, ForeignKey
+from sqlalchemy import Column, JSON, BigInteger, ForeignKey, Index, String, text
 
 class MondayBoard(SQLModel, table=True):
     __tablename__ = "monday_board_v3"
@@ -17,6 +17,12 @@ class MondayBoard(SQLModel, table=True):
     last_sync_size_bytes: int = Field(default=0, sa_column=Column(BigInteger()))
     last_sync_optimized_size_bytes: int = Field(default=0, sa_column=Column(BigInteger()))
     last_sync_original_size_bytes: int = Field(default=0, sa_column=Column(BigInteger()))
+
+    # Scheduled sync (scheduler.py). No interval = manual syncs only.
+    # sync_backoff_level doubles the interval for each scheduled sync that found no changes.
+    sync_interval_minutes: Optional[int] = None
+    next_sync_at: Optional[datetime] = Field(default=None, index=True)
+    sync_backoff_level: int = Field(default=0)
     
     # Relationships
     items: List["MondayItem"] = Relationship(back_populates="board")
@@ -34,6 +40,81 @@ class MondayItem(SQLModel, table=True):
     # Relationships
     board: MondayBoard = Relationship(back_populates="items")
 
+    __table_args__ = (
+        Index("ix_monday_item_board_updated", "board_id", "updated_at", "id"),  # Changes feed
+    )
+
+
+class MondayItemTombstone(SQLModel, table=True):
+    """
+    Items removed locally (pruned by sync or cleared), kept for TOMBSTONE_RETENTION_DAYS
+    so the changes feed can tell offline clients what to drop.
+    """
+    __tablename__ = "monday_item_tombstone"
+    __table_args__ = (
+        Index("ix_monday_item_tombstone_board_deleted", "board_id", "deleted_at", "item_id"),
+    )
+    item_id: int = Field(sa_column=Column(BigInteger(), primary_key=True))
+    board_id: int = Field(sa_column=Column(BigInteger(), nullable=False))
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+
+class MondayItemColumnValue(SQLModel, table=True):
+    """
+    One row per (item, column), derived from MondayItem.column_values.
+    Lets search/filter/sort/lookup run on indexes instead of reading the JSON blob.
+    Written only by MondayService (sync upsert and local edits) - never edit directly.
+    """
+    __tablename__ = "monday_item_column_value"
+    __table_args__ = (
+        Index("ix_monday_icv_board_column_text", "board_id", "column_id", "text"),
+        Index("ix_monday_icv_board_column_numeric", "board_id", "column_id", "numeric_value"),
+    )
+    item_id: int = Field(sa_column=Column(BigInteger(), primary_key=True))
+    column_id: str = Field(primary_key=True)
+    board_id: int = Field(sa_column=Column(BigInteger(), nullable=False))
+    text: Optional[str] = None
+    numeric_value: Optional[float] = None
+
+
+class MondayBarcodeIndex(SQLModel, table=True):
+    """
+    Normalized scan codes -> item, for the board's configured barcode and search columns.
+    Backs GET /boards/{board_id}/lookup. Rebuilt by MondayService whenever items or the config change.
+    """
+    __tablename__ = "monday_barcode_index"
+    __table_args__ = (
+        Index("ix_monday_barcode_index_board_code", "board_id", "code"),
+    )
+    item_id: int = Field(sa_column=Column(BigInteger(), primary_key=True))
+    column_id: str = Field(primary_key=True)  # Column the code came from ("name" for the item name)
+    board_id: int = Field(sa_column=Column(BigInteger(), nullable=False))
+    code: str
+
+
+class MondayAssetBlob(SQLModel, table=True):
+    """
+    One stored file in the content-addressed asset store (see blob_store.py).
+    ref_count mirrors the number of MondayAssetRef rows; at 0 the file is deleted.
+    """
+    __tablename__ = "monday_asset_blob"
+    key: str = Field(primary_key=True)  # "{sha256}{ext}" or "{sha256}.{variant}.webp"
+    size_bytes: int = Field(default=0, sa_column=Column(BigInteger(), default=0))
+    ref_count: int = Field(default=0, index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class MondayAssetRef(SQLModel, table=True):
+    """An item's asset pointing at a stored blob, per variant ("original", "optimized", thumbnails like "w400.webp")."""
+    __tablename__ = "monday_asset_ref"
+    item_id: int = Field(sa_column=Column(BigInteger(), primary_key=True))
+    asset_id: str = Field(primary_key=True)
+    variant: str = Field(primary_key=True)
+    board_id: int = Field(sa_column=Column(BigInteger(), nullable=False, index=True))
+    blob_key: str = Field(index=True)
+
 
 class MondayBoardAccess(SQLModel, table=True):
     __tablename__ = "monday_board_access_v3"
@@ -45,6 +126,12 @@ class MondayBoardAccess(SQLModel, table=True):
 
 class MondaySyncJob(SQLModel, table=True):
     __tablename__ = "monday_sync_job"
+    __table_args__ = (
+        # At most one running job per board, enforced by the database so concurrent workers can't both claim one
+        Index("ux_monday_sync_job_running_board", "board_id", unique=True,
+              sqlite_where=text("status = 'running'"), postgresql_where=text("status = 'running'")),
+        Index("ix_monday_sync_job_status_created", "status", "created_at"),  # Claim order
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     board_id: int = Field(sa_column=Column(BigInteger(), index=True))
     status: str = Field(default="pending") # pending, running, complete, failed
@@ -52,9 +139,86 @@ class MondaySyncJob(SQLModel, table=True):
     logs: List[str] = Field(default=[], sa_column=Column(JSON))
     stats: Dict = Field(default={}, sa_column=Column(JSON))
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     created_by: Optional[int] = Field(default=None, foreign_key="user.id")
 
+    # Checkpoint: Monday cursor for the page AFTER the last committed one.
+    # checkpoint_page > 0 with no cursor means every page was committed.
+    checkpoint_cursor: Optional[str] = None
+    checkpoint_page: int = Field(default=0)
+    checkpoint_at: Optional[datetime] = None
+
+    # Lease (worker.py): a running job belongs to lease_owner until lease_expires_at.
+    # The owner heartbeats to extend it; expired leases are recovered by any worker.
+    company_id: Optional[int] = Field(default=None, index=True)  # Whose API key runs the job
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    attempts: int = Field(default=0)
+
+    # Log lines live in MondaySyncJobLog; `logs` only holds those of jobs from before it existed
+    log_seq: int = Field(default=0)  # seq of the last line written
+
+
+class MondaySyncJobLog(SQLModel, table=True):
+    """
+    Sync job log lines, append-only. Only the last JOB_LOG_MAX_LINES of a job are kept
+    (older ones are trimmed as new lines arrive), so a long sync never rewrites a growing row.
+    """
+    __tablename__ = "monday_sync_job_log"
+    job_id: uuid.UUID = Field(foreign_key="monday_sync_job.id", primary_key=True)
+    seq: int = Field(primary_key=True)
+    message: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class MondayWebhookEvent(SQLModel, table=True):
+    """
+    Inbox of webhook events from Monday. Stored as they arrive, applied in batches by
+    webhooks.py; processed_at is set in the same transaction that applies the event.
+    """
+    __tablename__ = "monday_webhook_event"
+    __table_args__ = (
+        Index("ix_monday_webhook_event_pending", "processed_at", "id"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    trigger_uuid: Optional[str] = Field(default=None, sa_column=Column(String(), unique=True))  # Monday's id, for redeliveries
+    event_type: str
+    board_id: int = Field(sa_column=Column(BigInteger(), index=True))
+    item_id: Optional[int] = Field(default=None, sa_column=Column(BigInteger()))
+    payload: Dict = Field(default={}, sa_column=Column(JSON))
+    received_at: datetime = Field(default_factory=datetime.utcnow)
+    processed_at: Optional[datetime] = None
+    attempts: int = Field(default=0)
+    error: Optional[str] = None
+
+
+class MondayPendingWrite(SQLModel, table=True):
+    """
+    Write-behind outbox: a local item edit not pushed to Monday yet, one row per item/column.
+    A newer edit of the same column replaces the value and bumps `version`; writeback.py
+    deletes the row only if the version it pushed is still the latest.
+    """
+    __tablename__ = "monday_pending_write"
+    __table_args__ = (
+        Index("ux_monday_pending_write_item_column", "item_id", "column_id", unique=True),
+        Index("ix_monday_pending_write_due", "status", "next_attempt_at"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    item_id: int = Field(sa_column=Column(BigInteger()))
+    board_id: int = Field(sa_column=Column(BigInteger()))
+    company_id: Optional[int] = Field(default=None, index=True)
+    column_id: str
+    value: Any = Field(default=None, sa_column=Column(JSON))  # As sent to change_multiple_column_values
+    version: int = Field(default=1)
+    status: str = Field(default="pending")  # pending, failed
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
 
 class MondayBarcodeConfig(SQLModel, table=True):
     __tablename__ = "monday_barcode_config"
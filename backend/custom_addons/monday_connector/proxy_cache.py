@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# On-disk LRU cache for /proxy responses, keyed by (account, url, width, optimize).
+# Each entry is {key}.bin (the body) plus {key}.json (content type, ETag, Last-Modified).
+# Kept outside assets/ on purpose: that directory is served publicly, these files may need auth.
+CACHE_DIR = Path(os.getenv("MONDAY_PROXY_CACHE_DIR", "cache/monday_proxy"))
+MAX_BYTES = int(os.getenv("MONDAY_PROXY_CACHE_MAX_MB", "512")) * 1024 * 1024
+MAX_ENTRY_BYTES = int(os.getenv("MONDAY_PROXY_CACHE_MAX_ENTRY_MB", "25")) * 1024 * 1024
+TTL_SECONDS = int(os.getenv("MONDAY_PROXY_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# key -> size in bytes, least recently used first. Loaded from disk on first use.
+_index: Optional["OrderedDict[str, int]"] = None
+_total_bytes = 0
+
+
+def cache_key(url: str, width: Optional[int], optimize: bool, account: str) -> str:
+    """
+    Cache key for a proxied request. S3 pre-signed URLs get a new signature on every Monday
+    fetch, so the X-Amz-* query parameters are not part of the key. `account` (a hash of the
+    Monday API key) scopes entries per tenant: a file one account fetched is never served to
+    another, whose own request might not be allowed to see it.
+    """
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not k.lower().startswith("x-amz-")]
+    normalized = urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ""))
+    return hashlib.sha256(f"{account}|{normalized}|{width or 0}|{int(bool(optimize))}".encode()).hexdigest()
+
+
+def _paths(key: str):
+    return CACHE_DIR / f"{key}.bin", CACHE_DIR / f"{key}.json"
+
+
+def _load_index() -> "OrderedDict[str, int]":
+    global _index, _total_bytes
+    if _index is None:
+        entries = []
+        if CACHE_DIR.exists():
+            for body in CACHE_DIR.glob("*.bin"):
+                try:
+                    st = body.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, body.stem, st.st_size))
+        entries.sort()
+        _index = OrderedDict((key, size) for _, key, size in entries)
+        _total_bytes = sum(_index.values())
+    return _index
+
+
+def _remove(key: str):
+    global _total_bytes
+    index = _load_index()
+    _total_bytes -= index.pop(key, 0)
+    for p in _paths(key):
+        p.unlink(missing_ok=True)
+
+
+def _evict():
+    """Drops least recently used entries until the cache is back under 90% of its cap."""
+    index = _load_index()
+    if _total_bytes <= MAX_BYTES:
+        return
+    target = MAX_BYTES * 0.9
+    evicted = 0
+    while index and _total_bytes > target:
+        _remove(next(iter(index)))
+        evicted += 1
+    print(f"DEBUG: Proxy cache evicted {evicted} entries ({_total_bytes / (1024 * 1024):.1f} MB left)")
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    """Returns the entry's metadata (with "path" to its body) and marks it recently used, or None."""
+    index = _load_index()
+    if key not in index:
+        return None
+    body, meta_path = _paths(key)
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        _remove(key)
+        return None
+    if time.time() - meta.get("stored_at", 0) > TTL_SECONDS:
+        _remove(key)
+        return None
+    index.move_to_end(key)
+    try:
+        os.utime(body)  # persist recency for the index rebuilt after a restart
+    except OSError:
+        _remove(key)
+        return None
+    meta["path"] = str(body)
+    return meta
+
+
+class EntryWriter:
+    """
+    Streams a response body into the cache. Nothing is visible to readers until commit();
+    bodies over MAX_ENTRY_BYTES are silently not cached.
+    """
+
+    def __init__(self, key: str, content_type: Optional[str], last_modified: Optional[str] = None, headers: Optional[Dict[str, str]] = None):
+        self.key = key
+        self.content_type = content_type
+        self.last_modified = last_modified
+        self.headers = headers or {}
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._tmp = temp_path(key)
+        self._file = open(self._tmp, "wb")
+
+    def write(self, chunk: bytes):
+        if self._file is None:
+            return
+        self.size += len(chunk)
+        if self.size > MAX_ENTRY_BYTES:
+            self.abort()
+            return
+        self._file.write(chunk)
+        self._hash.update(chunk)
+
+    def commit(self) -> Optional[Dict[str, Any]]:
+        """Publishes the entry and returns its metadata (None if it was aborted)."""
+        if self._file is None:
+            return None
+        self._file.close()
+        self._file = None
+        return _publish(self.key, self._tmp, self.size, self._hash.hexdigest(), self.content_type, self.last_modified, self.headers)
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._tmp.unlink(missing_ok=True)
+
+
+def _publish(key: str, tmp: Path, size: int, digest: str, content_type: Optional[str], last_modified: Optional[str], headers: Dict[str, str]) -> Dict[str, Any]:
+    """Moves a finished temp file into place as the entry `key` and registers it in the LRU index."""
+    global _total_bytes
+    meta = {
+        "content_type": content_type,
+        "etag": f'"{digest[:32]}"',
+        "last_modified": last_modified or formatdate(usegmt=True),
+        "stored_at": time.time(),
+        "size": size,
+        "headers": headers,
+    }
+    body, meta_path = _paths(key)
+    index = _load_index()
+    if key in index:
+        _total_bytes -= index.pop(key)
+    os.replace(tmp, body)
+    meta_tmp = meta_path.with_name(f".{meta_path.name}.{uuid.uuid4().hex}.tmp")
+    meta_tmp.write_text(json.dumps(meta))
+    os.replace(meta_tmp, meta_path)
+    index[key] = size
+    _total_bytes += size
+    _evict()
+    meta["path"] = str(body)
+    return meta
+
+
+def temp_path(key: str) -> Path:
+    """A scratch file next to the cache (same filesystem, so put_file can rename it in)."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return CACHE_DIR / f".{key}.{uuid.uuid4().hex}.tmp"
+
+
+def put_file(key: str, path: Path, content_type: Optional[str], last_modified: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Moves a finished file (e.g. a transform output from temp_path) into the cache. None if too large."""
+    size = path.stat().st_size
+    if size > MAX_ENTRY_BYTES:
+        path.unlink(missing_ok=True)
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return _publish(key, path, size, digest.hexdigest(), content_type, last_modified, {})
+
+
+def is_not_modified(meta: Dict[str, Any], request_headers) -> bool:
+    """Conditional request check (If-None-Match wins over If-Modified-Since, as in RFC 9110)."""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or meta["etag"] in tags
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and meta.get("last_modified"):
+        try:
+            return parsedate_to_datetime(meta["last_modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def response_headers(meta: Dict[str, Any], hit: bool = True) -> Dict[str, str]:
+    return {
+        **meta.get("headers", {}),
+        "ETag": meta["etag"],
+        "Last-Modified": meta["last_modified"],
+        "Cache-Control": "private, max-age=86400",
+        "X-Proxy-Cache": "HIT" if hit else "MISS",
+    }
@@ -1,10 +1,11 @@
 from typing import Any, Dict, List, Optional
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse, FileResponse, Response
 from sqlmodel import Session, select, delete
 from pydantic import BaseModel
 from app.database import get_session
+from app.core import image_pool
 
 from app.api import deps
 from app.models.marketplace import InstalledApp
@@ -12,8 +13,15 @@ from app.models.user import User
 
 # Changed imports to relative
 from .services import MondayService
-from .models import MondayBoard, MondayItem, MondaySyncJob, MondayBarcodeConfig
+from . import blob_store, proxy_cache, job_events, webhooks, writeback
+from .singleflight import proxy_flights
+from .models import MondayBoard, MondayItem, MondaySyncJob, MondayBarcodeConfig, MondayBarcodeIndex
 import uuid
+import hmac
+import jwt
+import json
+import asyncio
+import hashlib
 import os # Added for env var fallback
 from datetime import datetime
 
@@ -35,52 +43,16 @@ class ClearCacheRequest(BaseModel):
 
 def get_monday_service(
     session: Session = Depends(get_session),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user),
+    http_client: httpx.AsyncClient = Depends(deps.get_http_client)
 ) -> MondayService:
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="User must belong to a company")
         
-    # Find the installed Monday.com app for the user's company
-    # Improved lookup: Join with MarketplaceApp to find by name "Monday.com Connector"
-    # or fallback to ID 1
-    # This prevents issues where seed ID != 1 in production
-    
-    from app.models.marketplace import MarketplaceApp
-    
-    installed_app = session.exec(
-        select(InstalledApp)
-        .join(MarketplaceApp)
-        .where(InstalledApp.company_id == current_user.company_id)
-        .where(MarketplaceApp.name == "Monday.com Connector")
-        .where(InstalledApp.is_active == True)
-    ).first()
-    
-
-    
-    if not installed_app:
-        # Fallback to ID 1 just in case name changed
-        installed_app = session.exec(
-            select(InstalledApp)
-            .where(InstalledApp.company_id == current_user.company_id)
-            .where(InstalledApp.app_id == 1)
-            .where(InstalledApp.is_active == True)
-        ).first()
-    
-    api_key = None
-    if installed_app and installed_app.settings:
-        api_key = installed_app.settings.get("api_key")
-
-    # Fallback to Environment Variable
-    if not api_key:
-        api_key = os.getenv("MONDAY_API_KEY")
-        if api_key:
-             print(f"[API_KEY] Using Fallback Environment Variable", flush=True)
-
-    if not api_key:
-        print(f"[API_KEY] WARNING: Database API key not found and MONDAY_API_KEY env var not set.", flush=True)
+    api_key = MondayService.resolve_api_key(session, current_user.company_id)
 
     print(f"[API_KEY] FINAL KEY TO USE: {api_key[:50] if api_key else 'None'}...", flush=True)
-    return MondayService(api_key=api_key)
+    return MondayService(api_key=api_key, http_client=http_client)
 
 from pydantic import BaseModel
 class TestConnectionRequest(BaseModel):
@@ -90,7 +62,8 @@ class TestConnectionRequest(BaseModel):
 async def test_monday_connection(
     payload: TestConnectionRequest | None = None,
     session: Session = Depends(get_session),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user),
+    http_client: httpx.AsyncClient = Depends(deps.get_http_client)
 ) -> Any:
     """
     Test the connection to Monday.com.
@@ -127,7 +100,7 @@ async def test_monday_connection(
     if not api_key:
         raise HTTPException(status_code=400, detail="API Key is required (either in body or configured)")
 
-    service = MondayService(api_key=api_key)
+    service = MondayService(api_key=api_key, http_client=http_client)
     success = await service.test_connection()
     if not success:
         raise HTTPException(status_code=400, detail="Failed to connect to Monday.com. Check API Key.")
@@ -138,7 +111,8 @@ async def get_boards(
     limit: int = 100,
     api_key: str | None = Query(None),
     session: Session = Depends(get_session),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user),
+    http_client: httpx.AsyncClient = Depends(deps.get_http_client)
 ) -> Any:
     """
     Fetch boards from Monday.com.
@@ -190,7 +164,7 @@ async def get_boards(
              raise HTTPException(status_code=400, detail="Monday.com API Key is not configured")
 
         print(f"[GET_BOARDS] Creating MondayService with key: {service_api_key[:60]}", flush=True)
-        service = MondayService(api_key=service_api_key)
+        service = MondayService(api_key=service_api_key, http_client=http_client)
         boards = await service.get_boards(limit=limit, session=session, user=current_user)
         
         if not boards:
@@ -254,6 +228,76 @@ async def delete_board_data(
         print(f"Delete Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class BoardScheduleRequest(BaseModel):
+    interval_minutes: Optional[int] = None  # None or 0 turns scheduled syncs off
+
+@router.put("/boards/{board_id}/schedule")
+async def set_board_schedule(
+    board_id: int,
+    payload: BoardScheduleRequest,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(deps.get_current_user),
+    service: MondayService = Depends(get_monday_service)
+) -> Any:
+    """
+    Sets how often the board is synced automatically (incremental, with jitter and backoff
+    for boards that keep showing no changes). The board must have been synced once.
+    """
+    if str(current_user.role.value if hasattr(current_user.role, 'value') else current_user.role) not in ["super_admin", "admin"]:
+        raise HTTPException(status_code=403, detail="Only admins can schedule syncs")
+    if payload.interval_minutes is not None and payload.interval_minutes < 0:
+        raise HTTPException(status_code=400, detail="interval_minutes must be positive")
+
+    board = service.set_board_schedule(session, board_id, payload.interval_minutes)
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not synced yet")
+    return {
+        "board_id": board.id,
+        "interval_minutes": board.sync_interval_minutes,
+        "next_sync_at": board.next_sync_at,
+        "backoff_level": board.sync_backoff_level,
+    }
+
+@router.post("/webhooks")
+async def receive_monday_webhook(
+    request: Request,
+    token: Optional[str] = None,
+    session: Session = Depends(get_session),
+) -> Any:
+    """
+    Receiver for Monday webhooks (change_column_value, create_item, item_deleted, ...).
+    Answers the challenge handshake sent when the webhook is created. Events are stored in
+    the inbox and applied in batches by the consumer (webhooks.py), so this returns at once.
+    No user auth: Monday calls it. Events need MONDAY_WEBHOOK_SECRET to be set and must carry
+    ?token=<secret> or an Authorization JWT signed with it; without a secret they are refused.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Expected a JSON object")
+
+    if "challenge" in body:
+        return {"challenge": body["challenge"]}
+
+    if not webhooks.SECRET:
+        raise HTTPException(status_code=403, detail="Webhooks are disabled: MONDAY_WEBHOOK_SECRET is not set")
+    if not hmac.compare_digest(token or "", webhooks.SECRET):
+        authorization = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        try:
+            jwt.decode(authorization, webhooks.SECRET, algorithms=["HS256"], options={"verify_aud": False})
+        except jwt.PyJWTError:
+            raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    event = body.get("event")
+    if not isinstance(event, dict):
+        raise HTTPException(status_code=400, detail="Missing event")
+    stored = MondayService(api_key=None).record_webhook_event(session, event)
+    if stored:
+        webhooks.notify()
+    return {"status": "accepted" if stored else "ignored"}
+
 @router.post("/boards/{board_id}/sync")
 async def sync_board(
     board_id: int,
@@ -263,12 +307,14 @@ async def sync_board(
     optimize_images: bool = Query(False),
     force_sync_images: bool = Query(False),
     keep_original_images: bool = Query(True),
+    incremental: bool = Query(False),
     session: Session = Depends(get_session),
     service: MondayService = Depends(get_monday_service),
     current_user: User = Depends(deps.get_current_user)
 ) -> Any:
     """
     Trigger a manual sync for a board via BACKGROUND JOB.
+    Pass incremental=true to only fetch items changed since the last sync.
     Returns a Job ID immediately.
     """
     try:
@@ -289,6 +335,7 @@ async def sync_board(
         should_optimize = payload.get("optimize_images", optimize_images)
         should_force = payload.get("force_sync_images", force_sync_images)
         should_keep_orig = payload.get("keep_original_images", keep_original_images)
+        should_be_incremental = payload.get("incremental", incremental)
 
         sync_kwargs = {
             "download_assets": should_download,
@@ -296,18 +343,19 @@ async def sync_board(
             "force_sync_images": should_force,
             "keep_original_images": should_keep_orig,
             "filters": filters,
-            "filtered_item_ids": filtered_item_ids
+            "filtered_item_ids": filtered_item_ids,
+            "incremental": should_be_incremental
         }
         
         # 1. Create Job Record (With Params)
-        job = await service.create_sync_job(session, board_id, current_user.id, params=sync_kwargs)
+        job = await service.create_sync_job(session, board_id, current_user.id, params=sync_kwargs, company_id=current_user.company_id)
         
         # 2. Trigger Queue Processor in Background
         async def background_wrapper():
              from app.database import engine
              from sqlmodel import Session
              with Session(engine) as task_session:
-                 srv = MondayService(api_key=service.api_key)
+                 srv = MondayService(api_key=service.api_key, http_client=service.client)
                  await srv.process_queue(task_session)
 
         background_tasks.add_task(background_wrapper)
@@ -335,7 +383,81 @@ async def get_sync_job_status(
         all_jobs = session.exec(select(MondaySyncJob)).all()
         print(f"DEBUG_JOB: Job not found! Available Jobs: {[str(j.id) for j in all_jobs]}")
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    logs = service.get_job_logs(session, [job])[job.id]
+    return _job_payload(job, logs)
+
+def _job_payload(job: MondaySyncJob, logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The job as before the log table existed: `logs` is the list of its (kept) lines."""
+    return {**job.model_dump(), "logs": [line["message"] for line in logs]}
+
+def _job_state(job: MondaySyncJob) -> Dict[str, Any]:
+    return {
+        "status": job.status,
+        "message": job.progress_message,
+        "stats": {k: v for k, v in (job.stats or {}).items() if k != "params"},
+        "checkpoint_page": job.checkpoint_page,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+@router.get("/sync/jobs/{job_id}/events")
+async def stream_sync_job_events(
+    job_id: uuid.UUID,
+    request: Request,
+    after: int = 0,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(deps.get_current_user),
+    service: MondayService = Depends(get_monday_service)
+):
+    """
+    Server-Sent Events feed of a job, replacing polling of GET /sync/jobs/{job_id}.
+    Events: `log` (one per line, id = its seq), `progress` (status/message/stats whenever they
+    change) and a final `end` once the job is complete or failed. Reconnects resume after
+    the Last-Event-ID header (or ?after=seq).
+    """
+    if not session.get(MondaySyncJob, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    last_event_id = request.headers.get("last-event-id")
+    after_seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else after
+
+    def sse(event: str, data: Any, event_id: int = None) -> str:
+        head = f"id: {event_id}\n" if event_id is not None else ""
+        return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    async def event_stream():
+        nonlocal after_seq
+        from app.database import engine
+        loop = asyncio.get_running_loop()
+        last_state, last_sent = None, loop.time()
+        with job_events.subscribe(job_id) as changed:
+            while not await request.is_disconnected():
+                changed.clear()
+                # Fresh session per read: this stream outlives the request's session
+                with Session(engine) as read_session:
+                    job = read_session.get(MondaySyncJob, job_id)
+                    if not job:
+                        return
+                    lines = service.get_job_logs(read_session, [job], after_seq=after_seq)[job.id]
+                    state = _job_state(job)
+                for line in lines:
+                    yield sse("log", line["message"], line["seq"])
+                    after_seq = line["seq"]
+                    last_sent = loop.time()
+                if state != last_state:
+                    yield sse("progress", state)
+                    last_state, last_sent = state, loop.time()
+                if state["status"] in ("complete", "failed"):
+                    yield sse("end", state)
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), job_events.POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    if loop.time() - last_sent >= job_events.KEEPALIVE_SECONDS:
+                        yield ": keep-alive\n\n"
+                        last_sent = loop.time()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @router.get("/sync/jobs")
 async def list_sync_jobs(
@@ -347,7 +469,34 @@ async def list_sync_jobs(
     """List recent sync jobs (Admin only?). For now open to users but filtered?"""
     # Simple list for now
     jobs = session.exec(select(MondaySyncJob).order_by(MondaySyncJob.created_at.desc()).limit(limit)).all()
-    return jobs
+    logs = service.get_job_logs(session, jobs)
+    return [_job_payload(job, logs[job.id]) for job in jobs]
+
+@router.post("/sync/jobs/{job_id}/resume")
+async def resume_sync_job(
+    job_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(deps.get_current_user),
+    service: MondayService = Depends(get_monday_service)
+) -> Any:
+    """
+    Re-queues a failed sync job. It continues after its last committed page
+    (or restarts from page 1 if the Monday cursor has expired).
+    """
+    job = service.resume_sync_job(session, job_id)
+    if not job:
+        raise HTTPException(status_code=400, detail="Job not found or not in a resumable state")
+
+    async def background_wrapper():
+         from app.database import engine
+         from sqlmodel import Session
+         with Session(engine) as task_session:
+             srv = MondayService(api_key=service.api_key, http_client=service.client)
+             await srv.process_queue(task_session)
+
+    background_tasks.add_task(background_wrapper)
+    return {"status": "accepted", "job_id": str(job.id), "resume_after_page": job.checkpoint_page}
 
 @router.post("/sync/jobs/reset")
 async def reset_sync_queue(
@@ -367,25 +516,70 @@ async def reset_sync_queue(
 @router.get("/boards/{board_id}/items")
 async def get_board_items(
     board_id: int,
-    limit: int = 50,
-    cursor: str = None,
+    limit: int = Query(50, ge=1, le=MondayService.LOCAL_ITEMS_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    search: Optional[str] = None,
+    filter_column: Optional[str] = None,
+    filter_value: Optional[str] = None,
+    sort_column_id: Optional[str] = None,
+    sort_direction: Optional[str] = Query(None, pattern="^(asc|desc)$"),
     session: Session = Depends(get_session),
     service: MondayService = Depends(get_monday_service)
 ) -> Any:
     """
-    Fetch items for a specific board from LOCAL DATABASE.
+    Fetch one page of items for a specific board from LOCAL DATABASE.
+    Pass the returned `cursor` back to get the next page; it is null on the last page.
+    Sorting defaults to the board's barcode config.
     """
     try:
-        # TODO: Implement pagination for local DB
-        # For now, return all items as the user requested "fetch all"
-        items = service.get_local_board_items(session=session, board_id=board_id)
-        return {
-            "items": items,
-            "cursor": None # No cursor for local DB yet
-        }
+        return service.get_local_board_items_page(
+            session=session,
+            board_id=board_id,
+            limit=limit,
+            cursor=cursor,
+            search=search,
+            filter_column=filter_column,
+            filter_value=filter_value,
+            sort_column_id=sort_column_id,
+            sort_direction=sort_direction,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/boards/{board_id}/lookup")
+async def lookup_board_item(
+    board_id: int,
+    code: str = Query(..., min_length=1),
+    session: Session = Depends(get_session),
+    service: MondayService = Depends(get_monday_service)
+) -> Any:
+    """
+    Resolve a scanned code to item(s) on a board.
+    Matches the normalized barcode or search column value (name if no search column is set).
+    """
+    items = service.lookup_items_by_code(session, board_id, code)
+    return {"code": code, "items": items}
+
+@router.get("/boards/{board_id}/changes")
+async def get_board_changes(
+    board_id: int,
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=MondayService.CHANGES_MAX_LIMIT),
+    session: Session = Depends(get_session),
+    service: MondayService = Depends(get_monday_service)
+) -> Any:
+    """
+    Delta feed for offline caches: items upserted and ids deleted since the `since` token.
+    Start without `since`, then always send back the returned `since`; repeat while `has_more`.
+    `full_resync: true` means drop the cached board first (first pull, or token too old).
+    """
+    try:
+        return service.get_board_changes(session, board_id, since=since, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/boards/{board_id}/clear-cache")
 async def clear_board_cache(
     board_id: int,
@@ -451,6 +645,7 @@ async def update_item_asset(
     
     # Reassign to trigger tracking
     item.assets = new_assets
+    item.updated_at = datetime.utcnow()  # Surfaces the edit in the changes feed
     
     try:
         session.add(item)
@@ -474,7 +669,7 @@ async def rotate_item_asset(
     """
     import os
     try:
-        from PIL import Image
+        import PIL  # noqa: F401 - used by the image pool workers
     except ImportError:
         raise HTTPException(status_code=500, detail="Pillow not installed on backend")
 
@@ -492,9 +687,10 @@ async def rotate_item_asset(
     if angle == 0:
         return {"status": "success", "message": "No rotation needed"}
 
-    # Helper to rotate a single file
-    def rotate_file(path_str):
-        if not path_str: return False
+    # Helper to rotate a single file. Returns the (possibly new) web path, or None.
+    # Decoding/encoding runs in the shared image worker pool.
+    async def rotate_file(path_str):
+        if not path_str: return None
         
         # Clean path logic similar to extraction
         clean_p = path_str.lstrip("/\\")
@@ -502,27 +698,33 @@ async def rotate_item_asset(
         
         if not os.path.exists(abs_p):
             print(f"Rotate: File not found {abs_p}")
-            return False
+            return None
             
         try:
-            with Image.open(abs_p) as img:
-                # Pillow rotate is CCW. UI sends "90" for CW.
-                # If we want 90deg CW, we rotate -90.
-                rotated = img.rotate(-angle, expand=True)
-                rotated.save(abs_p)
-                print(f"Rotated {abs_p} by {-angle}")
-                return True
+            pool = image_pool.get_image_pool()
+            # Pillow rotate is CCW. UI sends "90" for CW.
+            # If we want 90deg CW, we rotate -90.
+            if blob_store.key_from_web_path(path_str):
+                # Stored blobs can be shared by other items: write the result as a new blob (copy-on-write)
+                content = await pool.run(image_pool.rotate_image, abs_p, -angle, label=f"asset {asset_id}")
+                # Hashing and writing the file is blocking disk I/O: keep it off the event loop
+                key, _ = await asyncio.get_running_loop().run_in_executor(None, blob_store.put_bytes, content, os.path.splitext(abs_p)[1])
+                print(f"Rotated {abs_p} by {-angle} into blob {key}")
+                return blob_store.web_path(key)
+            await pool.run(image_pool.rotate_image, abs_p, -angle, abs_p, label=f"asset {asset_id}")
+            print(f"Rotated {abs_p} by {-angle}")
+            return path_str
         except Exception as e:
             print(f"Rotate Error for {abs_p}: {e}")
-            return False
+            return None
 
     # 2. Rotate Original
-    did_rotate_orig = rotate_file(asset.get("local_path"))
+    new_local_path = await rotate_file(asset.get("local_path"))
     
     # 3. Rotate Optimized (if exists)
-    did_rotate_opt = rotate_file(asset.get("optimized_path"))
+    new_optimized_path = await rotate_file(asset.get("optimized_path"))
     
-    if not did_rotate_orig and not did_rotate_opt:
+    if not new_local_path and not new_optimized_path:
          raise HTTPException(status_code=404, detail="Local asset files not found to rotate")
 
     # 4. RESET Metadata Rotation to 0
@@ -530,15 +732,56 @@ async def rotate_item_asset(
     new_assets = dict(item.assets)
     asset_data = dict(new_assets[asset_id])
     asset_data["rotation"] = 0
+    # The thumbnail ladder shows the old orientation; it is rebuilt from the rotated original
+    for stale in ("thumbnails", "width", "height"):
+        asset_data.pop(stale, None)
+    if new_local_path:
+        asset_data["local_path"] = new_local_path
+    if new_optimized_path:
+        asset_data["optimized_path"] = new_optimized_path
     new_assets[asset_id] = asset_data
     
     item.assets = new_assets
+    item.updated_at = datetime.utcnow()
     session.add(item)
+
+    # Point the item at the rotated blobs; the old ones are freed if nothing else uses them
+    store = MondayService(api_key="")
+    store._sync_asset_refs(session, [{"id": item.id, "board_id": item.board_id, "assets": new_assets}])
     session.commit()
+    store.collect_asset_garbage(session)
     
     return {"status": "success", "asset": asset_data}
 
 
+@router.get("/items/{item_id}/assets/{asset_id}/thumbnail")
+async def get_item_asset_thumbnail(
+    item_id: int,
+    asset_id: str,
+    width: int = Query(400, ge=16, le=4096, description="Smallest acceptable width"),
+    format: str = Query("webp", pattern="^(webp|avif)$"),
+    session: Session = Depends(get_session)
+):
+    """
+    Serves the smallest stored thumbnail at least `width` wide (generated on first request).
+    Thumbnails are content-addressed, so responses can be cached forever.
+    """
+    item = session.exec(select(MondayItem).where(MondayItem.id == item_id)).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if asset_id not in (item.assets or {}):
+        raise HTTPException(status_code=404, detail="Asset not found on item")
+
+    path = await MondayService(api_key="").get_asset_thumbnail(session, item, asset_id, width, format)
+    if not path:
+        raise HTTPException(status_code=404, detail="Asset is not stored locally")
+
+    response = FileResponse(path.lstrip("/\\"))
+    if blob_store.key_from_web_path(path):
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
 @router.post("/items/{item_id}/assets/{asset_id}/extract")
 async def extract_asset_data(
     item_id: int,
@@ -652,11 +895,14 @@ async def extract_asset_data(
 async def update_item_barcode(
     item_id: int,
     payload: dict, # { "barcode": "123" }
+    write_behind: Optional[bool] = None,  # Defaults to MONDAY_WRITE_BEHIND
     session: Session = Depends(get_session),
+    current_user: User = Depends(deps.get_current_user),
     service: MondayService = Depends(get_monday_service)
 ):
     """
     Update the barcode column for an item. The column is determined by the Board's BarcodeConfig.
+    In write-behind mode the local item is updated right away and Monday.com shortly after.
     """
     try:
         barcode_val = payload.get("barcode")
@@ -676,26 +922,16 @@ async def update_item_barcode(
         # 3. Update Monday
         # TODO: Handle string vs JSON value for Monday? Text columns take simple strings.
         col_vals = { config.barcode_column_id: barcode_val }
+        if service.WRITE_BEHIND if write_behind is None else write_behind:
+            service.queue_item_writes(session, item, col_vals, company_id=current_user.company_id)
+            session.commit()
+            writeback.notify()
+            return {"status": "success", "message": "Barcode updated", "queued": True}
         updated = await service.update_item_column_value(item.board_id, item_id, col_vals)
         
         # 4. Update Local
         if updated:
-             new_values = item.column_values.copy() if item.column_values else []
-             if not isinstance(new_values, list): new_values = []
-             
-             found = False
-             for cv in new_values:
-                 if cv.get("id") == config.barcode_column_id:
-                     cv["text"] = str(barcode_val)
-                     cv["value"] = str(barcode_val)
-                     found = True
-                     break
-            
-             if not found:
-                 new_values.append({"id": config.barcode_column_id, "text": str(barcode_val), "value": str(barcode_val), "type": "text"})
-             
-             item.column_values = new_values
-             session.add(item)
+             service.apply_local_column_values(session, item, {config.barcode_column_id: barcode_val})
              session.commit()
              session.refresh(item)
              return {"status": "success", "message": "Barcode updated"}
@@ -714,11 +950,15 @@ async def update_item_barcode(
 async def update_item_value(
     item_id: int,
     payload: dict, # Expects { "board_id": 123, "column_values": { "col_id": "value" } }
+    write_behind: Optional[bool] = None,  # Defaults to MONDAY_WRITE_BEHIND
     session: Session = Depends(get_session),
+    current_user: User = Depends(deps.get_current_user),
     service: MondayService = Depends(get_monday_service)
 ) -> Any:
     """
     Update item column values on Monday.com and locally.
+    In write-behind mode the local item is updated right away and Monday.com shortly after
+    (items not synced locally are always written through).
     """
     try:
         board_id = payload.get("board_id")
@@ -727,42 +967,23 @@ async def update_item_value(
         if not board_id or not column_values:
             raise HTTPException(status_code=400, detail="board_id and column_values are required")
 
+        if service.WRITE_BEHIND if write_behind is None else write_behind:
+            item = session.get(MondayItem, item_id)
+            if item:
+                service.queue_item_writes(session, item, column_values, company_id=current_user.company_id)
+                session.commit()
+                writeback.notify()
+                return {"status": "success", "updated": True, "queued": True}
+
         # 1. Update on Monday.com
         updated = await service.update_item_column_value(board_id, item_id, column_values)
         
         if updated:
              # 2. Update Local DB (Optimistic)
-             # Changed import to relative
-             from .models import MondayItem
              item = session.exec(select(MondayItem).where(MondayItem.id == item_id)).first()
              if item:
-                 # Deep copy existing values to modify
-                 new_values = item.column_values.copy() if item.column_values else {}
-                 
-                 # Ensure we are working with a list
-                 if not isinstance(new_values, list):
-                     new_values = [] 
-                 
-                 for col_id, val in column_values.items():
-                     if col_id == 'name':
-                         item.name = str(val)
-                     else:
-                         # We assume 'val' is the simple text/value from frontend input
-                         # Find the matching column object in the list
-                         found = False
-                         for cv in new_values:
-                             if cv.get("id") == col_id:
-                                 cv["text"] = str(val)
-                                 cv["value"] = str(val)
-                                 found = True
-                                 break
-                        
-                         if not found:
-                             new_values.append({"id": col_id, "text": str(val), "value": str(val), "type": "text"})
-                 
-                 # Force update
-                 item.column_values = new_values
-                 session.add(item)
+                 # We assume 'val' is the simple text/value from frontend input
+                 service.apply_local_column_values(session, item, column_values)
                  session.commit()
                  session.refresh(item)
                  
@@ -772,8 +993,194 @@ async def update_item_value(
         print(f"Update Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/pending-writes")
+async def get_pending_writes(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(deps.get_current_user),
+    service: MondayService = Depends(get_monday_service)
+) -> Any:
+    """Write-behind edits of the user's company not pushed to Monday.com yet, and the ones that gave up."""
+    return service.pending_write_summary(session, current_user.company_id)
+
+class BatchItemUpdate(BaseModel):
+    item_id: int
+    board_id: Optional[int] = None  # Looked up from the local item when omitted
+    column_values: Dict[str, Any]
+
+class BatchUpdateRequest(BaseModel):
+    updates: List[BatchItemUpdate]
+
+@router.post("/items/batch-update")
+async def batch_update_items(
+    payload: BatchUpdateRequest,
+    session: Session = Depends(get_session),
+    service: MondayService = Depends(get_monday_service)
+) -> Any:
+    """
+    Applies many item/column updates on Monday.com (a few aliased mutations instead of one
+    request per item) and locally in one transaction. Reports a result per item.
+    """
+    if not payload.updates:
+        raise HTTPException(status_code=400, detail="updates is empty")
+    if len(payload.updates) > 1000:
+        raise HTTPException(status_code=400, detail="At most 1000 updates per request")
+    try:
+        results = await service.batch_update_items(session, [u.model_dump() for u in payload.updates])
+    except Exception as e:
+        print(f"Batch Update Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    failed = sum(1 for r in results if r["status"] != "ok")
+    return {
+        "status": "success" if not failed else ("partial" if failed < len(results) else "failed"),
+        "updated": len(results) - failed,
+        "failed": failed,
+        "results": results,
+    }
+
+async def _open_proxy_upstream(service: MondayService, url: str, skip_auth: bool) -> httpx.Response:
+    """
+    Starts a streamed GET for a proxied asset (caller closes it).
+    Raises HTTPException if the upstream answer is not a 200.
+    """
+    # Create a client with the same headers as the service
+    # Determine functionality based on URL domain
+    from urllib.parse import urlparse
+    domain = urlparse(url).netloc
+    
+    headers = {}
+    
+    # Determine if we should send Auth
+    # 1. User flagged skip_auth (for public_urls)
+    # 2. Domain is NOT monday.com
+    should_send_auth = not skip_auth and "monday.com" in domain
+    
+    if should_send_auth:
+         headers["Authorization"] = service.api_key
+         headers["API-Version"] = "2023-10"
+    else:
+         # Clean headers for public/S3 links
+         pass
+    
+    # Manual redirect handling to prevent header leakage to S3
+    # We handle up to 3 redirects to be safe
+    client = service.client
+    
+    current_url = url
+    current_headers = headers
+    
+    for _ in range(3):
+        req = client.build_request("GET", current_url, headers=current_headers)
+        r = await client.send(req, stream=True, follow_redirects=False)
+        
+        if r.status_code in (301, 302, 303, 307, 308):
+            redirect_url = r.headers.get("location")
+            if redirect_url:
+                await r.aclose()
+                print(f"Redirecting to: {redirect_url}")
+                current_url = redirect_url
+                
+                # Check if we are still on Monday.com
+                next_domain = urlparse(redirect_url).netloc
+                if "monday.com" not in next_domain:
+                     # Redirecting to S3/External -> DROP HEADERS
+                    print("External Redirect -> Dropping ALL Headers")
+                    current_headers = {}
+                else:
+                    print("Internal Redirect -> Keeping Auth Headers")
+                    # Keep current_headers (Auth + API-Version)
+                    pass
+                
+                continue
+        
+        # If not a redirect, break the loop and return this response
+        break
+    
+    if r.status_code != 200:
+        # Log the error for debugging (print to console for now)
+        print(f"Monday Proxy Error: {r.status_code} - {url}")
+        try:
+            error_body = await r.aread()
+            print(f"Error Body: {error_body}")
+        except: 
+            pass
+        finally:
+            await r.aclose()
+        raise HTTPException(status_code=r.status_code, detail="Failed to fetch asset from Monday")
+    return r
+
+
+def _proxy_passthrough_headers(r: httpx.Response) -> Dict[str, str]:
+    # Construct response headers CAREFULLY
+    # Do NOT forward content-encoding or content-length to avoid browser confusion
+    # (Since we are streaming decoded bytes, length and encoding change)
+    return {
+        "Content-Disposition": r.headers.get("content-disposition", "inline")
+    }
+
+
+async def _load_proxy_entry(service: MondayService, cache_key: str, account: str, url: str, skip_auth: bool, width: Optional[int], optimize: bool) -> Dict[str, Any]:
+    """
+    Fetches (and optionally optimizes) a proxied asset into the proxy cache.
+    Runs once per key at a time: concurrent identical requests share it (proxy_flights).
+    Memory stays bounded: bodies are spooled to disk and images resized file-to-file in the pool.
+    Returns {"meta": entry} when cached, or {"stream": True} if the body is too large to cache.
+    """
+    original_key = proxy_cache.cache_key(url, None, False, account)
+    original = proxy_cache.get(original_key) if (optimize or width) else None
+    if original is None:
+        r = await _open_proxy_upstream(service, url, skip_auth)
+        try:
+            # Spool the original to the cache (also serves later un-optimized requests for it)
+            length = r.headers.get("content-length")
+            if length and length.isdigit() and int(length) > proxy_cache.MAX_ENTRY_BYTES:
+                return {"stream": True}
+            writer = proxy_cache.EntryWriter(original_key, r.headers.get("content-type"), r.headers.get("last-modified"), _proxy_passthrough_headers(r))
+            try:
+                # httpx aiter_bytes automatically handles decompression (gzip/deflate)
+                async for chunk in r.aiter_bytes():
+                    writer.write(chunk)
+            except BaseException:
+                writer.abort()
+                raise
+            original = writer.commit()
+        finally:
+            await r.aclose()
+    if not original:
+        return {"stream": True}
+    if not (optimize or width):
+        return {"meta": original}
+
+    print(f"--- PROXY OPTIMIZATION REQUEST ---")
+    print(f"URL: {url}")
+    print(f"Params: optimize={optimize}, width={width}")
+    # RELAXED CHECK: Just try to open it. 
+    # S3 sometimes returns weird types.
+    print(f"Content-Type: {original.get('content_type')}")
+    target_width = width or 400  # Default to 400px (good for grid thumbnails)
+    print(f"Original Size: {original['size']} bytes, target width {target_width}")
+
+    output = proxy_cache.temp_path(cache_key)
+    try:
+        # Decode/resize/encode in the shared image worker pool (WebP: best compression/quality ratio).
+        # Only resizes if the image is actually larger; huge images are refused (IMAGE_MAX_PIXELS).
+        await image_pool.get_image_pool().run(
+            image_pool.resize_to_webp_file, original["path"], str(output), target_width, 75, label="proxy"
+        )
+        meta = proxy_cache.put_file(cache_key, output, "image/webp", original.get("last_modified"))
+        print(f"Optimized Size: {meta['size'] if meta else 'uncached'} bytes")
+        print("----------------------------------")
+        return {"meta": meta or original}
+    except Exception as img_err:
+        print(f"Image Optimization Failed: {img_err}")
+        # Fallback to original content (the optimized key stays uncached, so it is retried next time)
+        return {"meta": original}
+    finally:
+        output.unlink(missing_ok=True)
+
+
 @router.get("/proxy")
 async def proxy_monday_asset(
+    request: Request,
     url: str,
     skip_auth: bool = False,
     width: int = Query(None, description="Target width for optimization"),
@@ -782,152 +1189,38 @@ async def proxy_monday_asset(
 ) -> Any:
     """
     Proxy request to Monday.com to fetch assets (images/files) that require authentication.
+    Uses the shared pooled HTTP client (keep-alive/HTTP2) - never close it here.
+    Responses are kept in an on-disk LRU cache (proxy_cache.py) and support conditional requests;
+    concurrent requests for the same uncached asset share one download and resize.
     """
-    import httpx
     from fastapi.responses import StreamingResponse
     
     if not url:
         raise HTTPException(status_code=400, detail="URL is required")
+
+    # Served before to this account: answer locally (304 if the client's copy is still current).
+    # Different accounts may not see the same files: cache entries and downloads are per account.
+    account = hashlib.sha256((service.api_key or "").encode("utf-8")).hexdigest()
+    cache_key = proxy_cache.cache_key(url, width, optimize, account)
+    cached = proxy_cache.get(cache_key)
+    if cached:
+        cached_headers = proxy_cache.response_headers(cached)
+        if proxy_cache.is_not_modified(cached, request.headers):
+            return Response(status_code=304, headers=cached_headers)
+        return FileResponse(cached["path"], media_type=cached.get("content_type"), headers=cached_headers)
         
     try:
-        # Create a client with the same headers as the service
-        # Determine functionality based on URL domain
-        from urllib.parse import urlparse
-        domain = urlparse(url).netloc
-        
-        headers = {}
-        
-        # Determine if we should send Auth
-        # 1. User flagged skip_auth (for public_urls)
-        # 2. Domain is NOT monday.com
-        should_send_auth = not skip_auth and "monday.com" in domain
-        
-        if should_send_auth:
-             headers["Authorization"] = service.api_key
-             headers["API-Version"] = "2023-10"
-        else:
-             # Clean headers for public/S3 links
-             pass
-        
-        # Manual redirect handling to prevent header leakage to S3
-        # We handle up to 3 redirects to be safe
-        client = httpx.AsyncClient(follow_redirects=False)
-        
-        current_url = url
-        current_headers = headers
-        
-        for _ in range(3):
-            req = client.build_request("GET", current_url, headers=current_headers)
-            r = await client.send(req, stream=True)
-            
-            if r.status_code in (301, 302, 303, 307, 308):
-                redirect_url = r.headers.get("location")
-            if r.status_code in (301, 302, 303, 307, 308):
-                redirect_url = r.headers.get("location")
-                if redirect_url:
-                    await r.aclose()
-                    print(f"Redirecting to: {redirect_url}")
-                    current_url = redirect_url
-                    
-                    # Check if we are still on Monday.com
-                    next_domain = urlparse(redirect_url).netloc
-                    if "monday.com" not in next_domain:
-                         # Redirecting to S3/External -> DROP HEADERS
-                        print("External Redirect -> Dropping ALL Headers")
-                        current_headers = {}
-                    else:
-                        print("Internal Redirect -> Keeping Auth Headers")
-                        # Keep current_headers (Auth + API-Version)
-                        pass
-                    
-                    continue
-            
-            # If not a redirect, break the loop and return this response
-            break
-        
-        if r.status_code != 200:
-            await client.aclose()
-            # Log the error for debugging (print to console for now)
-            print(f"Monday Proxy Error: {r.status_code} - {url}")
-            try:
-                error_body = await r.aread()
-                print(f"Error Body: {error_body}")
-            except: 
-                pass
-            raise HTTPException(status_code=r.status_code, detail="Failed to fetch asset from Monday")
-
-        if optimize or width:
-            print(f"--- PROXY OPTIMIZATION REQUEST ---")
-            print(f"URL: {url}")
-            print(f"Params: optimize={optimize}, width={width}")
-            
-            # OPTIMIZATION PATH: Buffer -> Resize -> Serve
-            content = b""
-            async for chunk in r.aiter_bytes():
-                content += chunk
-            
-            await r.aclose()
-            await client.aclose()
+        loaded = await proxy_flights.do(
+            (cache_key, skip_auth),
+            lambda: _load_proxy_entry(service, cache_key, account, url, skip_auth, width, optimize)
+        )
+        if loaded.get("meta"):
+            meta = loaded["meta"]
+            return FileResponse(meta["path"], media_type=meta.get("content_type"), headers=proxy_cache.response_headers(meta, hit=False))
+
+        # Too large to cache: stream it straight through (not coalesced)
+        r = await _open_proxy_upstream(service, url, skip_auth)
 
-            try:
-                try:
-                    from PIL import Image
-                    import io
-                    print("PIL Imported Successfully")
-                except ImportError:
-                    print("CRITICAL: PIL (Pillow) not found in backend environment!")
-                    raise
-
-                # Check if it's actually an image
-                content_type = r.headers.get("content-type", "")
-                print(f"Content-Type: {content_type}")
-                
-                # RELAXED CHECK: Just try to open it. 
-                # S3 sometimes returns weird types.
-                
-                img_io = io.BytesIO(content)
-                img = Image.open(img_io)
-                print(f"Original Size: {img.size} ({len(content)} bytes)")
-                
-                target_width = width or 400  # Default to 400px (good for grid thumbnails)
-                
-                # Only resize if the image is actually larger
-                if img.width > target_width:
-                    w_percent = (target_width / float(img.width))
-                    h_size = int((float(img.height) * float(w_percent)))
-                    img = img.resize((target_width, h_size), Image.Resampling.LANCZOS)
-                    print(f"Resized to: {img.size}")
-                else:
-                    print("Image smaller than target, skipping resize.")
-                
-                output_io = io.BytesIO()
-                # Save as WebP for best compression/quality ratio
-                img.save(output_io, format="WEBP", quality=75)
-                optimized_size = output_io.tell()
-                output_io.seek(0)
-                
-                print(f"Optimized Size: {optimized_size} bytes")
-                print("----------------------------------")
-                
-                return StreamingResponse(
-                    output_io, 
-                    status_code=200, 
-                    media_type="image/webp"
-                )
-            except Exception as img_err:
-                print(f"Image Optimization Failed: {img_err}")
-                import traceback
-                traceback.print_exc()
-                
-                from io import BytesIO
-                # Fallback to original content
-                return StreamingResponse(
-                    BytesIO(content),
-                    status_code=200,
-                    media_type=r.headers.get("content-type")
-                )
-
-        # STANDARD PATH: Stream directly
         async def stream_content():
             try:
                 # httpx aiter_bytes automatically handles decompression (gzip/deflate)
@@ -936,14 +1229,9 @@ async def proxy_monday_asset(
                     yield chunk
             finally:
                 await r.aclose()
-                await client.aclose()
 
-        # Construct response headers CAREFULLY
-        # Do NOT forward content-encoding or content-length to avoid browser confusion
-        # (Since we are streaming decoded bytes, length and encoding change)
-        response_headers = {
-            "Content-Disposition": r.headers.get("content-disposition", "inline")
-        }
+        response_headers = _proxy_passthrough_headers(r)
+        response_headers["X-Proxy-Cache"] = "BYPASS"
         
         return StreamingResponse(
             stream_content(), 
@@ -1090,23 +1378,7 @@ async def update_item_barcode(
 
     # 5. Update Local DB (Optimistic)
     if updated:
-         new_values = item.column_values.copy() if item.column_values else {}
-         if not isinstance(new_values, list): new_values = []
-         
-         # Helper to update list of dicts
-         found = False
-         for cv in new_values:
-             if cv.get("id") == config.barcode_column_id:
-                 cv["text"] = str(barcode)
-                 cv["value"] = str(barcode)
-                 found = True
-                 break
-        
-         if not found:
-             new_values.append({"id": config.barcode_column_id, "text": str(barcode), "value": str(barcode), "type": "text"})
-         
-         item.column_values = new_values
-         session.add(item)
+         service.apply_local_column_values(session, item, column_values)
          session.commit()
          session.refresh(item)
          
@@ -1179,6 +1451,13 @@ async def save_barcode_config(
     session.add(config)
     session.commit()
     session.refresh(config)
+
+    # Re-key the scan lookup index on the new columns (from local data; the sync below refreshes it too)
+    try:
+        service.rebuild_barcode_index(session)
+    except Exception as e:
+        print(f"[CONFIG] Barcode index rebuild failed: {e}", flush=True)
+        session.rollback()
     
     # 3. AUTO-SYNC TRIGGER
     # We must sync to ensure the new columns (especially Auto Number) are populated in Local DB
@@ -1197,7 +1476,8 @@ async def save_barcode_config(
         job_id = await service.create_sync_job(
             session=session, 
             board_id=payload.board_id, 
-            user_id=current_user.id
+            user_id=current_user.id,
+            company_id=current_user.company_id
         )
         
         # Background Execution - Safe Session Management
@@ -1206,7 +1486,7 @@ async def save_barcode_config(
              from sqlmodel import Session
              # Create a NEW session for the background task
              with Session(engine) as task_session:
-                 srv = MondayService(api_key=service.api_key)
+                 srv = MondayService(api_key=service.api_key, http_client=service.client)
                  await srv.process_queue(task_session)
 
         # Trigger immediately in background
@@ -1243,6 +1523,7 @@ async def clear_barcode_config(
         for existing in existing_configs:
             session.delete(existing)
             count += 1
+        session.exec(delete(MondayBarcodeIndex))
         
         session.commit()
         print(f"[CONFIG] Manual Clear: Deleted {count} configs.", flush=True)
@@ -1267,7 +1548,6 @@ async def test_monday_direct(
     """
     SIMPLE TEST: Direct Monday API call to see raw response
     """
-    import httpx
     query = """
     query {
         boards (ids: [%s]) {
@@ -1284,21 +1564,20 @@ async def test_monday_direct(
     }
     """ % board_id
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://api.monday.com/v2",
-            json={"query": query},
-            headers=service.headers,
-            timeout=30.0
-        )
-        raw_data = response.json()
-        
-        # Return the EXACT response from Monday
-        return {
-            "status_code": response.status_code,
-            "raw_response": raw_data,
-            "item_count": len(raw_data.get("data", {}).get("boards", [{}])[0].get("items_page", {}).get("items", []))
-        }
+    response = await service.client.post(
+        "https://api.monday.com/v2",
+        json={"query": query},
+        headers=service.headers,
+        timeout=30.0
+    )
+    raw_data = response.json()
+    
+    # Return the EXACT response from Monday
+    return {
+        "status_code": response.status_code,
+        "raw_response": raw_data,
+        "item_count": len(raw_data.get("data", {}).get("boards", [{}])[0].get("items_page", {}).get("items", []))
+    }
 
 
 @router.get("/boards/{board_id}/items")
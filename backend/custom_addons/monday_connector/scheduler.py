@@ -0,0 +1,67 @@
+import asyncio
+import os
+from typing import Optional
+
+from sqlmodel import Session
+
+from app.database import engine
+from .services import MondayService
+
+# Periodic sync scheduler. Every TICK_SECONDS it queues incremental syncs for boards whose
+# next_sync_at has passed (MondayService.enqueue_due_syncs); cadence, jitter and backoff live
+# on MondayBoard. Started by the addon's on_startup hook. Several web processes may run it:
+# each board run is queued by exactly one of them.
+ENABLED = os.getenv("MONDAY_SCHEDULER_ENABLED", "true").lower() == "true"
+TICK_SECONDS = float(os.getenv("MONDAY_SCHEDULER_TICK_SECONDS", "30"))
+
+_task: Optional[asyncio.Task] = None
+_drain_task: Optional[asyncio.Task] = None
+
+
+async def tick() -> int:
+    """Queues due syncs once and, with the inline worker, runs them. Returns the number queued."""
+    global _drain_task
+    service = MondayService(api_key=None)
+    with Session(engine) as session:
+        jobs = service.enqueue_due_syncs(session)
+    if jobs and service.INLINE_SYNC_WORKER and (_drain_task is None or _drain_task.done()):
+        # A drain still running claims the new jobs as its current ones finish
+        _drain_task = asyncio.create_task(_drain(service))
+    return len(jobs)
+
+
+async def _drain(service: MondayService):
+    try:
+        with Session(engine) as session:
+            await service.process_queue(session)
+    except Exception as e:
+        print(f"[SCHEDULER] Queue run failed: {e}", flush=True)
+
+
+async def _loop():
+    print(f"[SCHEDULER] Started (every {TICK_SECONDS:.0f}s)", flush=True)
+    while True:
+        try:
+            await tick()
+        except Exception as e:
+            print(f"[SCHEDULER] Tick failed: {e}", flush=True)
+        await asyncio.sleep(TICK_SECONDS)
+
+
+def start_scheduler():
+    global _task
+    if not ENABLED or (_task and not _task.done()):
+        return
+    _task = asyncio.create_task(_loop())
+
+
+async def stop_scheduler():
+    global _task, _drain_task
+    for task in (_task, _drain_task):
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    _task = _drain_task = None
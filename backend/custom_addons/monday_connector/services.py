@@ -2,14 +2,27 @@ import httpx
 from typing import Dict, Any, Optional, List, AsyncGenerator
 import os
 from pathlib import Path
-from sqlmodel import Session, select, delete, func, or_, col
-from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select, delete, update, func, or_, and_, col
+from sqlalchemy import cast, case, Text
+from sqlalchemy.orm import selectinload, aliased
+from sqlalchemy.exc import IntegrityError
 # Changed import from absolute to relative
-from .models import MondayBoard, MondayItem, MondayBoardAccess, MondaySyncJob
+from .models import MondayBoard, MondayItem, MondayItemColumnValue, MondayBarcodeIndex, MondayItemTombstone, MondayAssetBlob, MondayAssetRef, MondayBoardAccess, MondaySyncJob, MondaySyncJobLog, MondayBarcodeConfig, MondayWebhookEvent, MondayPendingWrite
+from . import blob_store, job_events, key_cache
+from .singleflight import query_flights
+from .throttle import MondayAPIError, get_budget, with_complexity, backoff_delay, is_retryable_error, parse_retry_hint
+from app.models.marketplace import InstalledApp, MarketplaceApp
+from app.core.http_client import get_http_client
+from app.core import image_pool
 import json
+import re
+import copy
+import base64
+import hashlib
+import random
 import asyncio
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
 try:
     from PIL import Image
@@ -22,9 +35,66 @@ class MondayService:
     ASSETS_DIR = "assets/monday_files"
     ASSETS_DIR = "assets/monday_files"
     MAX_CONCURRENT_DOWNLOADS = 10 # Increased to 10 for faster sync
-
-    def __init__(self, api_key: str):
+    MAX_QUERY_RETRIES = int(os.getenv("MONDAY_MAX_QUERY_RETRIES", "5"))
+    # Monday item cursors are valid for 60 minutes; keep a safety margin
+    CURSOR_TTL_SECONDS = 55 * 60
+    # Pages buffered between sync pipeline stages (fetch -> assets -> DB). Bounds memory use.
+    SYNC_PIPELINE_DEPTH = int(os.getenv("MONDAY_SYNC_PIPELINE_DEPTH", "2"))
+    # Hard cap on one page of the local items API
+    LOCAL_ITEMS_MAX_LIMIT = 10000
+    # Postgres btree entries are limited to ~2.7kB, so very long texts are indexed by prefix
+    COLUMN_INDEX_TEXT_MAX = 600
+    # Changes feed: deletions are remembered this long; older `since` tokens get a full resync
+    TOMBSTONE_RETENTION_DAYS = int(os.getenv("MONDAY_TOMBSTONE_RETENTION_DAYS", "30"))
+    # updated_at / deleted_at are stamped when a row is written, not when its transaction commits,
+    # so a row can become visible with a stamp older than a token already handed out. The feed
+    # only serves rows stamped at least this long ago, which makes this an upper bound on the
+    # time between stamping and commit (a sync page, a webhook batch). A slower commit is missed
+    # by clients already past it; raise it if page commits take longer.
+    CHANGES_SAFETY_LAG_SECONDS = float(os.getenv("MONDAY_CHANGES_SAFETY_LAG_SECONDS", "5"))
+    CHANGES_MAX_LIMIT = 2000
+    # Derived images. optimized_path is the OPTIMIZED_WIDTH WebP; the thumbnail ladder lets grids and
+    # lists fetch the smallest adequate size (widths at or above the source width are not generated).
+    OPTIMIZED_WIDTH = 800
+    THUMBNAIL_WIDTHS = sorted({int(w) for w in os.getenv("MONDAY_THUMBNAIL_WIDTHS", "128,400,800,1600").split(",") if w.strip()})
+    THUMBNAIL_AVIF = os.getenv("MONDAY_THUMBNAIL_AVIF", "false").lower() == "true"
+    # false = build the ladder lazily on first request (GET .../assets/{asset_id}/thumbnail)
+    THUMBNAILS_ON_SYNC = os.getenv("MONDAY_THUMBNAILS_ON_SYNC", "true").lower() == "true"
+    IMAGE_QUALITY = {"webp": 80, "avif": 60}
+    # Unreferenced blobs are deleted only after this long (see collect_asset_garbage)
+    ASSET_GC_GRACE_SECONDS = int(os.getenv("MONDAY_ASSET_GC_GRACE_SECONDS", "3600"))
+    # Asset fields that only exist locally; kept when an item is re-fetched from Monday
+    LOCAL_ASSET_FIELDS = ("local_path", "optimized_path", "rotation", "thumbnails", "width", "height")
+    # Sync job queue (worker.py). Jobs are leased; a lease not renewed for SYNC_LEASE_SECONDS is recovered.
+    SYNC_LEASE_SECONDS = int(os.getenv("MONDAY_SYNC_LEASE_SECONDS", "120"))
+    SYNC_MAX_ATTEMPTS = int(os.getenv("MONDAY_SYNC_MAX_ATTEMPTS", "5"))
+    # Run queued jobs inside the web process. Turn off when standalone workers drain the queue.
+    INLINE_SYNC_WORKER = os.getenv("MONDAY_SYNC_INLINE_WORKER", "true").lower() == "true"
+    # Job logs: lines kept per job (MondaySyncJobLog), and how often progress-only updates are written
+    JOB_LOG_MAX_LINES = int(os.getenv("MONDAY_JOB_LOG_MAX_LINES", "500"))
+    JOB_PROGRESS_FLUSH_SECONDS = 1.0
+    # Scheduled syncs (scheduler.py): next run = interval * 2^backoff_level, +/- SCHEDULE_JITTER of it
+    SCHEDULE_JITTER = float(os.getenv("MONDAY_SCHEDULE_JITTER", "0.1"))
+    SCHEDULE_MAX_BACKOFF_LEVEL = int(os.getenv("MONDAY_SCHEDULE_MAX_BACKOFF_LEVEL", "3"))
+    SCHEDULE_MIN_INTERVAL_MINUTES = 5
+    # Webhook inbox (webhooks.py): Monday event types that make the consumer re-check the item.
+    # Deletes are confirmed with Monday (the item is gone or archived there), never taken from the payload.
+    WEBHOOK_DELETE_EVENTS = {"delete_pulse", "item_deleted", "archive_pulse", "item_archived"}
+    WEBHOOK_REFRESH_EVENTS = {"update_column_value", "change_column_value", "create_pulse", "create_item",
+                              "update_name", "change_name", "move_pulse_into_board", "restore_pulse"}
+    WEBHOOK_MAX_ATTEMPTS = 5
+    # Batched write-back (batch_update_items): aliased mutations per GraphQL document, at most
+    BATCH_MUTATION_SIZE = int(os.getenv("MONDAY_BATCH_MUTATION_SIZE", "25"))
+    # Write-behind item edits (writeback.py): commit locally, push to Monday in the background.
+    # Per-request override: ?write_behind=true|false on the item edit endpoints.
+    WRITE_BEHIND = os.getenv("MONDAY_WRITE_BEHIND", "false").lower() == "true"
+    WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv("MONDAY_WRITE_BEHIND_MAX_ATTEMPTS", "8"))
+    WRITE_BEHIND_MAX_DELAY_SECONDS = 300.0
+
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key
+        # Shared, pooled client (owned by the app lifespan). Never closed here.
+        self.client = http_client or get_http_client()
         self.headers = {
             "Authorization": self.api_key,
             "Content-Type": "application/json",
@@ -42,6 +112,9 @@ class MondayService:
         # Let's delete items first to be safe.
         statement = delete(MondayItem).where(MondayItem.board_id == board_id)
         session.exec(statement)
+        self._delete_item_indexes(session, board_id=board_id)
+        session.exec(delete(MondayItemTombstone).where(MondayItemTombstone.board_id == board_id))
+        self._drop_asset_refs(session, board_id=board_id)
         
         # 2. Delete Board Access records
         session.exec(delete(MondayBoardAccess).where(MondayBoardAccess.board_id == board_id))
@@ -57,7 +130,8 @@ class MondayService:
             session.rollback()
             raise e
             
-        # 4. Delete Files
+        # 4. Delete Files: shared blobs no other board uses, then any legacy per-item files
+        self.collect_asset_garbage(session)
         board_dir = Path(self.ASSETS_DIR) / str(board_id)
         if board_dir.exists() and board_dir.is_dir():
             try:
@@ -69,29 +143,79 @@ class MondayService:
         return True
 
     async def execute_query(self, query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            payload = {"query": query}
-            if variables:
-                payload["variables"] = variables
-
-            response = await client.post(
+        """
+        Runs a GraphQL query through the shared complexity budget.
+        Retries 429/5xx, network errors and complexity/rate-limit errors with jittered backoff.
+        Raises MondayAPIError on anything else, or once retries are used up.
+        Identical concurrent read queries (same account, query and variables) share one request.
+        """
+        if query.lstrip().startswith("mutation"):
+            return await self._execute_query(query, variables)
+        key = (
+            hashlib.sha256((self.api_key or "").encode("utf-8")).hexdigest(),
+            query,
+            json.dumps(variables or {}, sort_keys=True, default=str),
+        )
+        return await query_flights.do(key, lambda: self._execute_query(query, variables), share=copy.deepcopy)
+
+    async def _execute_query(self, query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
+        query = with_complexity(query)
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+
+        budget = get_budget(self.api_key)
+        attempt = 0
+        while True:
+            await budget.acquire(query)
+            try:
+                data = await self._post_query(payload)
+                budget.record(query, (data.get("data") or {}).get("complexity"))
+                return data
+            except MondayAPIError as e:
+                if not e.retryable or attempt >= self.MAX_QUERY_RETRIES:
+                    raise
+                if "complexity" in str(e).lower():
+                    budget.exhaust(e.retry_after)
+                delay = max(e.retry_after or 0, backoff_delay(attempt))
+                attempt += 1
+                print(f"[MONDAY_RETRY] {e} -> retry {attempt}/{self.MAX_QUERY_RETRIES} in {delay:.1f}s", flush=True)
+                await asyncio.sleep(delay)
+
+    async def _post_query(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Single GraphQL round-trip. Classifies failures as retryable or not."""
+        try:
+            response = await self.client.post(
                 self.BASE_URL,
                 json=payload,
                 headers=self.headers,
                 timeout=60.0 # Increased from 30.0
             )
-            try:
-                response.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                # Log or re-raise with more info if needed
-                raise Exception(f"Monday API Error: {response.text}")
-                
-            data = response.json()
-            if "errors" in data:
-                raise Exception(f"Monday GraphQL Error: {data['errors']}")
-                
-            return data
+        except httpx.TransportError as e:
+            raise MondayAPIError(f"Monday API Error: {type(e).__name__}: {e}", retryable=True)
+
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("retry-after")
+            raise MondayAPIError(
+                f"Monday API Error: {response.text}",
+                status_code=response.status_code,
+                retryable=True,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else parse_retry_hint(response.text)
+            )
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            # Log or re-raise with more info if needed
+            raise MondayAPIError(f"Monday API Error: {response.text}", status_code=response.status_code)
+            
+        data = response.json()
+        if "errors" in data or "error_code" in data:
+            errors = data.get("errors") or data.get("error_message") or data.get("error_code")
+            message = f"Monday GraphQL Error: {errors}"
+            raise MondayAPIError(message, status_code=response.status_code, retryable=is_retryable_error(str(errors)), retry_after=parse_retry_hint(str(errors)))
             
+        return data
+
     async def test_connection(self) -> bool:
         try:
             query = "{ me { id name } }"
@@ -156,8 +280,8 @@ class MondayService:
         session.exec(statement)
         session.commit()
         
-    async def get_board_items(self, board_id: int, limit: int = 50, cursor: str = None) -> dict:
-        # If cursor is provided, use it directly
+    async def get_board_items(self, board_id: int, limit: int = 50, cursor: str = None, query_params: Dict[str, Any] = None) -> dict:
+        # If cursor is provided, use it directly (the cursor already carries any query_params)
         if cursor:
             query = """
             query next_items_page($limit: Int!, $cursor: String!) {
@@ -193,6 +317,47 @@ class MondayService:
                 "items": items_page.get("items", []),
                 "cursor": items_page.get("cursor")
             }
+        elif query_params:
+            # Filtered initial fetch (e.g. items updated since the last sync)
+            query = """
+            query board_items($boardId: [ID!], $limit: Int!, $queryParams: ItemsQuery) {
+                boards (ids: $boardId) {
+                    items_page (limit: $limit, query_params: $queryParams) {
+                        cursor
+                        items {
+                            id
+                            name
+                            column_values {
+                                id
+                                text
+                                value
+                                type
+                            }
+                            assets {
+                                id
+                                name
+                                url
+                                public_url
+                                file_extension
+                            }
+                        }
+                    }
+                }
+            }
+            """
+            variables = {
+                "boardId": [board_id],
+                "limit": limit,
+                "queryParams": query_params
+            }
+            # No legacy fallback here: the caller falls back to a full sync instead.
+            data = await self.execute_query(query, variables)
+            boards_data = data.get("data", {}).get("boards", [])
+            items_page = boards_data[0].get("items_page", {}) if boards_data else {}
+            return {
+                "items": (items_page or {}).get("items", []),
+                "cursor": (items_page or {}).get("cursor")
+            }
         else:
             # Initial fetch
             query = """
@@ -283,7 +448,50 @@ class MondayService:
             return { "items": items, "cursor": None }
 
 
-    async def _process_asset(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, board_id: int, item_id: str, asset: Dict, optimize: bool, force: bool, keep_original: bool) -> Dict[str, Any]:
+    async def get_board_item_ids(self, board_id: int, page_size: int = 500) -> set:
+        """
+        Cheap ID-only sweep of a board. Used to prune deleted items when
+        a sync only fetched the items that changed.
+        """
+        query = """
+        query board_item_ids($boardId: [ID!], $limit: Int!) {
+            boards (ids: $boardId) {
+                items_page (limit: $limit) {
+                    cursor
+                    items { id }
+                }
+            }
+        }
+        """
+        data = await self.execute_query(query, {"boardId": [board_id], "limit": page_size})
+        boards_data = data.get("data", {}).get("boards", [])
+        if not boards_data:
+            raise Exception(f"Board {board_id} not found")
+
+        items_page = boards_data[0].get("items_page") or {}
+        ids = {int(i["id"]) for i in items_page.get("items", [])}
+        cursor = items_page.get("cursor")
+
+        next_query = """
+        query next_item_ids($limit: Int!, $cursor: String!) {
+            next_items_page (limit: $limit, cursor: $cursor) {
+                cursor
+                items { id }
+            }
+        }
+        """
+        while cursor:
+            data = await self.execute_query(next_query, {"limit": page_size, "cursor": cursor})
+            items_page = data.get("data", {}).get("next_items_page") or {}
+            ids.update(int(i["id"]) for i in items_page.get("items", []))
+            new_cursor = items_page.get("cursor")
+            if new_cursor == cursor:
+                raise Exception("Cursor not advancing during ID sweep")
+            cursor = new_cursor
+
+        return ids
+
+    async def _process_asset(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, board_id: int, item_id: str, asset: Dict, optimize: bool, force: bool, keep_original: bool, existing: Dict = None) -> Dict[str, Any]:
         """
         Downloads and optionally optimizes an asset with concurrency control.
         """
@@ -299,138 +507,95 @@ class MondayService:
             print(f"DEBUG: Skipping asset {asset_id} - No URL found. Keys: {asset.keys()}")
             return None 
 
-        # Base Directory: assets/monday_files/{board_id}/{item_id}
-        base_dir = Path(self.ASSETS_DIR) / str(board_id) / str(item_id)
-        # DEBUG: Print resolved path
-        try:
-            abs_path = base_dir.resolve()
-            print(f"DEBUG: Saving asset {asset_id} to: {abs_path}")
-        except:
-            print(f"DEBUG: Saving asset {asset_id} to: {base_dir} (resolution failed)")
-
-        base_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Sanitize filename
+        # Files go to the content-addressed store (blob_store.py): identical bytes are stored,
+        # and optimized, once however many items/assets reference them.
+        # `existing` is this asset's entry from the last sync; its paths are the item's pointers.
+        existing = existing or {}
         original_name = asset.get("name", f"asset_{asset_id}")
-        
-        # FIX: Handle Duplicate Filenames
-        # Prepend asset_id to ensure uniqueness even if multiple files have same name 'image.jpg'
-        # Unicode-safe sanitization: allow letters/numbers from any language, plus basic safe chars
-        safe_original_name = "".join([c for c in original_name if c.isalnum() or c in ('-', '_', '.', ' ', '(', ')', '[', ']')]).strip()
-        safe_name = f"{asset_id}_{safe_original_name}"
-        
-        local_file_path = base_dir / safe_name
-        optimized_file_path = base_dir / f"opt_{Path(safe_name).stem}.webp"
-
-        # Web Paths
-        web_path_base = f"/assets/monday_files/{board_id}/{item_id}"
-        web_path = f"{web_path_base}/{safe_name}"
-        opt_web_path = f"{web_path_base}/{optimized_file_path.name}"
+        ext = asset.get("file_extension") or Path(original_name).suffix
 
-        stats = {"original_size": 0, "optimized_size": 0, "original_deleted": False, "downloaded": False, "optimized": False}
+        stats = {"original_size": 0, "optimized_size": 0, "original_deleted": False, "downloaded": False, "optimized": False, "deduplicated": False}
         result_update = {}
 
         # Helpers for async execution
         loop = asyncio.get_running_loop()
 
-        def _check_exists(p: Path) -> bool:
-            return p.exists()
-
-        def _get_size(p: Path) -> int:
-            return p.stat().st_size
-
-        def _write_file(p: Path, content: bytes):
-            with open(p, "wb") as f:
-                f.write(content)
-
-        def _delete_file(p: Path):
+        def _ingest_legacy(path_str: Optional[str]) -> Optional[str]:
+            # Files from before the blob store live under {board_id}/{item_id}/; move them in
+            if not path_str:
+                return None
+            p = Path(path_str.lstrip("/\\"))
+            if not p.is_file():
+                return None
+            key, _ = blob_store.put_bytes(p.read_bytes(), p.suffix)
             p.unlink(missing_ok=True)
+            return key
 
         async with semaphore:
             try:
-                # Check existance
-                original_exists = await loop.run_in_executor(None, _check_exists, local_file_path)
-                optimized_exists = await loop.run_in_executor(None, _check_exists, optimized_file_path)
-                
-                # Logic:
-                # If force=True, download everything again.
-                # If not force:
-                #   If optimize=True:
-                #       If opt exists, we are good (unless we want to verify original?).
-                #       If opt missing, we need original. If original missing, download.
-                #   If optimize=False:
-                #       If original exists, good. Else download.
-                
-                need_download = False
-                need_optimize = False
-                
-                if force:
-                    need_download = True
-                    need_optimize = optimize and Image is not None
-                else:
-                    if optimize and Image:
-                        if not optimized_exists:
-                            need_optimize = True
-                            if not original_exists:
-                                need_download = True
-                    else:
-                        if not original_exists:
-                            need_download = True
-
-                if not need_download and not need_optimize:
-                    # Even if no download needed, if files exist, we should return their paths 
-                    # so they are saved/updated in the item's assets field.
-                    if original_exists:
-                        result_update["local_path"] = web_path
-                    if optimized_exists:
-                        result_update["optimized_path"] = opt_web_path
-                    
-                    if result_update:
-                        return {"asset_id": asset_id, "updates": result_update, "stats": stats}
-                    return None
+                original_key = optimized_key = None
+                if not force:
+                    original_key = blob_store.key_from_web_path(existing.get("local_path"))
+                    optimized_key = blob_store.key_from_web_path(existing.get("optimized_path"))
+                    if not original_key and existing.get("local_path"):
+                        original_key = await loop.run_in_executor(None, _ingest_legacy, existing.get("local_path"))
+                    if not optimized_key and existing.get("optimized_path"):
+                        optimized_key = await loop.run_in_executor(None, _ingest_legacy, existing.get("optimized_path"))
+                    if original_key and not await loop.run_in_executor(None, blob_store.exists, original_key):
+                        original_key = None
+                    if optimized_key and not await loop.run_in_executor(None, blob_store.exists, optimized_key):
+                        optimized_key = None
+
+                want_optimized = optimize and Image is not None
+                # The original is only needed if we keep it, or still have to derive the optimized copy from it
+                need_download = original_key is None and (not want_optimized or optimized_key is None)
 
                 if need_download:
                     response = await client.get(url, follow_redirects=True)
-                    if response.status_code == 200:
-                        # Blocking Write -> Async
-                        print(f"DEBUG: writing file content to {local_file_path}, type: {type(response.content)}, len: {len(response.content)}")
-                        await loop.run_in_executor(None, _write_file, local_file_path, response.content)
-                        
-                        result_update["local_path"] = web_path
-                        stats["original_size"] = await loop.run_in_executor(None, _get_size, local_file_path)
-                        stats["downloaded"] = True
-                    else:
+                    if response.status_code != 200:
                         print(f"Failed to download {url}: {response.status_code}")
                         return None
-                elif original_exists:
-                     stats["original_size"] = await loop.run_in_executor(None, _get_size, local_file_path)
-                     # Ensure we know the path
-                     if not result_update.get("local_path"):
-                         result_update["local_path"] = web_path
-
-                # Optimize
-                if need_optimize:
-                    # check existence again in case download failed?
-                    if await loop.run_in_executor(None, _check_exists, local_file_path):
-                        try:
-                            # _optimize_image_sync is already a helper, just run it
-                            await loop.run_in_executor(None, self._optimize_image_sync, local_file_path, optimized_file_path)
-                            
-                            stats["optimized_size"] = await loop.run_in_executor(None, _get_size, optimized_file_path)
-                            stats["optimized"] = True
-                            result_update["optimized_path"] = opt_web_path
-                        except Exception as e:
-                            print(f"Optimization failed: {e}")
-
-                # Check Keep Original Logic
-                # Only delete if we have a valid optimized file
-                if not keep_original:
-                     if await loop.run_in_executor(None, _check_exists, optimized_file_path):
-                         await loop.run_in_executor(None, _delete_file, local_file_path)
-                         stats["original_deleted"] = True
-                         stats["original_size"] = 0
-                         result_update["local_path"] = None 
-                
+                    original_key, created = await loop.run_in_executor(None, blob_store.put_bytes, response.content, ext)
+                    stats["downloaded"] = True
+                    stats["deduplicated"] = not created
+                    if not created:
+                        print(f"DEBUG: Asset {asset_id} is a duplicate of blob {original_key}")
+
+                # Optimized copy + thumbnail ladder (derived once per distinct original)
+                if want_optimized and (original_key or optimized_key):
+                    specs = [] if optimized_key else [(self.OPTIMIZED_WIDTH, "webp", True)]
+                    if self.THUMBNAILS_ON_SYNC:
+                        specs += self._thumbnail_specs(existing.get("width"))
+                    try:
+                        derived = await self._build_derived_images(original_key or optimized_key, specs, label=f"asset {asset_id}")
+                    except Exception as e:
+                        print(f"Optimization failed: {e}")
+                        derived = {"keys": {}}
+                    stats["optimized"] = derived.get("built", 0) > 0
+                    optimized_key = optimized_key or derived["keys"].get((self.OPTIMIZED_WIDTH, "webp"))
+                    # Dimensions of the original (or of the best local copy when only that is left)
+                    if derived.get("width") and (original_key or not existing.get("width")):
+                        result_update["width"], result_update["height"] = derived["width"], derived["height"]
+                    if self.THUMBNAILS_ON_SYNC:
+                        result_update["thumbnails"] = self._thumbnail_list(derived["keys"], result_update.get("width") or existing.get("width"))
+
+                if original_key:
+                    result_update["local_path"] = blob_store.web_path(original_key)
+                if optimized_key:
+                    result_update["optimized_path"] = blob_store.web_path(optimized_key)
+
+                # Keep Original Logic: drop this item's pointer only if a valid optimized copy exists.
+                # The shared file itself goes once no item references it (collect_asset_garbage).
+                if not keep_original and optimized_key and original_key:
+                    original_key = None
+                    stats["original_deleted"] = True
+                    result_update["local_path"] = None
+
+                if original_key:
+                    stats["original_size"] = await loop.run_in_executor(None, blob_store.size, original_key)
+                if optimized_key:
+                    stats["optimized_size"] = await loop.run_in_executor(None, blob_store.size, optimized_key)
+
                 if result_update:
                      return {"asset_id": asset_id, "updates": result_update, "stats": stats}
                 return None
@@ -439,28 +604,627 @@ class MondayService:
                 print(f"Asset error {asset_id}: {e}")
                 return None
 
-    def _optimize_image_sync(self, input_path: Path, output_path: Path):
+    def _thumbnail_specs(self, source_width: Optional[int] = None) -> List[tuple]:
+        """(width, format, always) for each ladder entry worth generating for a source this wide."""
+        formats = ["webp"] + (["avif"] if self.THUMBNAIL_AVIF else [])
+        return [(w, fmt, False) for w in self.THUMBNAIL_WIDTHS for fmt in formats if not source_width or w < source_width]
+
+    def _thumbnail_list(self, keys: Dict[tuple, str], source_width: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The `thumbnails` entry of an asset: ladder images that exist, smallest first."""
+        ladder = {(w, fmt) for w, fmt, _ in self._thumbnail_specs(source_width)}
+        return [
+            {"width": w, "format": fmt, "path": blob_store.web_path(keys[(w, fmt)])}
+            for w, fmt in sorted(keys) if (w, fmt) in ladder
+        ]
+
+    async def _build_derived_images(self, source_key: str, specs: List[tuple], label: str = "") -> Dict[str, Any]:
         """
-        Synchronous helper for image optimization to be run in a thread pool.
+        Makes sure the derived blobs for `specs` [(width, format, always)] exist, writing the missing
+        ones from `source_key` in a single image pool job (one decode per source).
+        Returns {"keys": {(width, format): key}, "built": n}, plus the source "width"/"height" if it was decoded.
+        Entries skipped because the source is not wider than them are absent from "keys".
         """
-        if not Image: return
-        
-        with Image.open(input_path) as img:
-            target_w = 800
-            if img.width > target_w:
-                ratio = target_w / float(img.width)
-                h_size = int((float(img.height) * float(ratio)))
-                img = img.resize((target_w, h_size), Image.Resampling.LANCZOS)
-            
-            img.save(output_path, "WEBP", quality=80)
+        loop = asyncio.get_running_loop()
+        keys: Dict[tuple, str] = {}
+        result = {"keys": keys, "built": 0}
+        wanted = {}
+        for width, fmt, always in specs:
+            wanted[(width, fmt)] = wanted.get((width, fmt), False) or always
+
+        # Serialized per content family, so concurrent assets with the same content derive it once
+        async with blob_store.key_lock(source_key.split(".", 1)[0]):
+            todo = {}
+            for (width, fmt), always in wanted.items():
+                key = blob_store.variant_key(source_key, f"w{width}", fmt)
+                if await loop.run_in_executor(None, blob_store.exists, key):
+                    keys[(width, fmt)] = key
+                else:
+                    target = blob_store.blob_path(key)
+                    todo[str(target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp"))] = (width, fmt, always, key)
+            if not todo:
+                return result
+
+            outputs = [(width, fmt, self.IMAGE_QUALITY.get(fmt, 80), tmp, always) for tmp, (width, fmt, always, _) in todo.items()]
+            try:
+                for tmp in todo:
+                    Path(tmp).parent.mkdir(parents=True, exist_ok=True)
+                built = await image_pool.get_image_pool().run(
+                    image_pool.build_thumbnails, str(blob_store.blob_path(source_key)), outputs, label=label
+                )
+                for tmp in built["written"]:
+                    width, fmt, _, key = todo[tmp]
+                    os.replace(tmp, blob_store.blob_path(key))
+                    keys[(width, fmt)] = key
+                result.update(built=len(built["written"]), width=built["width"], height=built["height"])
+            finally:
+                for tmp in todo:
+                    Path(tmp).unlink(missing_ok=True)
+        return result
+
+    async def get_asset_thumbnail(self, session: Session, item: MondayItem, asset_id: str, width: int, fmt: str = "webp") -> Optional[str]:
+        """
+        Web path of the smallest thumbnail at least `width` wide for an item's asset.
+        Builds the missing ladder from the local copy on first request and records it on the item
+        (updated_at is left alone: derived images are not a change clients need to re-sync).
+        Falls back to the optimized/original file when no ladder image is wide enough. Commits.
+        """
+        asset = (item.assets or {}).get(asset_id)
+        if not asset:
+            return None
+        if fmt != "webp" and not (fmt == "avif" and self.THUMBNAIL_AVIF):
+            fmt = "webp"
+        loop = asyncio.get_running_loop()
+
+        def _stored(path: Optional[str]) -> Optional[str]:
+            key = blob_store.key_from_web_path(path)
+            return key if key and blob_store.exists(key) else None
+
+        thumbnails = asset.get("thumbnails") or []
+        recorded = {(t.get("width"), t.get("format")): t.get("path") for t in thumbnails if isinstance(t, dict)}
+        specs = self._thumbnail_specs(asset.get("width"))
+        complete = True
+        for w, f, _ in specs:
+            if not recorded.get((w, f)) or not await loop.run_in_executor(None, _stored, recorded[(w, f)]):
+                complete = False
+                break
+
+        source_key = await loop.run_in_executor(None, _stored, asset.get("local_path"))
+        source_key = source_key or await loop.run_in_executor(None, _stored, asset.get("optimized_path"))
+        if not complete and source_key:
+            derived = await self._build_derived_images(source_key, specs, label=f"item {item.id} asset {asset_id}")
+            asset = dict(asset)
+            if derived.get("width") and (blob_store.key_from_web_path(asset.get("local_path")) == source_key or not asset.get("width")):
+                asset["width"], asset["height"] = derived["width"], derived["height"]
+            asset["thumbnails"] = thumbnails = self._thumbnail_list(derived["keys"], asset.get("width"))
+            new_assets = dict(item.assets)
+            new_assets[asset_id] = asset
+            item.assets = new_assets
+            session.add(item)
+            self._sync_asset_refs(session, [{"id": item.id, "board_id": item.board_id, "assets": new_assets}])
+            session.commit()
+
+        candidates = sorted(t["width"] for t in thumbnails if t.get("format") == fmt and t["width"] >= width)
+        if candidates:
+            return next(t["path"] for t in thumbnails if t.get("format") == fmt and t["width"] == candidates[0])
+        for field in (("optimized_path", "local_path") if width <= self.OPTIMIZED_WIDTH else ("local_path", "optimized_path")):
+            path = asset.get(field)
+            if path and Path(path.lstrip("/\\")).is_file():
+                return path
+        return None
+
+    @staticmethod
+    def _parse_column_values(item: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Converts Monday's column_values list into the {col_id: {text, value, type}} map we store.
+        """
+        col_values = {}
+        for cv in item.get("column_values", []):
+            val_text = cv.get("text")
+            val_value = cv.get("value")
+            val_type = cv.get("type")
+
+            # FALLBACK: If text is missing but value exists (Auto Number, Formula, etc.)
+            if not val_text and val_value:
+                try:
+                    val_obj = json.loads(val_value)
+                    # Common patterns
+                    if "value" in val_obj: # Auto Number often {"value": 123}
+                        val_text = str(val_obj["value"])
+                    elif "formula_result" in val_obj:
+                        val_text = str(val_obj["formula_result"])
+                    # Add more heuristics if needed
+                except:
+                    pass # Keep empty if parse fails
+
+            col_values[cv["id"]] = {
+                "text": val_text,
+                "value": val_value,
+                "type": val_type
+            }
+        return col_values
+
+    @staticmethod
+    def _item_matches_filters(item: Dict[str, Any], filters: List[Dict]) -> bool:
+        """
+        Applies the sync filters ({column, value, condition}) to a raw Monday item.
+        Items that fail evaluation are skipped - safer than syncing what we can't verify.
+        """
+        try:
+            for f in filters:
+                if f.get("condition") == "is_duplicate": continue
+                if not f.get("value"): continue
+
+                col_id = f.get("column", "all")
+                # Safe string conversion
+                query_val = str(f.get("value", "")).lower()
+
+                if col_id == "all":
+                    # Search name + all columns
+                    if query_val in str(item.get("name", "")).lower():
+                        continue
+                    if not any(c.get("text") and query_val in str(c.get("text")).lower() for c in item.get("column_values", [])):
+                        return False
+                else:
+                    item_val = ""
+                    if col_id == "name":
+                        item_val = str(item.get("name", ""))
+                    else:
+                        # Find column safely
+                        c_val = next((c for c in item.get("column_values", []) if c.get("id") == col_id), None)
+                        item_val = str(c_val.get("text", "")) if c_val else ""
+                    if query_val not in item_val.lower():
+                        return False
+            return True
+        except Exception as e:
+            print(f"Filter error on item {item.get('id')}: {e}")
+            return False
+
+    def _load_existing_assets(self, session: Session, item_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Returns {item_id: assets} for the items that already exist locally, in one IN (...) query.
+        """
+        if not item_ids:
+            return {}
+        rows = session.exec(select(MondayItem.id, MondayItem.assets).where(col(MondayItem.id).in_(item_ids))).all()
+        return {row[0]: (row[1] or {}) for row in rows}
+
+    def _load_asset_refs(self, session: Session, item_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Asset paths from the blob store refs, as {item_id: {asset_id: {local_path, optimized_path}}}.
+        Covers items removed by clear_db, whose files are still stored.
+        """
+        result = {}
+        for chunk in self._chunks(list(item_ids), 500):
+            for ref in session.exec(select(MondayAssetRef).where(col(MondayAssetRef.item_id).in_(chunk))).all():
+                field = "local_path" if ref.variant == "original" else "optimized_path"
+                result.setdefault(ref.item_id, {}).setdefault(ref.asset_id, {})[field] = blob_store.web_path(ref.blob_key)
+        return result
+
+    def _bulk_upsert_items(self, session: Session, rows: List[Dict[str, Any]], existing_ids: set = None) -> tuple:
+        """
+        Writes a page of items in a single statement.
+        Uses INSERT ... ON CONFLICT DO UPDATE on Postgres/SQLite, falls back to one
+        IN (...) load plus ORM updates on other dialects. Does NOT commit.
+        Returns (added_count, updated_count).
+        """
+        if not rows:
+            return 0, 0
+
+        now = datetime.utcnow()
+        for row in rows:
+            row["updated_at"] = now
+        self._overlay_pending_writes(session, rows)
+
+        if existing_ids is None:
+            existing_ids = set(session.exec(select(MondayItem.id).where(col(MondayItem.id).in_([r["id"] for r in rows]))).all())
+        added_count = sum(1 for r in rows if r["id"] not in existing_ids)
+        updated_count = len(rows) - added_count
+
+        dialect = session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+            table = MondayItem.__table__
+            stmt = dialect_insert(table).values(rows)
+            # Only re-stamp rows whose content changed, so the changes feed stays small after a full sync
+            changed = or_(
+                table.c.board_id.is_distinct_from(stmt.excluded.board_id),
+                table.c.name.is_distinct_from(stmt.excluded.name),
+                cast(table.c.column_values, Text).is_distinct_from(cast(stmt.excluded.column_values, Text)),
+                cast(table.c.assets, Text).is_distinct_from(cast(stmt.excluded.assets, Text)),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.id],
+                set_={
+                    "board_id": stmt.excluded.board_id,
+                    "name": stmt.excluded.name,
+                    "column_values": stmt.excluded.column_values,
+                    "assets": stmt.excluded.assets,
+                    "updated_at": case((changed, stmt.excluded.updated_at), else_=table.c.updated_at),
+                }
+            )
+            session.exec(stmt)
+        else:
+            existing = {
+                i.id: i for i in session.exec(select(MondayItem).where(col(MondayItem.id).in_([r["id"] for r in rows]))).all()
+            }
+            for row in rows:
+                db_item = existing.get(row["id"])
+                if db_item:
+                    if (db_item.board_id, db_item.name, db_item.column_values, db_item.assets) == (row["board_id"], row["name"], row["column_values"], row["assets"]):
+                        continue
+                    db_item.board_id = row["board_id"]
+                    db_item.name = row["name"]
+                    db_item.column_values = row["column_values"]
+                    db_item.assets = row["assets"]
+                    db_item.updated_at = row["updated_at"]
+                    session.add(db_item)
+                else:
+                    session.add(MondayItem(**row))
+
+        self._sync_column_index(session, rows)
+        # Items that came back are no longer deleted
+        session.exec(delete(MondayItemTombstone).where(col(MondayItemTombstone.item_id).in_([r["id"] for r in rows])))
+        self._sync_asset_refs(session, rows)
+
+        return added_count, updated_count
+
+    # --- Content-addressed asset store bookkeeping ---
+
+    @staticmethod
+    def _asset_ref_rows(item_id: int, board_id: int, assets: Dict) -> List[Dict[str, Any]]:
+        """MondayAssetRef rows for an item's asset map: its local paths are the pointers."""
+        refs = []
+        for asset_id, data in (assets or {}).items():
+            data = data or {}
+            paths = [("original", data.get("local_path")), ("optimized", data.get("optimized_path"))]
+            paths += [(f"w{t.get('width')}.{t.get('format')}", t.get("path")) for t in data.get("thumbnails") or [] if isinstance(t, dict)]
+            for variant, path in paths:
+                key = blob_store.key_from_web_path(path)
+                if key:
+                    refs.append({"item_id": item_id, "asset_id": str(asset_id), "variant": variant, "board_id": board_id, "blob_key": key})
+        return refs
+
+    def _recount_blobs(self, session: Session, keys: set):
+        """Recomputes ref_count for these blobs from MondayAssetRef. Does NOT commit."""
+        keys = list(keys)
+        now = datetime.utcnow()
+        ref_count = select(func.count()).where(MondayAssetRef.blob_key == MondayAssetBlob.key).scalar_subquery()
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            session.exec(update(MondayAssetBlob).where(col(MondayAssetBlob.key).in_(chunk)).values(ref_count=ref_count, updated_at=now))
+
+    def _sync_asset_refs(self, session: Session, rows: List[Dict[str, Any]]):
+        """
+        Replaces the asset refs of these items ({id, board_id, assets}), registers new blobs
+        and updates ref counts. Does NOT commit; unreferenced files go in collect_asset_garbage.
+        """
+        item_ids = [r["id"] for r in rows]
+        new_refs = []
+        for r in rows:
+            new_refs.extend(self._asset_ref_rows(r["id"], r["board_id"], r.get("assets")))
+
+        touched = set()
+        for chunk in self._chunks(item_ids, 500):
+            touched.update(session.exec(select(MondayAssetRef.blob_key).where(col(MondayAssetRef.item_id).in_(chunk))).all())
+            session.exec(delete(MondayAssetRef).where(col(MondayAssetRef.item_id).in_(chunk)))
+        if not new_refs and not touched:
+            return
 
-    async def sync_board(self, session: Session, board_id: int, download_assets: bool = False, optimize_images: bool = False, force_sync_images: bool = False, keep_original_images: bool = True, filters: List[Dict] = None, filtered_item_ids: List[str] = None) -> AsyncGenerator[str, None]:
+        new_keys = {r["blob_key"] for r in new_refs}
+        known = set()
+        for chunk in self._chunks(list(new_keys), 500):
+            known.update(session.exec(select(MondayAssetBlob.key).where(col(MondayAssetBlob.key).in_(chunk))).all())
+        missing = [{"key": k, "size_bytes": blob_store.size(k), "ref_count": 0, "created_at": datetime.utcnow(), "updated_at": datetime.utcnow()} for k in new_keys - known]
+        for chunk in self._chunks(missing, 200):
+            session.exec(MondayAssetBlob.__table__.insert().values(chunk))
+        for chunk in self._chunks(new_refs, 200):
+            session.exec(MondayAssetRef.__table__.insert().values(chunk))
+
+        self._recount_blobs(session, touched | new_keys)
+
+    def _drop_asset_refs(self, session: Session, item_ids: List[int] = None, board_id: int = None, variant: str = None):
+        """
+        Removes asset refs for items or a whole board. Does NOT commit.
+        variant: None = all, "original" = originals only, "optimized" = every derived copy (incl. thumbnails).
+        """
+        conditions = []
+        if board_id is not None:
+            conditions.append(MondayAssetRef.board_id == board_id)
+        if variant == "original":
+            conditions.append(MondayAssetRef.variant == "original")
+        elif variant is not None:
+            conditions.append(MondayAssetRef.variant != "original")
+        touched = set()
+        if item_ids is not None:
+            for chunk in self._chunks(list(item_ids), 500):
+                where = conditions + [col(MondayAssetRef.item_id).in_(chunk)]
+                touched.update(session.exec(select(MondayAssetRef.blob_key).where(*where)).all())
+                session.exec(delete(MondayAssetRef).where(*where))
+        else:
+            touched.update(session.exec(select(MondayAssetRef.blob_key).where(*conditions)).all())
+            session.exec(delete(MondayAssetRef).where(*conditions))
+        self._recount_blobs(session, touched)
+
+    def collect_asset_garbage(self, session: Session) -> int:
+        """
+        Deletes blobs no item has referenced for ASSET_GC_GRACE_SECONDS (files, then rows) and
+        commits. Returns the bytes freed. Syncs call it once their pipeline is done, and the
+        grace period covers other syncs still running: a blob they just released or picked up
+        again, with refs not committed yet, is left alone. Since every finished sync collects,
+        an orphan older than the grace period is almost never still in use.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ASSET_GC_GRACE_SECONDS)
+        orphans = session.exec(
+            select(MondayAssetBlob.key).where(MondayAssetBlob.ref_count <= 0, MondayAssetBlob.updated_at < cutoff)
+        ).all()
+        if not orphans:
+            return 0
+        freed = 0
+        for key in orphans:
+            freed += blob_store.delete(key)
+        for chunk in self._chunks(list(orphans), 500):
+            session.exec(delete(MondayAssetBlob).where(col(MondayAssetBlob.key).in_(chunk), MondayAssetBlob.ref_count <= 0, MondayAssetBlob.updated_at < cutoff))
+        session.commit()
+        print(f"[ASSETS] Freed {len(orphans)} unreferenced blob(s), {freed / (1024 * 1024):.2f} MB", flush=True)
+        return freed
+
+    @staticmethod
+    def _chunks(values: List[Any], size: int):
+        for i in range(0, len(values), size):
+            yield values[i:i + size]
+
+    def _write_tombstones(self, session: Session, board_id: int, item_ids: List[int]):
+        """Records deletions for the changes feed and drops expired tombstones. Does NOT commit."""
+        now = datetime.utcnow()
+        item_ids = [int(i) for i in item_ids]
+        table = MondayItemTombstone.__table__
+        for i in range(0, len(item_ids), 500):
+            chunk = item_ids[i:i + 500]
+            session.exec(delete(MondayItemTombstone).where(col(MondayItemTombstone.item_id).in_(chunk)))
+            session.exec(table.insert().values([{"item_id": item_id, "board_id": board_id, "deleted_at": now} for item_id in chunk]))
+        expired = now - timedelta(days=self.TOMBSTONE_RETENTION_DAYS)
+        session.exec(delete(MondayItemTombstone).where(MondayItemTombstone.deleted_at < expired))
+
+    @staticmethod
+    def _column_value_map(column_values: Any) -> Dict[str, Dict[str, Any]]:
+        """
+        Normalizes stored column_values to {col_id: {text, value, type}}.
+        Old syncs and local edits left some rows as a Monday-style list.
+        """
+        if isinstance(column_values, dict):
+            return column_values
+        if isinstance(column_values, list):
+            return {cv["id"]: cv for cv in column_values if isinstance(cv, dict) and cv.get("id")}
+        return {}
+
+    @classmethod
+    def _column_index_rows(cls, item_id: int, board_id: int, column_values: Any) -> List[Dict[str, Any]]:
+        rows = []
+        for col_id, data in cls._column_value_map(column_values).items():
+            text_val = (data or {}).get("text")
+            if text_val is None or text_val == "":
+                continue  # Missing rows sort/filter as empty text
+            text_val = str(text_val)
+            try:
+                numeric_value = float(text_val.strip())
+            except ValueError:
+                numeric_value = None
+            rows.append({
+                "item_id": item_id,
+                "board_id": board_id,
+                "column_id": col_id,
+                "text": text_val[:cls.COLUMN_INDEX_TEXT_MAX],
+                "numeric_value": numeric_value,
+            })
+        return rows
+
+    def _delete_item_indexes(self, session: Session, item_ids: List[int] = None, board_id: int = None):
+        """Removes column and barcode index rows for the given items, or for a whole board. Does NOT commit."""
+        if board_id is not None:
+            session.exec(delete(MondayItemColumnValue).where(MondayItemColumnValue.board_id == board_id))
+            session.exec(delete(MondayBarcodeIndex).where(MondayBarcodeIndex.board_id == board_id))
+            return
+        item_ids = list(item_ids or [])
+        for i in range(0, len(item_ids), 500):
+            chunk = item_ids[i:i + 500]
+            session.exec(delete(MondayItemColumnValue).where(col(MondayItemColumnValue.item_id).in_(chunk)))
+            session.exec(delete(MondayBarcodeIndex).where(col(MondayBarcodeIndex.item_id).in_(chunk)))
+
+    def _sync_column_index(self, session: Session, items: List[Dict[str, Any]]):
+        """
+        Rewrites the MondayItemColumnValue and MondayBarcodeIndex rows for these items
+        ({id, board_id, name, column_values}).
+        Does NOT commit - callers write it in the same transaction as the items.
+        """
+        if not items:
+            return
+        self._delete_item_indexes(session, item_ids=[i["id"] for i in items])
+        index_rows = []
+        for item in items:
+            index_rows.extend(self._column_index_rows(item["id"], item["board_id"], item.get("column_values")))
+        table = MondayItemColumnValue.__table__
+        # 200 rows x 5 columns stays well under SQLite's bound-parameter limit
+        for i in range(0, len(index_rows), 200):
+            session.exec(table.insert().values(index_rows[i:i + 200]))
+        self._insert_barcode_index(session, items)
+
+    @staticmethod
+    def normalize_code(code: Any) -> str:
+        """Scanner/input normalization: no whitespace, case-insensitive."""
+        return re.sub(r"\s+", "", str(code or "")).casefold()
+
+    @staticmethod
+    def _barcode_columns(config: MondayBarcodeConfig) -> List[str]:
+        # The app searches by name when no search column is configured
+        columns = [config.barcode_column_id, config.search_column_id or "name"]
+        return list(dict.fromkeys(c for c in columns if c))
+
+    def _insert_barcode_index(self, session: Session, items: List[Dict[str, Any]]):
+        """Adds barcode index rows for items whose board has a barcode config. Does NOT commit."""
+        board_ids = {i["board_id"] for i in items}
+        configs = {
+            c.board_id: c for c in session.exec(select(MondayBarcodeConfig).where(col(MondayBarcodeConfig.board_id).in_(board_ids))).all()
+        }
+        if not configs:
+            return
+        code_rows = []
+        for item in items:
+            config = configs.get(item["board_id"])
+            if not config:
+                continue
+            values = self._column_value_map(item.get("column_values"))
+            for column_id in self._barcode_columns(config):
+                raw = item.get("name") if column_id == "name" else (values.get(column_id) or {}).get("text")
+                code = self.normalize_code(raw)[:self.COLUMN_INDEX_TEXT_MAX]
+                if code:
+                    code_rows.append({"item_id": item["id"], "board_id": item["board_id"], "column_id": column_id, "code": code})
+        table = MondayBarcodeIndex.__table__
+        for i in range(0, len(code_rows), 200):
+            session.exec(table.insert().values(code_rows[i:i + 200]))
+
+    def rebuild_barcode_index(self, session: Session, board_id: int = None, batch_size: int = 1000) -> int:
+        """
+        Rebuilds the barcode index for one board (or every configured board when board_id is None).
+        Call after the barcode config changes. Commits per batch.
+        """
+        if board_id is None:
+            session.exec(delete(MondayBarcodeIndex))
+        else:
+            session.exec(delete(MondayBarcodeIndex).where(MondayBarcodeIndex.board_id == board_id))
+        session.commit()
+
+        board_ids = [board_id] if board_id is not None else session.exec(select(MondayBarcodeConfig.board_id)).all()
+        indexed = 0
+        for b_id in board_ids:
+            last_id = None
+            while True:
+                statement = select(MondayItem.id, MondayItem.board_id, MondayItem.name, MondayItem.column_values).where(MondayItem.board_id == b_id)
+                if last_id is not None:
+                    statement = statement.where(MondayItem.id > last_id)
+                batch = session.exec(statement.order_by(MondayItem.id).limit(batch_size)).all()
+                if not batch:
+                    break
+                self._insert_barcode_index(session, [{"id": r[0], "board_id": r[1], "name": r[2], "column_values": r[3]} for r in batch])
+                session.commit()
+                indexed += len(batch)
+                last_id = batch[-1][0]
+        return indexed
+
+    def lookup_items_by_code(self, session: Session, board_id: int, code: str) -> List[Dict[str, Any]]:
+        """
+        Resolves a scanned code to local items via the barcode index (one indexed equality lookup).
+        Each result carries `matched_column_id`.
+        """
+        normalized = self.normalize_code(code)[:self.COLUMN_INDEX_TEXT_MAX]
+        if not normalized:
+            return []
+        matches = session.exec(
+            select(MondayBarcodeIndex.item_id, MondayBarcodeIndex.column_id)
+            .where(MondayBarcodeIndex.board_id == board_id, MondayBarcodeIndex.code == normalized)
+        ).all()
+        if not matches:
+            return []
+        matched_columns = {}
+        for item_id, column_id in matches:
+            matched_columns.setdefault(item_id, column_id)
+        items = session.exec(select(MondayItem).where(col(MondayItem.id).in_(list(matched_columns))).order_by(MondayItem.id)).all()
+        results = []
+        for item in items:
+            formatted = self._format_local_item(item)
+            formatted["matched_column_id"] = matched_columns[item.id]
+            results.append(formatted)
+        return results
+
+    def rebuild_column_index(self, session: Session, board_id: int = None, batch_size: int = 1000) -> int:
+        """
+        Rebuilds the column index from MondayItem.column_values (all boards when board_id is None).
+        Used to backfill items synced before the index existed. Commits per batch.
+        """
+        if board_id is not None:
+            self._delete_item_indexes(session, board_id=board_id)
+            session.commit()
+        rebuilt = 0
+        last_id = None
+        while True:
+            statement = select(MondayItem.id, MondayItem.board_id, MondayItem.name, MondayItem.column_values)
+            if board_id is not None:
+                statement = statement.where(MondayItem.board_id == board_id)
+            if last_id is not None:
+                statement = statement.where(MondayItem.id > last_id)
+            batch = session.exec(statement.order_by(MondayItem.id).limit(batch_size)).all()
+            if not batch:
+                break
+            self._sync_column_index(session, [{"id": r[0], "board_id": r[1], "name": r[2], "column_values": r[3]} for r in batch])
+            session.commit()
+            rebuilt += len(batch)
+            last_id = batch[-1][0]
+        return rebuilt
+
+    def backfill_column_index(self, session: Session) -> int:
+        """Builds the column and barcode indexes once if items exist but none are indexed yet."""
+        if session.exec(select(MondayItem.id).limit(1)).first() is None:
+            return 0
+        if session.exec(select(MondayItemColumnValue.item_id).limit(1)).first() is None:
+            return self.rebuild_column_index(session)
+        has_config = session.exec(select(MondayBarcodeConfig.id).limit(1)).first() is not None
+        if has_config and session.exec(select(MondayBarcodeIndex.item_id).limit(1)).first() is None:
+            return self.rebuild_barcode_index(session)
+        return 0
+
+    def apply_local_column_values(self, session: Session, item: MondayItem, values: Dict[str, Any]):
+        """
+        Applies simple {col_id: text} edits (and 'name') to a local item after Monday accepted them.
+        Keeps the stored shape (dict or legacy list) and leaves other columns untouched.
+        Refreshes the column index. Does NOT commit.
+        """
+        if "name" in values:
+            item.name = str(values["name"])
+        new_values = self._patch_column_values(item.column_values, values)
+
+        item.column_values = new_values
+        item.updated_at = datetime.utcnow()
+        session.add(item)
+        self._sync_column_index(session, [{"id": item.id, "board_id": item.board_id, "name": item.name, "column_values": new_values}])
+
+    @staticmethod
+    def _patch_column_values(column_values: Any, values: Dict[str, Any]) -> Any:
+        """A copy of stored column values with simple {col_id: text} edits applied ('name' is skipped)."""
+        # Deep copy so the ORM sees a changed value instead of an in-place mutation
+        new_values = copy.deepcopy(column_values) if column_values else {}
+        for col_id, val in values.items():
+            if col_id == "name":
+                continue
+            if isinstance(new_values, list):
+                cv = next((c for c in new_values if isinstance(c, dict) and c.get("id") == col_id), None)
+                if cv is None:
+                    new_values.append({"id": col_id, "text": str(val), "value": str(val), "type": "text"})
+                else:
+                    cv["text"] = str(val)
+                    cv["value"] = str(val)
+            else:
+                cv = new_values.get(col_id) or {"type": "text"}
+                cv["text"] = str(val)
+                cv["value"] = str(val)
+                new_values[col_id] = cv
+        return new_values
+
+    async def sync_board(self, session: Session, board_id: int, download_assets: bool = False, optimize_images: bool = False, force_sync_images: bool = False, keep_original_images: bool = True, filters: List[Dict] = None, filtered_item_ids: List[str] = None, incremental: bool = False, pipeline_depth: int = None, resume_cursor: str = None, resume_page: int = 0, resume_started_at: datetime = None) -> AsyncGenerator[str, None]:
         """
         Fetches items from Monday, OPTIONALLY FILTERS THEM, updates local DB, and downloads/optimizes assets.
-        Yields progress messages.
+        With incremental=True only items updated since the board's last sync are fetched
+        (falls back to a full sync when there is no previous sync to build on).
+        resume_cursor/resume_page continue an interrupted sync after its last committed page.
+        Yields progress messages, plus a "checkpoint" line after every committed page.
         """
-        print(f"DEBUG: sync_board START. Board: {board_id}, Keep Original: {keep_original_images}")
-        client = None
+        print(f"DEBUG: sync_board START. Board: {board_id}, Keep Original: {keep_original_images}, Incremental: {incremental}, Resume Page: {resume_page}")
+        # Watermark for the next incremental run. Taken BEFORE fetching so edits made
+        # on Monday while we page are picked up next time (a resumed sync keeps the original start).
+        sync_started_at = resume_started_at or datetime.utcnow()
+        resumed = resume_page > 0
         try:
             yield json.dumps({"status": "started", "message": "Starting sync..."}) + "\n"
 
@@ -488,6 +1252,16 @@ class MondayService:
             
             # Upsert Board
             db_board = session.exec(select(MondayBoard).where(MondayBoard.id == board_id)).first()
+
+            # Decide between delta and full sync BEFORE touching the board row.
+            # Full sync stays the fallback: first sync, empty local board, filtered syncs
+            # (filters apply to the whole board) and forced image re-syncs.
+            delta_since = None
+            if incremental and db_board and not filters and not force_sync_images:
+                local_count = session.exec(select(func.count()).select_from(MondayItem).where(MondayItem.board_id == board_id)).one()
+                if local_count > 0 and db_board.last_synced_at:
+                    delta_since = db_board.last_synced_at
+
             if not db_board:
                 db_board = MondayBoard(id=board_id, name=monday_board["name"])
                 session.add(db_board)
@@ -500,318 +1274,320 @@ class MondayService:
             session.commit()
             session.refresh(db_board)
             
-            yield json.dumps({"status": "fetching", "message": "Board details updated. Fetching items..."}) + "\n"
+            # Monday filters "__last_updated__" by day, so go back one extra day to
+            # cover timezone skew. Re-fetching a few unchanged items is harmless.
+            delta_query_params = None
+            if delta_since:
+                since_day = (delta_since - timedelta(days=1)).strftime("%Y-%m-%d")
+                delta_query_params = {
+                    "rules": [{
+                        "column_id": "__last_updated__",
+                        "compare_value": ["EXACT", since_day],
+                        "operator": "greater_than_or_equals",
+                        "compare_attribute": "UPDATED_AT"
+                    }]
+                }
+                yield json.dumps({"status": "fetching", "message": f"Board details updated. Fetching items updated since {since_day} (incremental)..."}) + "\n"
+            else:
+                if incremental:
+                    yield json.dumps({"status": "progress", "message": "No previous sync to build on. Running full sync."}) + "\n"
+                yield json.dumps({"status": "fetching", "message": "Board details updated. Fetching items..."}) + "\n"
 
             # 2. Fetch All Items (Recursive) => Then Filter
             # Monday API filtering is limited for complex cases, so we fetch all and filter in memory for now.
             # This ensures we have a consistent state if we wipe/update.
             # WAIT: If filtering, user probably expects ONLY those items to be updated.
-            
-            cursor = None
-            has_more = True
+            #
+            # The sync runs as a 3-stage pipeline connected by bounded queues:
+            #   fetch_stage  -> page_queue  -> asset_stage -> write_queue -> DB writer (this generator)
+            # so page N+1 is fetched while page N's assets download and page N-1 commits.
+            # Queue depth bounds how many pages are held in memory at once.
+            # The stages don't share `session`: the asset stage reads through a short-lived session
+            # per page, and each page is upserted and committed on its own session in a worker
+            # thread, so a page write doesn't stall the fetches and downloads on the event loop.
+            db_engine = session.get_bind()
+            depth = max(1, pipeline_depth or self.SYNC_PIPELINE_DEPTH)
+            page_queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+            write_queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+            log_queue: asyncio.Queue = asyncio.Queue() # progress lines from the background stages
             
             # Semaphore for limiting concurrent downloads
             semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_DOWNLOADS)
             
-            # Use a single client for all downloads in this sync session
-            client = httpx.AsyncClient(timeout=60.0) # Increased timeout from 30.0
-            total_synced = 0
-            page_count = 0 # Track pages
+            # Downloads go through the shared pooled client (keep-alive across pages)
+            client = self.client
             synced_count = 0 # Track items
             total_size_bytes = 0
             original_size_bytes = 0
             optimized_size_bytes = 0
-            fetched_count = 0
             
             # PRUNING: Track IDs seen during this sync
             seen_item_ids = set()
             process_all_items_flag = True
-            
-            while has_more:
-                page_count += 1
-                if page_count > 500: # Safety break
-                     process_all_items_flag = False
-                     yield json.dumps({"status": "error", "message": "Sync Stopped: Max page limit reached."}) + "\n"
-                     break
-                
-                # Verify DB Count BEFORE fetch
-                try:
-                    pre_fetch_count = session.exec(select(func.count()).select_from(MondayItem).where(MondayItem.board_id == board_id)).one()
-                    yield json.dumps({"status": "progress", "message": f"Start Page {page_count}. Items in DB: {pre_fetch_count}"}) + "\n"
-                except: pass
-
-                # Re-use existing get_board_items logic but with limit=100
-                data = await self.get_board_items(board_id, limit=100, cursor=cursor) # Changed limit to 100
-                items = data.get("items", [])
-                new_cursor = data.get("cursor")
-                
-                if cursor and new_cursor == cursor:
-                     yield json.dumps({"status": "warning", "message": "Cursor not advancing. Stopping."}) + "\n"
-                     break
-                cursor = new_cursor
-
-                if not new_cursor:
-                    has_more = False
-
-                if not items:
-                    break
-                
-                # Track SEEN IDs for Pruning
-                for i in items:
-                    seen_item_ids.add(int(i['id']))
 
-                fetched_count += len(items)
-                yield json.dumps({"status": "progress", "message": f"Page {page_count}: Fetched {len(items)} items. IDs: {[i['id'] for i in items[:3]]}..."}) + "\n"
+            def log(status: str, message: str, **extra):
+                log_queue.put_nowait(json.dumps({"status": status, "message": message, **extra}) + "\n")
 
-                # --- FILTERING LOGIC ---
-                items_to_sync = []
-                if filters:
-                    for item in items:
-                        try:
-                            match = True
-                            for f in filters:
-                                if f.get("condition") == "is_duplicate": continue 
-                                if not f.get("value"): continue
-                                
-                                col_id = f.get("column", "all")
-                                # Safe string conversion
-                                query_val = str(f.get("value", "")).lower()
-                                
-                                item_val = ""
-                                if col_id == "name":
-                                    item_val = str(item.get("name", ""))
-                                elif col_id != "all":
-                                    # Find column safely
-                                    c_val = next((c for c in item.get("column_values", []) if c.get("id") == col_id), None)
-                                    item_val = str(c_val.get("text", "")) if c_val else ""
-                                
-                                if col_id == "all":
-                                    # Search name + all columns
-                                    if query_val not in str(item.get("name", "")).lower():
-                                        found_in_col = False
-                                        for c in item.get("column_values", []):
-                                            if c.get("text") and query_val in str(c.get("text")).lower():
-                                                found_in_col = True
-                                                break
-                                        if not found_in_col:
-                                            match = False
-                                else:
-                                    if query_val not in item_val.lower():
-                                        match = False
-                                
-                                if not match: break
-                            
-                            if match:
-                                items_to_sync.append(item)
-                        except Exception as e:
-                            print(f"Filter error on item {item.get('id')}: {e}")
-                            # Determine policy: Skip item on error or include? 
-                            # Safer to skip if we can't verify filter.
-                            continue
-                else:
-                    items_to_sync = items
-                    
-                # -----------------------
-                
-                synced_count += len(items_to_sync)
-                yield json.dumps({"status": "fetching", "message": f"Fetched page {page_count} ({len(items)} items)", "count": synced_count}) + "\n"
-            
-                print(f"DEBUG: Processing {len(items_to_sync)} items for Upsert")
-                
-                # if not items_to_sync:
-                #    if not cursor: has_more = False
-                #    continue
-
-
-                # Prepare list to hold task objects if downloading
-                download_tasks = []
-                item_asset_map_refs = {} # Map item_id -> assets_map to update later
-
-                # Pre-Upsert Item Processing
-                first_item_debug = True # Flag to debug only first item of page
-                for item in items_to_sync:
-                    if first_item_debug:
-                        print(f"[SYNC_DEBUG] First Item ID: {item.get('id')} Name: {item.get('name')}", flush=True)
-                        # Print ALL columns (no truncation)
-                        print(f"[SYNC_DEBUG] Column Values Full: {json.dumps(item.get('column_values', []))}", flush=True)
-                        
-                        # Explicitly check for auto-number like columns
-                        for c in item.get("column_values", []):
-                            if "auto" in c.get("id", "") or "auto" in c.get("type", ""):
-                                 print(f"[SYNC_DEBUG] Found Potential Autonumber: {c}", flush=True)
-                        
-                        first_item_debug = False
-
-                    # Parse column values
-                    col_values = {}
-                    for cv in item.get("column_values", []):
-                        val_text = cv.get("text")
-                        val_value = cv.get("value")
-                        val_type = cv.get("type")
-                        
-                        # FALLBACK: If text is missing but value exists (Auto Number, Formula, etc.)
-                        if not val_text and val_value:
+            async def fetch_stage():
+                nonlocal delta_query_params, process_all_items_flag, synced_count
+                cursor = resume_cursor
+                page_count = resume_page # Track pages
+                try:
+                    if resumed and not resume_cursor:
+                        # Every page was committed before the interruption
+                        log("progress", f"All {resume_page} pages were already committed. Finishing up...")
+                        await page_queue.put(None)
+                        return
+                    if resumed:
+                        log("progress", f"Resuming after page {resume_page}.")
+
+                    while True:
+                        page_count += 1
+                        if page_count > 500: # Safety break
+                            process_all_items_flag = False
+                            log("error", "Sync Stopped: Max page limit reached.")
+                            break
+
+                        log("progress", f"Start Page {page_count}.")
+
+                        # Re-use existing get_board_items logic but with limit=100
+                        if delta_query_params and not cursor:
                             try:
-                                import json as j # alias to avoid conflict if any
-                                val_obj = j.loads(val_value)
-                                # Common patterns
-                                if "value" in val_obj: # Auto Number often {"value": 123}
-                                    val_text = str(val_obj["value"])
-                                elif "formula_result" in val_obj:
-                                    val_text = str(val_obj["formula_result"])
-                                # Add more heuristics if needed
-                            except:
-                                pass # Keep empty if parse fails
-
-                        col_values[cv["id"]] = {
-                            "text": val_text,
-                            "value": val_value,
-                            "type": val_type
-                        }
-                    
-                    # Parse assets & Check existing keys
-                    existing_item = session.exec(select(MondayItem).where(MondayItem.id == int(item["id"]))).first()
-                    existing_assets = existing_item.assets if existing_item else {}
-
-                    assets_map = {}
-                    for asset in item.get("assets", []):
-                        asset_id = asset["id"]
-                        assets_map[asset_id] = asset
-                        
-                        # Preserve known paths
-                        if asset_id in existing_assets:
-                            if "local_path" in existing_assets[asset_id]:
-                                 assets_map[asset_id]["local_path"] = existing_assets[asset_id]["local_path"]
-                            if "optimized_path" in existing_assets[asset_id]:
-                                assets_map[asset_id]["optimized_path"] = existing_assets[asset_id]["optimized_path"]
-                            if "rotation" in existing_assets[asset_id]:
-                                assets_map[asset_id]["rotation"] = existing_assets[asset_id]["rotation"]
-                        
-                        # Queue for download if requested AND item matches filter (if explicitly filtered)
-                        should_process_assets = download_assets
-                        if should_process_assets and filtered_item_ids is not None:
-                            should_process_assets = str(item["id"]) in filtered_item_ids
-                        
-                        if should_process_assets:
-                            task = self._process_asset(client, semaphore, board_id, item["id"], asset, optimize_images, force_sync_images, keep_original_images)
-                            download_tasks.append(task)
-
-                    # Store reference to map to update it after tasks complete
-                    item_asset_map_refs[item["id"]] = assets_map
-
-                # Execute Downloads in Parallel for this Page
-                if download_tasks:
-                    yield json.dumps({"status": "downloading", "message": f"Downloading {len(download_tasks)} images for {len(items_to_sync)} items...", "count": synced_count}) + "\n"
-                    results = await asyncio.gather(*download_tasks)
-                    
-                    # Log success
-                    success_count = sum(1 for r in results if r)
-                    
-                    # Calculate detailed stats
-                    downloaded_count = 0
-                    optimized_count = 0
-                    for r in results:
-                        if r and "stats" in r:
-                            if r["stats"].get("downloaded"): downloaded_count += 1
-                            if r["stats"].get("optimized"): optimized_count += 1
-
-                    yield json.dumps({"status": "downloading", "message": f"Downloading/Processing {len(download_tasks)} assets: {downloaded_count} new downloads, {optimized_count} optimized.", "count": synced_count}) + "\n"
-                    
-                    # Apply updates to maps and calculate stats
-                    for res in results:
-                        if res:
-                            asset_id = res["asset_id"]
-                            updates = res["updates"]
-                            stats = res.get("stats", {}) # Expecting _process_asset to return stats
-                            
-                            # Stats
-                            original_size_bytes += stats.get("original_size", 0)
-                            optimized_size_bytes += stats.get("optimized_size", 0)
-                            total_size_bytes += stats.get("original_size", 0) + stats.get("optimized_size", 0)
-                            
-                            # Find where this asset lives
-                            for i_id, a_map in item_asset_map_refs.items():
-                                if asset_id in a_map:
-                                    a_map[asset_id].update(updates)
-                                    # Fix: Persist stats to asset object so frontend can read file size
-                                    a_map[asset_id]["stats"] = stats
-                elif download_assets:
-                     yield json.dumps({"status": "downloading", "message": f"No new images to download/optimize for this batch."}) + "\n"
-
-                # Now Upsert Items to DB with updated asset maps
-                batch_items = items_to_sync
-                yield json.dumps({"status": "progress", "message": f"Saving {len(batch_items)} items to DB..."}) + "\n"
-                
-                added_count = 0
-                updated_count = 0
-                
-                # Now Upsert Items to DB with updated asset maps
-                for item in batch_items:
-                    item_id = int(item["id"])
-                    assets_map = item_asset_map_refs[item["id"]]
-                    
-                    col_values = {}
-                    for cv in item.get("column_values", []):
-                        col_values[cv["id"]] = {
-                            "text": cv.get("text"),
-                            "value": cv.get("value"),
-                            "type": cv.get("type")
-                        }
+                                data = await self.get_board_items(board_id, limit=100, query_params=delta_query_params)
+                            except Exception as e:
+                                # Delta query rejected (e.g. older API version) -> full sync
+                                print(f"DEBUG: Incremental query failed, falling back to full sync: {e}")
+                                log("warning", f"Incremental fetch failed ({e}). Falling back to full sync.")
+                                delta_query_params = None
+                                data = await self.get_board_items(board_id, limit=100, cursor=cursor)
+                        elif cursor and cursor == resume_cursor:
+                            try:
+                                data = await self.get_board_items(board_id, limit=100, cursor=cursor)
+                            except Exception as e:
+                                # Monday cursors expire after 60 minutes -> restart from page 1
+                                print(f"DEBUG: Resume cursor rejected, restarting sync: {e}")
+                                log("warning", f"Checkpoint cursor expired ({e}). Restarting from page 1.")
+                                cursor, page_count = None, 1
+                                data = await self.get_board_items(board_id, limit=100, query_params=delta_query_params) if delta_query_params else await self.get_board_items(board_id, limit=100)
+                        else:
+                            data = await self.get_board_items(board_id, limit=100, cursor=cursor) # Changed limit to 100
+                        items = data.get("items", [])
+                        new_cursor = data.get("cursor")
+
+                        if cursor and new_cursor == cursor:
+                            process_all_items_flag = False
+                            log("warning", "Cursor not advancing. Stopping.")
+                            break
+                        cursor = new_cursor
+
+                        if not items:
+                            break
+
+                        # Track SEEN IDs for Pruning
+                        for i in items:
+                            seen_item_ids.add(int(i['id']))
+
+                        log("progress", f"Page {page_count}: Fetched {len(items)} items. IDs: {[i['id'] for i in items[:3]]}...")
+
+                        # --- FILTERING LOGIC ---
+                        if filters:
+                            items_to_sync = [item for item in items if self._item_matches_filters(item, filters)]
+                        else:
+                            items_to_sync = items
+
+                        synced_count += len(items_to_sync)
+                        log("fetching", f"Fetched page {page_count} ({len(items)} items)", count=synced_count)
+
+                        # Blocks here when downstream stages are behind (backpressure)
+                        await page_queue.put({"page": page_count, "items": items_to_sync, "cursor": cursor})
+
+                        if not cursor:
+                            break
+                    await page_queue.put(None)
+                except Exception as e:
+                    await page_queue.put(e)
 
-                    existing_item = session.exec(select(MondayItem).where(MondayItem.id == item_id)).first()
-                    
-                    if not existing_item:
-                        new_item = MondayItem(
-                            id=item_id,
-                            board_id=board_id,
-                            name=item["name"],
-                            column_values=col_values,
-                            assets=assets_map
-                        )
-                        session.add(new_item)
-                        added_count += 1
-                    else:
-                        existing_item.name = item["name"]
-                        existing_item.column_values = col_values
-                        existing_item.assets = assets_map
-                        updated_count += 1
-                
+            async def asset_stage():
+                nonlocal total_size_bytes, original_size_bytes, optimized_size_bytes
                 try:
-                    session.commit()
-                    yield json.dumps({"status": "progress", "message": f"Committed: {added_count} new, {updated_count} updated."}) + "\n"
-                    
-                    # --- ASSET CLEANUP ---
-                    # Identify assets that were removed from items in this batch
-                    # We compare 'existing_assets' vs 'assets_map' (new)
-                    # We already fetched existing_item in the loop, but we need to do this carefully.
-                    # It's better to do this during the main loop or right after commit if we tracked deletions.
-                    # Let's do a post-process on the batch since we have item_asset_map_refs (new state)
-                    # But we need the OLD state. The loop above already updated the DB objects.
-                    
-                    # Refined Approach:
-                    # Inside the loop, we had 'existing_assets'. We should have diffed them there.
-                    # But we didn't want to delete files if the commit failed. 
-                    # Now commit is successful. But we lost the 'existing_assets' reference (overwritten in DB object memory).
-                    
-                    # To be safe and simple: We will trust the "Preserve Existing" logic for now. 
-                    # True orphan cleanup (deleted assets) might require a second pass or better tracking in the future.
-                    # For now, we focus on ITEM deletion cleanup below, which is the big space saver.
-                    
+                    while True:
+                        page = await page_queue.get()
+                        if page is None or isinstance(page, Exception):
+                            await write_queue.put(page)
+                            return
+
+                        items_to_sync = page["items"]
+                        print(f"DEBUG: Processing {len(items_to_sync)} items for Upsert")
+
+                        # Prepare list to hold task objects if downloading
+                        download_tasks = []
+                        item_asset_map_refs = {} # Map item_id -> assets_map to update later
+
+                        # Load existing asset maps for the whole page in ONE query
+                        with Session(db_engine) as read_session:
+                            existing_assets_by_id = self._load_existing_assets(read_session, [int(i["id"]) for i in items_to_sync])
+                            stored_assets_by_id = self._load_asset_refs(read_session, [int(i["id"]) for i in items_to_sync if int(i["id"]) not in existing_assets_by_id])
+                        item_col_values = {}
+
+                        # Pre-Upsert Item Processing
+                        first_item_debug = True # Flag to debug only first item of page
+                        for item in items_to_sync:
+                            if first_item_debug:
+                                print(f"[SYNC_DEBUG] First Item ID: {item.get('id')} Name: {item.get('name')}", flush=True)
+                                # Print ALL columns (no truncation)
+                                print(f"[SYNC_DEBUG] Column Values Full: {json.dumps(item.get('column_values', []))}", flush=True)
+
+                                # Explicitly check for auto-number like columns
+                                for c in item.get("column_values", []):
+                                    if "auto" in c.get("id", "") or "auto" in c.get("type", ""):
+                                        print(f"[SYNC_DEBUG] Found Potential Autonumber: {c}", flush=True)
+
+                                first_item_debug = False
+
+                            # Parse column values (kept for the DB write below)
+                            item_col_values[item["id"]] = self._parse_column_values(item)
+
+                            # Parse assets & Check existing keys (pre-loaded for the whole page)
+                            existing_assets = existing_assets_by_id.get(int(item["id"])) or stored_assets_by_id.get(int(item["id"])) or {}
+
+                            assets_map = {}
+                            for asset in item.get("assets", []):
+                                asset_id = asset["id"]
+                                assets_map[asset_id] = asset
+
+                                # Preserve known paths (and the thumbnail ladder / dimensions recorded with them)
+                                if asset_id in existing_assets:
+                                    for field in self.LOCAL_ASSET_FIELDS:
+                                        if field in existing_assets[asset_id]:
+                                            assets_map[asset_id][field] = existing_assets[asset_id][field]
+
+                                # Queue for download if requested AND item matches filter (if explicitly filtered)
+                                should_process_assets = download_assets
+                                if should_process_assets and filtered_item_ids is not None:
+                                    should_process_assets = str(item["id"]) in filtered_item_ids
+
+                                if should_process_assets:
+                                    task = self._process_asset(client, semaphore, board_id, item["id"], asset, optimize_images, force_sync_images, keep_original_images, existing=existing_assets.get(asset_id))
+                                    download_tasks.append(task)
+
+                            # Store reference to map to update it after tasks complete
+                            item_asset_map_refs[item["id"]] = assets_map
+
+                        # Execute Downloads in Parallel for this Page
+                        if download_tasks:
+                            log("downloading", f"Downloading {len(download_tasks)} images for {len(items_to_sync)} items...", count=synced_count)
+                            results = await asyncio.gather(*download_tasks)
+
+                            # Calculate detailed stats
+                            downloaded_count = 0
+                            optimized_count = 0
+                            for r in results:
+                                if r and "stats" in r:
+                                    if r["stats"].get("downloaded"): downloaded_count += 1
+                                    if r["stats"].get("optimized"): optimized_count += 1
+
+                            log("downloading", f"Downloading/Processing {len(download_tasks)} assets: {downloaded_count} new downloads, {optimized_count} optimized.", count=synced_count)
+                            if optimized_count:
+                                print(f"DEBUG: Image pool stats: {image_pool.get_image_pool().stats()}")
+
+                            # Apply updates to maps and calculate stats
+                            for res in results:
+                                if res:
+                                    asset_id = res["asset_id"]
+                                    updates = res["updates"]
+                                    stats = res.get("stats", {}) # Expecting _process_asset to return stats
+
+                                    # Stats
+                                    original_size_bytes += stats.get("original_size", 0)
+                                    optimized_size_bytes += stats.get("optimized_size", 0)
+                                    total_size_bytes += stats.get("original_size", 0) + stats.get("optimized_size", 0)
+
+                                    # Find where this asset lives
+                                    for i_id, a_map in item_asset_map_refs.items():
+                                        if asset_id in a_map:
+                                            a_map[asset_id].update(updates)
+                                            # Fix: Persist stats to asset object so frontend can read file size
+                                            a_map[asset_id]["stats"] = stats
+                        elif download_assets:
+                            log("downloading", "No new images to download/optimize for this batch.")
+
+                        page["rows"] = [
+                            {
+                                "id": int(item["id"]),
+                                "board_id": board_id,
+                                "name": item["name"],
+                                "column_values": item_col_values[item["id"]],
+                                "assets": item_asset_map_refs[item["id"]]
+                            }
+                            for item in items_to_sync
+                        ]
+                        page["existing_ids"] = set(existing_assets_by_id)
+                        await write_queue.put(page)
                 except Exception as e:
-                    session.rollback()
-                    yield json.dumps({"status": "error", "message": f"Commit Failed: {str(e)}"}) + "\n"
+                    await write_queue.put(e)
 
-                
-                if not cursor:
-                    has_more = False
+            def write_page(rows: List[Dict[str, Any]], existing_ids: set) -> tuple:
+                # Runs in a worker thread; an uncommitted transaction is rolled back when the session closes
+                with Session(db_engine) as write_session:
+                    counts = self._bulk_upsert_items(write_session, rows, existing_ids=existing_ids)
+                    write_session.commit()
+                    return counts
+
+            loop = asyncio.get_running_loop()
+            stage_tasks = [asyncio.create_task(fetch_stage()), asyncio.create_task(asset_stage())]
+            try:
+                while True:
+                    page = await write_queue.get()
+                    while not log_queue.empty():
+                        yield log_queue.get_nowait()
+                    if page is None:
+                        break
+                    if isinstance(page, Exception):
+                        raise page
+
+                    # Now Upsert Items to DB with updated asset maps
+                    page_rows = page["rows"]
+                    yield json.dumps({"status": "progress", "message": f"Saving {len(page_rows)} items to DB..."}) + "\n"
+
+                    # Single-statement bulk upsert for the page
+                    try:
+                        added_count, updated_count = await loop.run_in_executor(None, write_page, page_rows, page["existing_ids"])
+                        yield json.dumps({"status": "progress", "message": f"Committed: {added_count} new, {updated_count} updated."}) + "\n"
+                        # Cursor for the NEXT page; the job runner persists it so a restart resumes here
+                        yield json.dumps({"status": "checkpoint", "message": f"Checkpoint after page {page['page']}", "cursor": page["cursor"], "page": page["page"]}) + "\n"
+
+                    except Exception as e:
+                        # Fail the job: the checkpoint must stay at the last committed page so a
+                        # resume retries this one instead of moving past it
+                        raise RuntimeError(f"Commit of page {page['page']} failed: {e}") from e
+            finally:
+                for t in stage_tasks:
+                    t.cancel()
+                await asyncio.gather(*stage_tasks, return_exceptions=True)
+
+            # Originals dropped by keep_original=False (or replaced) that nothing else uses.
+            # Only once the pipeline is done: while it runs, the asset stage may be reusing a
+            # blob whose page (and refs) is not committed yet.
+            self.collect_asset_garbage(session)
+
+            while not log_queue.empty():
+                yield log_queue.get_nowait()
                 
             # PRUNING: Delete items that no longer exist on Monday.com
             # Indented to 12 spaces to stay within the function-wide try block
-            if process_all_items_flag:
-                 pass
+            # A delta (or resumed) sync only saw some items, so get the full ID list from a cheap sweep.
+            if (delta_query_params or resumed) and process_all_items_flag:
+                try:
+                    yield json.dumps({"status": "progress", "message": "Checking for deleted items (ID sweep)..."}) + "\n"
+                    seen_item_ids = await self.get_board_item_ids(board_id)
+                except Exception as e:
+                    process_all_items_flag = False
+                    yield json.dumps({"status": "warning", "message": f"ID sweep failed, skipping pruning: {e}"}) + "\n"
 
-            all_local_ids = session.exec(select(MondayItem.id).where(MondayItem.board_id == board_id)).all()
-            ids_to_delete = set(all_local_ids) - seen_item_ids
+            ids_to_delete = set()
+            if process_all_items_flag:
+                all_local_ids = session.exec(select(MondayItem.id).where(MondayItem.board_id == board_id)).all()
+                ids_to_delete = set(all_local_ids) - seen_item_ids
             
             pruned_count = 0
             if ids_to_delete:
@@ -826,8 +1602,12 @@ class MondayService:
                         chunk = id_list[i:i + chunk_size]
                         statement = delete(MondayItem).where(col(MondayItem.id).in_(chunk))
                         session.exec(statement)
+                        self._delete_item_indexes(session, item_ids=chunk)
+                        self._write_tombstones(session, board_id, chunk)
+                        self._drop_asset_refs(session, item_ids=chunk)
                     session.commit()
                     pruned_count = len(ids_to_delete)
+                    self.collect_asset_garbage(session)
                     
                     # --- FILE CLEANUP for Deleted Items ---
                     deleted_dirs_count = 0
@@ -856,7 +1636,7 @@ class MondayService:
         # This is outside the loop, runs once. Safe.
             board = session.exec(select(MondayBoard).where(MondayBoard.id == board_id)).first()
             if board:
-                board.last_synced_at = datetime.utcnow()
+                board.last_synced_at = sync_started_at
                 board.last_sync_item_count = synced_count # Should this trigger count be current active limit? 
                 # Ideally count should be `len(seen_item_ids)` if that's the true total.
                 # But actual synced (DB) count is what matters?
@@ -874,7 +1654,7 @@ class MondayService:
             size_mb = total_size_bytes / (1024 * 1024)
             saved_mb = (original_size_bytes - optimized_size_bytes) / (1024 * 1024) if optimize_images else 0
             
-            msg = f"Synced {synced_count} items. Size: {size_mb:.2f} MB."
+            msg = f"Synced {synced_count} items{' (incremental)' if delta_query_params else ''}. Size: {size_mb:.2f} MB."
             if optimize_images and saved_mb > 0:
                 msg += f" Optimization saved {saved_mb:.2f} MB."
     
@@ -887,16 +1667,14 @@ class MondayService:
     
             yield json.dumps({"status": "complete", "message": msg, "total": synced_count, "stats": {
                 "size_mb": size_mb,
-                "saved_mb": saved_mb
+                "saved_mb": saved_mb,
+                "mode": "incremental" if delta_query_params else "full"
             }}) + "\n"
                 
         except Exception as e:
             import traceback
             traceback.print_exc()
-            yield json.dumps({"status": "error", "message": f"Sync process failed: {str(e)}"}) + "\n"
-        finally:
-            if client:
-                await client.aclose()
+            yield json.dumps({"status": "error", "message": f"Sync process failed: {str(e)}", "fatal": True}) + "\n"
         
     def get_local_board_items(self, session: Session, board_id: int) -> List[Dict[str, Any]]:
         """
@@ -904,52 +1682,302 @@ class MondayService:
         Resolves local URLs if available.
         """
         db_items = session.exec(select(MondayItem).where(MondayItem.board_id == board_id)).all()
-        
-        output_items = []
-        for item in db_items:
-            # Convert column_values dict back to list
-            col_values_list = []
-            
-            # Robust handling: column_values might be Dict or List (due to old syncs)
-            if isinstance(item.column_values, dict):
-                for col_id, val_data in item.column_values.items():
-                    col_data = val_data.copy()
-                    col_data["id"] = col_id
-                    col_values_list.append(col_data)
-            elif isinstance(item.column_values, list):
-                # If it's already a list (from Monday API direct save), just use it
-                col_values_list = item.column_values
+        return [self._format_local_item(item) for item in db_items]
+
+    @staticmethod
+    def _format_local_item(item: MondayItem) -> Dict[str, Any]:
+        # Convert column_values dict back to list
+        col_values_list = []
+
+        # Robust handling: column_values might be Dict or List (due to old syncs)
+        if isinstance(item.column_values, dict):
+            for col_id, val_data in item.column_values.items():
+                col_data = val_data.copy()
+                col_data["id"] = col_id
+                col_values_list.append(col_data)
+        elif isinstance(item.column_values, list):
+            # If it's already a list (from Monday API direct save), just use it
+            col_values_list = item.column_values
+
+        # Convert assets dict back to list AND inject local URLs
+        assets_list = []
+        for asset_id, asset_data in (item.assets or {}).items():
+            asset_data_copy = asset_data.copy()
+            asset_data_copy["id"] = asset_id
+
+            # Logic: If we have a local path, inject it
+            if "local_path" in asset_data:
+                asset_data_copy["local_url"] = asset_data["local_path"]
+            if "optimized_path" in asset_data:
+                asset_data_copy["optimized_url"] = asset_data["optimized_path"]
+
+            assets_list.append(asset_data_copy)
+
+        return {
+            "id": str(item.id),
+            "name": item.name,
+            "column_values": col_values_list,
+            "assets": assets_list
+        }
+
+    @staticmethod
+    def _column_contains(board_id: int, column_id: str, value: str):
+        """WHERE clause: the item's `column_id` text contains `value` (case-insensitive), via the column index."""
+        pattern = f"%{value}%"
+        if column_id == "name":
+            return MondayItem.name.ilike(pattern)
+        matching = select(MondayItemColumnValue.item_id).where(
+            MondayItemColumnValue.board_id == board_id,
+            MondayItemColumnValue.column_id == column_id,
+            MondayItemColumnValue.text.ilike(pattern)
+        )
+        return col(MondayItem.id).in_(matching)
+
+    @staticmethod
+    def _encode_items_cursor(payload: Dict[str, Any]) -> str:
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_items_cursor(cursor: str) -> Dict[str, Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            int(payload["id"])
+            return payload
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    def get_local_board_items_page(
+        self,
+        session: Session,
+        board_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+        filter_column: Optional[str] = None,
+        filter_value: Optional[str] = None,
+        sort_column_id: Optional[str] = None,
+        sort_direction: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of local items, filtered and sorted in SQL.
+        Pagination is keyset on (sort value, item id); `cursor` is the opaque token from the previous page.
+        Sort and search columns default to the board's MondayBarcodeConfig.
+        Raises ValueError for a malformed cursor or one issued for a different sort.
+        """
+        config = session.exec(select(MondayBarcodeConfig).where(MondayBarcodeConfig.board_id == board_id)).first()
+        if sort_column_id is None:
+            sort_column_id = config.sort_column_id if config and config.sort_column_id else "id"
+        if sort_direction is None:
+            sort_direction = config.sort_direction if config else "asc"
+        descending = (sort_direction or "").lower() == "desc"
+        direction = "desc" if descending else "asc"
+        limit = max(1, min(int(limit), self.LOCAL_ITEMS_MAX_LIMIT))
+
+        sort_expr = None
+        if sort_column_id == "id":
+            statement = select(MondayItem)
+        elif sort_column_id == "name":
+            sort_expr = func.coalesce(MondayItem.name, "")
+            statement = select(MondayItem, sort_expr.label("sort_value"))
+        else:
+            # Sort on the indexed column text; items without a value sort as empty text
+            sort_cv = aliased(MondayItemColumnValue)
+            sort_expr = func.coalesce(sort_cv.text, "")
+            statement = select(MondayItem, sort_expr.label("sort_value")).outerjoin(
+                sort_cv,
+                and_(sort_cv.item_id == MondayItem.id, sort_cv.column_id == sort_column_id)
+            )
+        statement = statement.where(MondayItem.board_id == board_id)
+
+        if search:
+            conditions = [self._column_contains(board_id, "name", search)]
+            if config and config.search_column_id and config.search_column_id != "name":
+                conditions.append(self._column_contains(board_id, config.search_column_id, search))
+            statement = statement.where(or_(*conditions))
+
+        if filter_column and filter_value is not None:
+            statement = statement.where(self._column_contains(board_id, filter_column, filter_value))
+
+        if cursor:
+            position = self._decode_items_cursor(cursor)
+            if position.get("s") != sort_column_id or position.get("d") != direction:
+                raise ValueError("Cursor does not match the requested sort")
+            last_id = int(position["id"])
+            if sort_expr is None:
+                statement = statement.where(MondayItem.id < last_id if descending else MondayItem.id > last_id)
             else:
-                # Handle None or weird types
-                col_values_list = []
-                
-            # Convert assets dict back to list AND inject local URLs
-            assets_list = []
-            for asset_id, asset_data in item.assets.items():
-                asset_data_copy = asset_data.copy()
-                asset_data_copy["id"] = asset_id
-                
-                # Logic: If we have a local path, inject it
-                if "local_path" in asset_data:
-                    asset_data_copy["local_url"] = asset_data["local_path"]
-                if "optimized_path" in asset_data:
-                    asset_data_copy["optimized_url"] = asset_data["optimized_path"]
-
-                assets_list.append(asset_data_copy)
-
-            output_items.append({
-                "id": str(item.id),
-                "name": item.name,
-                "column_values": col_values_list,
-                "assets": assets_list
+                last_value = position.get("v") or ""
+                if descending:
+                    statement = statement.where(or_(sort_expr < last_value, and_(sort_expr == last_value, MondayItem.id < last_id)))
+                else:
+                    statement = statement.where(or_(sort_expr > last_value, and_(sort_expr == last_value, MondayItem.id > last_id)))
+
+        if sort_expr is None:
+            statement = statement.order_by(MondayItem.id.desc() if descending else MondayItem.id.asc())
+        elif descending:
+            statement = statement.order_by(sort_expr.desc(), MondayItem.id.desc())
+        else:
+            statement = statement.order_by(sort_expr.asc(), MondayItem.id.asc())
+
+        # One extra row tells us whether there is a next page
+        rows = session.exec(statement.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if sort_expr is not None:
+            items = [row[0] for row in rows]
+            last_value = rows[-1][1] if rows else None
+        else:
+            items = list(rows)
+            last_value = None
+
+        next_cursor = None
+        if has_more and items:
+            next_cursor = self._encode_items_cursor({
+                "s": sort_column_id,
+                "d": direction,
+                "v": last_value,
+                "id": items[-1].id,
             })
-            
-        return output_items
 
-    async def create_sync_job(self, session: Session, board_id: int, user_id: int, params: Dict[str, Any] = {}) -> MondaySyncJob:
+        return {
+            "items": [self._format_local_item(item) for item in items],
+            "cursor": next_cursor
+        }
+
+    def get_board_changes(self, session: Session, board_id: int, since: Optional[str] = None, limit: int = 500) -> Dict[str, Any]:
+        """
+        Items upserted and deleted after the `since` watermark, oldest first.
+        The token is keyset on (timestamp, item id) over items.updated_at and tombstones.deleted_at.
+        Rows newer than CHANGES_SAFETY_LAG_SECONDS are held back until their writers have committed.
+        No token, or one older than the tombstone retention, starts a full snapshot (`full_resync`).
+        A snapshot ends with a token at the horizon of its first page, so the next pull replays
+        the deletions made while the client was paging through it.
+        Raises ValueError for a malformed token.
+        """
+        now = datetime.utcnow()
+        horizon = now - timedelta(seconds=self.CHANGES_SAFETY_LAG_SECONDS)
+        limit = max(1, min(int(limit), self.CHANGES_MAX_LIMIT))
+
+        full_resync = False
+        snapshot = True
+        since_ts, since_id = datetime(1970, 1, 1), 0
+        snapshot_start = horizon
+        if since:
+            position = self._decode_items_cursor(since)
+            try:
+                since_ts = datetime.fromisoformat(position["t"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Invalid since token")
+            since_id = int(position["id"])
+            snapshot = bool(position.get("snap"))
+            if snapshot and position.get("s"):
+                try:
+                    snapshot_start = datetime.fromisoformat(position["s"])
+                except (TypeError, ValueError):
+                    raise ValueError("Invalid since token")
+            if not snapshot and since_ts < now - timedelta(days=self.TOMBSTONE_RETENTION_DAYS):
+                # Deletions before this point may be gone; the client has to start over
+                full_resync, snapshot = True, True
+                since_ts, since_id = datetime(1970, 1, 1), 0
+        else:
+            full_resync = True
+
+        items = session.exec(
+            select(MondayItem)
+            .where(MondayItem.board_id == board_id, MondayItem.updated_at <= horizon)
+            .where(or_(MondayItem.updated_at > since_ts, and_(MondayItem.updated_at == since_ts, MondayItem.id > since_id)))
+            .order_by(MondayItem.updated_at, MondayItem.id)
+            .limit(limit + 1)
+        ).all()
+        events = [(item.updated_at, item.id, item) for item in items]
+
+        # A snapshot has nothing to delete on the client
+        if not snapshot:
+            tombstones = session.exec(
+                select(MondayItemTombstone.deleted_at, MondayItemTombstone.item_id)
+                .where(MondayItemTombstone.board_id == board_id, MondayItemTombstone.deleted_at <= horizon)
+                .where(or_(MondayItemTombstone.deleted_at > since_ts, and_(MondayItemTombstone.deleted_at == since_ts, MondayItemTombstone.item_id > since_id)))
+                .order_by(MondayItemTombstone.deleted_at, MondayItemTombstone.item_id)
+                .limit(limit + 1)
+            ).all()
+            events.extend((deleted_at, item_id, None) for deleted_at, item_id in tombstones)
+
+        events.sort(key=lambda e: (e[0], e[1]))
+        has_more = len(events) > limit
+        events = events[:limit]
+
+        if has_more:
+            last_ts, last_id, _ = events[-1]
+            next_since = {"t": last_ts.isoformat(), "id": last_id}
+            if snapshot:
+                next_since.update({"snap": 1, "s": snapshot_start.isoformat()})
+        elif snapshot:
+            # Items sent on earlier pages may have been deleted since; resume deltas from the
+            # snapshot's start so their tombstones are returned (re-sent items are just upserted)
+            next_since = {"t": snapshot_start.isoformat(), "id": 0}
+        else:
+            # Everything up to the horizon has been returned
+            next_since = {"t": horizon.isoformat(), "id": 0}
+
+        return {
+            "items": [self._format_local_item(e[2]) for e in events if e[2] is not None],
+            "deleted": [str(e[1]) for e in events if e[2] is None],
+            "since": self._encode_items_cursor(next_since),
+            "has_more": has_more,
+            "full_resync": full_resync
+        }
+
+    @staticmethod
+    def resolve_api_key(session: Session, company_id: Optional[int]) -> Optional[str]:
+        """
+        API key of the company's installed Monday.com Connector, else the MONDAY_API_KEY env var.
+        Cached per company for key_cache.TTL_SECONDS; saving the app's settings drops the entry.
+        """
+        api_key = key_cache.get(company_id)
+        if api_key is not key_cache.MISS:
+            return api_key
+
+        installed_app = None
+        if company_id:
+            # Look up by app name, fall back to ID 1 (seed IDs differ between environments)
+            installed_app = session.exec(
+                select(InstalledApp)
+                .join(MarketplaceApp)
+                .where(InstalledApp.company_id == company_id)
+                .where(MarketplaceApp.name == "Monday.com Connector")
+                .where(InstalledApp.is_active == True)
+            ).first()
+            if not installed_app:
+                installed_app = session.exec(
+                    select(InstalledApp)
+                    .where(InstalledApp.company_id == company_id)
+                    .where(InstalledApp.app_id == 1)
+                    .where(InstalledApp.is_active == True)
+                ).first()
+
+        api_key = None
+        if installed_app and installed_app.settings:
+            api_key = installed_app.settings.get("api_key")
+
+        # Fallback to Environment Variable
+        if not api_key:
+            api_key = os.getenv("MONDAY_API_KEY")
+            if api_key:
+                print(f"[API_KEY] Using Fallback Environment Variable", flush=True)
+
+        if not api_key:
+            print(f"[API_KEY] WARNING: Database API key not found and MONDAY_API_KEY env var not set.", flush=True)
+        key_cache.put(company_id, api_key)
+        return api_key
+
+    async def create_sync_job(self, session: Session, board_id: int, user_id: int, params: Dict[str, Any] = {}, company_id: Optional[int] = None) -> MondaySyncJob:
         job = MondaySyncJob(
             board_id=board_id, 
             created_by=user_id, 
+            company_id=company_id,
             status="pending",
             stats={"params": params},
             progress_message="Queued..."
@@ -971,32 +1999,16 @@ class MondayService:
 
     async def process_queue(self, session: Session):
         """
-        Core Queue Processor (Serial/FIFO).
-        1. Checks if a job is currently RUNNING. If yes, exits.
-        2. Finds oldest PENDING job.
-        3. Executes it.
-        4. Recursively checks for next job.
+        Runs queued jobs in this process until nothing more can be claimed (worker.SyncWorker.drain).
+        Jobs are leased, so this is safe to call from several requests and alongside standalone
+        workers: every job runs once, one per board at a time, several boards in parallel.
+        Jobs without a company use this service's API key.
         """
-        print("Queue Processor: Checking for jobs...")
-        
-        # 1. Concurrency Check
-        active_job = session.exec(select(MondaySyncJob).where(MondaySyncJob.status == "running")).first()
-        if active_job:
-            print(f"Queue Processor: Job {active_job.id} is already running. Exiting.")
+        if not self.INLINE_SYNC_WORKER:
+            print("Queue Processor: Inline worker disabled, leaving jobs to standalone workers.")
             return
-
-        # 2. Fetch Next Job (FIFO)
-        next_job = session.exec(select(MondaySyncJob).where(MondaySyncJob.status == "pending").order_by(MondaySyncJob.created_at.asc())).first()
-        
-        if not next_job:
-            print("Queue Processor: No pending jobs.")
-            return
-
-        # 3. Execute
-        print(f"Queue Processor: Starting Job {next_job.id}")
-        
-        # Execute the job
-        await self._execute_sync_job(session, next_job.id) 
+        from .worker import SyncWorker
+        await SyncWorker(default_api_key=self.api_key, http_client=self.client).drain()
 
     async def _execute_sync_job(self, session: Session, job_id: uuid.UUID):
         """
@@ -1006,18 +2018,38 @@ class MondayService:
         if not job: return
 
         print(f"Executing Job {job_id}")
+        # Normally claimed already (worker.claim_job); kept for direct callers
         job.status = "running"
         job.progress_message = "Starting..."
+        if not job.started_at:
+            job.started_at = datetime.utcnow()
         session.add(job)
         session.commit()
 
         # Extract Params (Assuming we stored them, or defaulting)
         # TODO: Implement Params storage. For now, defaults.
-        sync_kwargs = job.stats.get("params", {}) if job.stats else {}
+        sync_kwargs = dict(job.stats.get("params", {})) if job.stats else {}
         # We will store params in 'stats' field for now to avoid schema change if possible? 
         # 'stats' is JSON. We can put {"params": {...}, "results": ...}
+
+        # Resume from the last committed page if this job was interrupted
+        if job.checkpoint_page:
+            cursor_age = (datetime.utcnow() - job.checkpoint_at).total_seconds() if job.checkpoint_at else None
+            if job.checkpoint_cursor and (cursor_age is None or cursor_age > self.CURSOR_TTL_SECONDS):
+                # Cursor has certainly expired: don't even try it
+                self.append_job_logs(session, job, [f"WARNING: Checkpoint after page {job.checkpoint_page} expired. Restarting from page 1."])
+                job.checkpoint_cursor, job.checkpoint_page = None, 0
+            else:
+                self.append_job_logs(session, job, [f"Resuming from checkpoint after page {job.checkpoint_page}"])
+                sync_kwargs.update(resume_cursor=job.checkpoint_cursor, resume_page=job.checkpoint_page, resume_started_at=job.started_at)
+            session.add(job)
+            session.commit()
+        job_events.notify(job.id)
         
         logs_buffer = []
+        fatal_error = None
+        last_flush = 0.0
+        loop = asyncio.get_running_loop()
 
         try:
             async for line in self.sync_board(session, job.board_id, **sync_kwargs):
@@ -1025,8 +2057,19 @@ class MondayService:
                     data = json.loads(line)
                     msg = data.get("message", "")
                     status = data.get("status")
+
+                    if status == "checkpoint":
+                        job.checkpoint_cursor = data.get("cursor")
+                        job.checkpoint_page = data.get("page", 0)
+                        job.checkpoint_at = datetime.utcnow()
+                        session.add(job)
+                        session.commit()
+                        last_flush = loop.time()
+                        continue
                     
                     job.progress_message = msg
+                    if data.get("fatal"):
+                        fatal_error = msg
                     if status == "error":
                         logs_buffer.append(f"ERROR: {msg}")
                     elif status == "warning":
@@ -1035,27 +2078,39 @@ class MondayService:
                         if "Page" in msg or "Downloading" in msg or "Committed" in msg:
                              logs_buffer.append(msg)
                     
-                    if not job.logs:
-                        job.logs = []
-                    job.logs = list(job.logs) + logs_buffer
-                    logs_buffer = []
-                    
                     if data.get("stats"):
                         # Merge stats, don't overwrite params if we stored them there
-                        current_stats = job.stats or {}
-                        current_stats.update(data.get("stats"))
-                        job.stats = current_stats
-
-                    session.add(job)
-                    session.commit()
+                        job.stats = {**(job.stats or {}), **data.get("stats")}
+
+                    # Log lines and stats are written at once; a bare progress message at most
+                    # once per JOB_PROGRESS_FLUSH_SECONDS (live viewers follow the stream instead)
+                    if logs_buffer or data.get("stats") or loop.time() - last_flush >= self.JOB_PROGRESS_FLUSH_SECONDS:
+                        self.append_job_logs(session, job, logs_buffer)
+                        logs_buffer = []
+                        session.add(job)
+                        session.commit()
+                        last_flush = loop.time()
+                        job_events.notify(job.id)
                 except json.JSONDecodeError:
                     pass
 
-            job.status = "complete"
+            if fatal_error:
+                # Keep the checkpoint so the job can be resumed instead of restarted
+                job.status = "failed"
+                job.progress_message = fatal_error
+            else:
+                job.status = "complete"
+                job.progress_message = "Sync Completed Successfully"
             job.completed_at = datetime.utcnow()
-            job.progress_message = "Sync Completed Successfully"
             session.add(job)
             session.commit()
+            job_events.notify(job.id)
+            if job.status == "complete":
+                try:
+                    self.record_sync_outcome(session, job)
+                except Exception as e:
+                    session.rollback()
+                    print(f"[SCHEDULER] Could not reschedule board {job.board_id}: {e}")
 
         except Exception as e:
             import traceback
@@ -1063,16 +2118,48 @@ class MondayService:
             job.status = "failed"
             job.completed_at = datetime.utcnow()
             job.progress_message = f"Failed: {str(e)}"
-            if not job.logs:
-                job.logs = []
-            job.logs = list(job.logs) + [f"CRITICAL ERROR: {str(e)}"]
+            self.append_job_logs(session, job, [f"CRITICAL ERROR: {str(e)}"])
             session.add(job)
             session.commit()
-            
-        # 4. Recursion: Check for next job
-        # We need to run this in background again to avoid deep recursion stack?
-        # Just await it.
-        await self.process_queue(session)
+            job_events.notify(job.id)
+
+    def append_job_logs(self, session: Session, job: MondaySyncJob, lines: List[str]):
+        """
+        Appends log lines to the job's ring and trims it to JOB_LOG_MAX_LINES.
+        Bumps job.log_seq; does NOT commit (the caller commits with the job row).
+        """
+        if not lines:
+            return
+        now = datetime.utcnow()
+        first = (job.log_seq or 0) + 1
+        session.add_all([MondaySyncJobLog(job_id=job.id, seq=first + i, message=line, created_at=now) for i, line in enumerate(lines)])
+        job.log_seq = first + len(lines) - 1
+        if job.log_seq > self.JOB_LOG_MAX_LINES:
+            session.exec(delete(MondaySyncJobLog).where(
+                MondaySyncJobLog.job_id == job.id,
+                MondaySyncJobLog.seq <= job.log_seq - self.JOB_LOG_MAX_LINES,
+            ))
+        session.add(job)
+
+    def get_job_logs(self, session: Session, jobs: List[MondaySyncJob], after_seq: int = 0) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+        """
+        Log lines per job as [{seq, message}], oldest first, optionally only those after `after_seq`.
+        Jobs from before the log table keep their lines in MondaySyncJob.logs.
+        """
+        result = {job.id: [] for job in jobs}
+        ring_ids = [job.id for job in jobs if job.log_seq]
+        for chunk in self._chunks(ring_ids, 500):
+            rows = session.exec(
+                select(MondaySyncJobLog)
+                .where(col(MondaySyncJobLog.job_id).in_(chunk), MondaySyncJobLog.seq > after_seq)
+                .order_by(MondaySyncJobLog.job_id, MondaySyncJobLog.seq)
+            ).all()
+            for row in rows:
+                result[row.job_id].append({"seq": row.seq, "message": row.message})
+        for job in jobs:
+            if not job.log_seq and job.logs:
+                result[job.id] = [{"seq": i + 1, "message": m} for i, m in enumerate(job.logs) if i + 1 > after_seq]
+        return result
 
     async def clear_board_cache(
         self,
@@ -1096,6 +2183,8 @@ class MondayService:
                 count = len(items)
                 for item in items:
                     session.delete(item)
+                self._delete_item_indexes(session, board_id=board_id)
+                self._write_tombstones(session, int(board_id), [item.id for item in items])
                 session.commit()
                 results["db_items_removed"] = count
             except Exception as e:
@@ -1103,7 +2192,19 @@ class MondayService:
                 session.rollback()
 
         # 2. Clear Files
-        # Path: assets/monday_files/{board_id}
+        # Blob store: drop this board's refs; files go once no other board uses them.
+        # (clear_db alone keeps the refs so a re-sync reuses the files instead of downloading again.)
+        drop_variant = None if clear_assets else ("optimized" if clear_optimized else ("original" if clear_originals else False))
+        if drop_variant is not False:
+            try:
+                self._drop_asset_refs(session, board_id=int(board_id), variant=drop_variant)
+                session.commit()
+                results["storage_freed_mb"] += self.collect_asset_garbage(session) / (1024 * 1024)
+            except Exception as e:
+                print(f"Error clearing stored assets: {e}")
+                session.rollback()
+
+        # Legacy per-item files. Path: assets/monday_files/{board_id}
         board_dir = Path(self.ASSETS_DIR) / str(board_id)
         if board_dir.exists():
             if clear_assets:
@@ -1179,6 +2280,276 @@ class MondayService:
             print(f"Failed to update item {item_id}: {e}")
             raise e
 
+    async def batch_update_items(self, session: Session, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Writes many {item_id, board_id?, column_values} updates to Monday and to the local items.
+        Updates are packed into aliased change_multiple_column_values documents sized to the
+        complexity budget; a document Monday rejects is split in halves until the bad update is
+        isolated, so one invalid value only fails its own item. Local items of the accepted
+        updates are changed in one transaction.
+        Returns one {item_id, status: "ok" | "error", error} per item, in request order.
+        """
+        # Several updates of one item become one mutation (later values win)
+        merged: Dict[int, Dict[str, Any]] = {}
+        for u in updates:
+            entry = merged.setdefault(int(u["item_id"]), {"board_id": None, "column_values": {}})
+            entry["board_id"] = u.get("board_id") or entry["board_id"]
+            entry["column_values"].update(u.get("column_values") or {})
+
+        items = {}
+        for chunk in self._chunks(list(merged), 500):
+            items.update({i.id: i for i in session.exec(select(MondayItem).where(col(MondayItem.id).in_(chunk))).all()})
+
+        results: Dict[int, Dict[str, Any]] = {}
+        pending = []
+        for item_id, entry in merged.items():
+            board_id = entry["board_id"] or (items[item_id].board_id if item_id in items else None)
+            if not board_id:
+                results[item_id] = {"item_id": item_id, "status": "error", "error": "Unknown item (pass board_id)"}
+            elif not entry["column_values"]:
+                results[item_id] = {"item_id": item_id, "status": "error", "error": "No column values"}
+            else:
+                pending.append((item_id, int(board_id), entry["column_values"]))
+
+        accepted, failed = await self._push_column_updates(pending)
+        for item_id, error in failed:
+            results[item_id] = {"item_id": item_id, "status": "error", "error": error}
+
+        for item_id, board_id, values in accepted:
+            item = items.get(item_id)
+            if item is not None:
+                self.apply_local_column_values(session, item, values)
+            results[item_id] = {"item_id": item_id, "status": "ok", "error": None, "local": item is not None}
+        if accepted:
+            session.commit()
+        print(f"[MONDAY_BATCH] {len(accepted)}/{len(merged)} item(s) updated", flush=True)
+        return [results[item_id] for item_id in merged]
+
+    async def _push_column_updates(self, pending: List[tuple]):
+        """
+        Sends [(item_id, board_id, values)] to Monday in documents sized to the complexity budget.
+        Returns (accepted updates, [(item_id, error)]).
+        """
+        budget = get_budget(self.api_key)
+        unit_cost = None  # Learned cost of one mutation
+        accepted, failed = [], []
+        while pending:
+            size = self.BATCH_MUTATION_SIZE
+            if unit_cost and budget.remaining is not None:
+                # Don't send a document the rest of the window can't pay for; wait for the reset instead
+                size = min(size, max(1, budget.remaining // unit_cost))
+            batch, pending = pending[:size], pending[size:]
+            done, errors, cost = await self._send_update_batch(batch)
+            accepted.extend(done)
+            failed.extend(errors)
+            if cost:
+                unit_cost = max(1, cost // len(batch))
+        return accepted, failed
+
+    # --- Write-behind item edits (see writeback.py) ---
+
+    def queue_item_writes(self, session: Session, item: MondayItem, values: Dict[str, Any], company_id: Optional[int] = None):
+        """
+        Applies an edit to the local item and records it in the outbox for writeback.py to push.
+        An edit of a column that is still waiting replaces the queued value. Does NOT commit.
+        """
+        self.apply_local_column_values(session, item, values)
+        now = datetime.utcnow()
+        table = MondayPendingWrite.__table__
+        dialect = session.get_bind().dialect.name
+        for column_id, value in values.items():
+            row = {"item_id": item.id, "board_id": item.board_id, "company_id": company_id, "column_id": column_id,
+                   "value": value, "version": 1, "status": "pending", "attempts": 0,
+                   "next_attempt_at": now, "last_error": None, "created_at": now, "updated_at": now}
+            if dialect in ("postgresql", "sqlite"):
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert as dialect_insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+                stmt = dialect_insert(table).values(row)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.item_id, table.c.column_id],
+                    set_={
+                        "board_id": stmt.excluded.board_id,
+                        "company_id": stmt.excluded.company_id,
+                        "value": stmt.excluded.value,
+                        "version": table.c.version + 1,
+                        "status": "pending",
+                        "attempts": 0,
+                        "next_attempt_at": now,
+                        "last_error": None,
+                        "updated_at": now,
+                    }
+                )
+                session.exec(stmt)
+            else:
+                existing = session.exec(
+                    select(MondayPendingWrite)
+                    .where(MondayPendingWrite.item_id == item.id, MondayPendingWrite.column_id == column_id)
+                ).first()
+                if existing:
+                    existing.board_id, existing.company_id, existing.value = item.board_id, company_id, value
+                    existing.version += 1
+                    existing.status, existing.attempts, existing.next_attempt_at, existing.last_error = "pending", 0, now, None
+                    existing.updated_at = now
+                    session.add(existing)
+                else:
+                    session.add(MondayPendingWrite(**row))
+
+    async def push_pending_writes(self, session: Session, writes: List[MondayPendingWrite]) -> Dict[str, int]:
+        """
+        Pushes outbox rows to Monday, one mutation per item with all its queued columns.
+        Pushed rows are deleted unless a newer edit arrived meanwhile (it is pushed next round);
+        failed rows are retried with backoff and parked as 'failed' after WRITE_BEHIND_MAX_ATTEMPTS.
+        Commits.
+        """
+        # (id, version, attempts) now: the rows may be changed by new edits while we wait on Monday
+        by_item: Dict[int, Dict[str, Any]] = {}
+        for w in writes:
+            entry = by_item.setdefault(w.item_id, {"board_id": w.board_id, "values": {}, "rows": []})
+            entry["values"][w.column_id] = w.value
+            entry["rows"].append((w.id, w.version, w.attempts or 0))
+        session.commit()  # Ends the read (and releases row locks on Postgres) before the API calls
+
+        accepted, failed = await self._push_column_updates(
+            [(item_id, e["board_id"], e["values"]) for item_id, e in by_item.items()]
+        )
+
+        stats = {"pushed": 0, "retrying": 0, "failed": 0}
+        for item_id, _, _ in accepted:
+            for row_id, version, _ in by_item[item_id]["rows"]:
+                session.exec(delete(MondayPendingWrite).where(MondayPendingWrite.id == row_id, MondayPendingWrite.version == version))
+            stats["pushed"] += 1
+        now = datetime.utcnow()
+        for item_id, error in failed:
+            for row_id, version, attempts in by_item[item_id]["rows"]:
+                attempts += 1
+                given_up = attempts >= self.WRITE_BEHIND_MAX_ATTEMPTS
+                delay = backoff_delay(attempts, base=2.0, cap=self.WRITE_BEHIND_MAX_DELAY_SECONDS)
+                session.exec(
+                    update(MondayPendingWrite)
+                    .where(MondayPendingWrite.id == row_id, MondayPendingWrite.version == version)
+                    .values(status="failed" if given_up else "pending", attempts=attempts,
+                            next_attempt_at=now + timedelta(seconds=delay), last_error=str(error)[:1000])
+                )
+            stats["failed" if attempts >= self.WRITE_BEHIND_MAX_ATTEMPTS else "retrying"] += 1
+            print(f"[WRITE_BEHIND] Item {item_id} not pushed (attempt {attempts}): {error}", flush=True)
+        session.commit()
+        return stats
+
+    def _overlay_pending_writes(self, session: Session, rows: List[Dict[str, Any]]):
+        """Keeps edits that are still in the outbox on items re-read from Monday, so a sync doesn't revert them."""
+        ids = [r["id"] for r in rows]
+        writes = session.exec(
+            select(MondayPendingWrite).where(col(MondayPendingWrite.item_id).in_(ids), MondayPendingWrite.status == "pending")
+        ).all()
+        if not writes:
+            return
+        by_item: Dict[int, Dict[str, Any]] = {}
+        for w in writes:
+            by_item.setdefault(w.item_id, {})[w.column_id] = w.value
+        for row in rows:
+            values = by_item.get(row["id"])
+            if values:
+                if "name" in values:
+                    row["name"] = str(values["name"])
+                row["column_values"] = self._patch_column_values(row["column_values"], values)
+
+    def pending_write_summary(self, session: Session, company_id: Optional[int]) -> Dict[str, Any]:
+        """Outbox counts for a company, plus the writes that gave up."""
+        counts = dict(session.exec(
+            select(MondayPendingWrite.status, func.count())
+            .where(MondayPendingWrite.company_id == company_id)
+            .group_by(MondayPendingWrite.status)
+        ).all())
+        failed = session.exec(
+            select(MondayPendingWrite)
+            .where(MondayPendingWrite.company_id == company_id, MondayPendingWrite.status == "failed")
+            .order_by(MondayPendingWrite.updated_at.desc())
+            .limit(100)
+        ).all()
+        return {
+            "pending": counts.get("pending", 0),
+            "failed": counts.get("failed", 0),
+            "failed_writes": [w.model_dump() for w in failed],
+        }
+
+    async def _send_update_batch(self, batch: List[tuple]):
+        """
+        One aliased mutation document for `batch` [(item_id, board_id, values)].
+        Returns (accepted, [(item_id, error)], learned document cost or None).
+        """
+        params, fields, variables = [], [], {}
+        for n, (item_id, board_id, values) in enumerate(batch):
+            params.append(f"$i{n}: ID!, $b{n}: ID!, $v{n}: JSON!")
+            fields.append(f"u{n}: change_multiple_column_values(item_id: $i{n}, board_id: $b{n}, column_values: $v{n}) {{ id }}")
+            variables.update({f"i{n}": item_id, f"b{n}": board_id, f"v{n}": json.dumps(values)})
+        query = f"mutation ({', '.join(params)}) {{ {' '.join(fields)} }}"
+
+        try:
+            data = await self.execute_query(query, variables)
+        except MondayAPIError as e:
+            if len(batch) == 1 or e.retryable:
+                # Out of retries (or a single bad update): the whole batch fails with this error
+                return [], [(item_id, str(e)) for item_id, _, _ in batch], None
+            mid = len(batch) // 2
+            left = await self._send_update_batch(batch[:mid])
+            right = await self._send_update_batch(batch[mid:])
+            return left[0] + right[0], left[1] + right[1], None
+
+        result = data.get("data") or {}
+        accepted, failed = [], []
+        for n, update in enumerate(batch):
+            if (result.get(f"u{n}") or {}).get("id"):
+                accepted.append(update)
+            else:
+                failed.append((update[0], "Monday returned no item (deleted or no access)"))
+        return accepted, failed, get_budget(self.api_key).learned_cost(with_complexity(query))
+
+    def recover_interrupted_jobs(self, session: Session) -> int:
+        """
+        Puts 'running' jobs whose lease expired (worker died or was restarted) back in the queue.
+        They keep their checkpoint, so the next run resumes after the last committed page.
+        Jobs that keep dying are failed after SYNC_MAX_ATTEMPTS claims.
+        Jobs with a live lease belong to another worker and are left alone.
+        """
+        now = datetime.utcnow()
+        jobs = session.exec(
+            select(MondaySyncJob)
+            .where(MondaySyncJob.status == "running")
+            # No lease: started by the old serial queue before an upgrade
+            .where(or_(MondaySyncJob.lease_expires_at == None, MondaySyncJob.lease_expires_at < now))
+        ).all()
+        for job in jobs:
+            job.lease_owner = None
+            job.lease_expires_at = None
+            if (job.attempts or 0) >= self.SYNC_MAX_ATTEMPTS:
+                job.status = "failed"
+                job.completed_at = now
+                job.progress_message = f"Failed: worker lost {job.attempts} times. Resume it to try again."
+            else:
+                job.status = "pending"
+                job.progress_message = f"Interrupted. Will resume after page {job.checkpoint_page}." if job.checkpoint_page else "Interrupted. Queued again."
+            session.add(job)
+        session.commit()
+        return len(jobs)
+
+    def resume_sync_job(self, session: Session, job_id: uuid.UUID) -> Optional[MondaySyncJob]:
+        """
+        Re-queues a failed job. It resumes from its checkpoint (or restarts if the cursor expired).
+        """
+        job = session.get(MondaySyncJob, job_id)
+        if not job or job.status not in ("failed",):
+            return None
+        job.status = "pending"
+        job.completed_at = None
+        job.attempts = 0
+        job.progress_message = f"Queued to resume after page {job.checkpoint_page}." if job.checkpoint_page else "Queued again."
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
     def reset_queue_jobs(self, session: Session):
         """
         Resets all Pending or Running jobs to Failed.
@@ -1187,13 +2558,285 @@ class MondayService:
         jobs = session.exec(select(MondaySyncJob).where(MondaySyncJob.status.in_(["pending", "running"]))).all()
         count = len(jobs)
         for job in jobs:
-            job.status = "failed"
+            job.status = "failed"  # A worker running it loses its lease and stops
             job.progress_message = "Manually cancelled/reset"
+            job.lease_owner = None
+            job.lease_expires_at = None
             job.completed_at = datetime.utcnow()
             session.add(job)
         session.commit()
         return count
 
+    # --- Scheduled syncs ---
+
+    def _next_sync_time(self, board: MondayBoard, now: datetime) -> datetime:
+        """Interval stretched by the board's backoff level, jittered so boards don't all fire together."""
+        level = min(board.sync_backoff_level or 0, self.SCHEDULE_MAX_BACKOFF_LEVEL)
+        minutes = board.sync_interval_minutes * (2 ** level)
+        minutes *= 1 + random.uniform(-self.SCHEDULE_JITTER, self.SCHEDULE_JITTER)
+        return now + timedelta(minutes=minutes)
+
+    def set_board_schedule(self, session: Session, board_id: int, interval_minutes: Optional[int]) -> Optional[MondayBoard]:
+        """
+        Sets (or clears, with None/0) a board's sync cadence. The first run lands at a random
+        point within one interval, so boards scheduled together don't sync together.
+        """
+        board = session.get(MondayBoard, board_id)
+        if not board:
+            return None
+        if interval_minutes:
+            board.sync_interval_minutes = max(int(interval_minutes), self.SCHEDULE_MIN_INTERVAL_MINUTES)
+            board.sync_backoff_level = 0
+            board.next_sync_at = datetime.utcnow() + timedelta(minutes=random.uniform(0, board.sync_interval_minutes))
+        else:
+            board.sync_interval_minutes = None
+            board.next_sync_at = None
+            board.sync_backoff_level = 0
+        session.add(board)
+        session.commit()
+        session.refresh(board)
+        return board
+
+    def enqueue_due_syncs(self, session: Session, now: datetime = None) -> List[MondaySyncJob]:
+        """
+        Queues an incremental sync for every board whose next_sync_at has passed.
+        Boards that already have a pending or running job are skipped (their time just moves on).
+        Safe with several schedulers running: a board's slot is taken with a compare-and-set
+        on next_sync_at, so only one of them queues it.
+        Scheduled jobs reuse the settings and company of the board's last job.
+        """
+        now = now or datetime.utcnow()
+        boards = session.exec(
+            select(MondayBoard)
+            .where(MondayBoard.sync_interval_minutes > 0)
+            .where(MondayBoard.next_sync_at <= now)
+        ).all()
+        if not boards:
+            return []
+
+        busy = set(session.exec(
+            select(MondaySyncJob.board_id)
+            .where(col(MondaySyncJob.board_id).in_([b.id for b in boards]))
+            .where(col(MondaySyncJob.status).in_(["pending", "running"]))
+        ).all())
+
+        jobs = []
+        for board in boards:
+            # Provisional next run; rescheduled from the job's outcome when it completes
+            taken = session.exec(
+                update(MondayBoard)
+                .where(MondayBoard.id == board.id, MondayBoard.next_sync_at == board.next_sync_at)
+                .values(next_sync_at=self._next_sync_time(board, now))
+            )
+            if taken.rowcount != 1:
+                session.rollback()
+                continue
+            if board.id in busy:
+                session.commit()
+                print(f"[SCHEDULER] Board {board.id} already has a queued job. Skipping this run.")
+                continue
+
+            last_job = session.exec(
+                select(MondaySyncJob).where(MondaySyncJob.board_id == board.id).order_by(MondaySyncJob.created_at.desc())
+            ).first()
+            params = dict((last_job.stats or {}).get("params") or {}) if last_job else {}
+            params.update(incremental=True, force_sync_images=False, filtered_item_ids=None)
+            job = MondaySyncJob(
+                board_id=board.id,
+                company_id=last_job.company_id if last_job else None,
+                status="pending",
+                stats={"params": params, "trigger": "schedule"},
+                progress_message="Queued (scheduled)...",
+            )
+            session.add(job)
+            session.commit()
+            jobs.append(job)
+        if jobs:
+            print(f"[SCHEDULER] Queued scheduled sync for board(s) {[j.board_id for j in jobs]}")
+        return jobs
+
+    def record_sync_outcome(self, session: Session, job: MondaySyncJob):
+        """
+        Reschedules a board with a cadence after a completed job: a sync that changed nothing
+        (no item re-stamped, nothing deleted) raises the backoff level, any change resets it.
+        """
+        board = session.get(MondayBoard, job.board_id)
+        if not board or not board.sync_interval_minutes:
+            return
+        since = job.started_at or job.created_at
+        changed = session.exec(
+            select(func.count()).select_from(MondayItem)
+            .where(MondayItem.board_id == job.board_id, MondayItem.updated_at >= since)
+        ).one() or session.exec(
+            select(func.count()).select_from(MondayItemTombstone)
+            .where(MondayItemTombstone.board_id == job.board_id, MondayItemTombstone.deleted_at >= since)
+        ).one()
+        if changed:
+            board.sync_backoff_level = 0
+        else:
+            board.sync_backoff_level = min((board.sync_backoff_level or 0) + 1, self.SCHEDULE_MAX_BACKOFF_LEVEL)
+        board.next_sync_at = self._next_sync_time(board, datetime.utcnow())
+        session.add(board)
+        session.commit()
+
+    # --- Webhook events ---
+
+    def record_webhook_event(self, session: Session, event: Dict[str, Any]) -> Optional[MondayWebhookEvent]:
+        """
+        Stores one webhook event in the inbox and commits. Returns None for events without a
+        board and for redeliveries (same triggerUuid) of an event already stored.
+        """
+        board_id = event.get("boardId")
+        if not board_id:
+            return None
+        trigger_uuid = event.get("triggerUuid")
+        if trigger_uuid and session.exec(select(MondayWebhookEvent.id).where(MondayWebhookEvent.trigger_uuid == trigger_uuid)).first():
+            return None
+        item_id = event.get("pulseId") or event.get("itemId")
+        row = MondayWebhookEvent(
+            trigger_uuid=trigger_uuid,
+            event_type=str(event.get("type") or "unknown"),
+            board_id=int(board_id),
+            item_id=int(item_id) if item_id else None,
+            payload=event,
+        )
+        session.add(row)
+        try:
+            session.commit()
+        except IntegrityError:
+            # Same triggerUuid stored concurrently
+            session.rollback()
+            return None
+        return row
+
+    async def get_items_by_ids(self, item_ids: List[int]) -> List[Dict[str, Any]]:
+        """Fetches items by ID (100 per request) with the same fields as a board sync, plus their board and state."""
+        query = """
+        query items_by_ids($ids: [ID!], $limit: Int!) {
+            items (ids: $ids, limit: $limit) {
+                id
+                name
+                state
+                board { id }
+                column_values {
+                    id
+                    text
+                    value
+                    type
+                }
+                assets {
+                    id
+                    name
+                    url
+                    public_url
+                    file_extension
+                }
+            }
+        }
+        """
+        items = []
+        for chunk in self._chunks([str(i) for i in item_ids], 100):
+            data = await self.execute_query(query, {"ids": chunk, "limit": len(chunk)})
+            items.extend(data.get("data", {}).get("items") or [])
+        return items
+
+    async def apply_webhook_events(self, session: Session, events: List[MondayWebhookEvent]) -> Dict[str, int]:
+        """
+        Applies a batch of inbox events and marks them processed, in one transaction.
+        Several events for one item collapse into one re-fetch (one request per 100 items): items
+        Monday returns are upserted like a sync page would be, items it no longer returns (or
+        returns archived/deleted) are deleted locally. Delete events are not trusted on their own,
+        so a forged event can at most trigger a refresh. Events of boards never synced are skipped.
+        New assets are not downloaded here; the next sync picks them up.
+        On an API error nothing is applied and the events stay in the inbox for a retry.
+        """
+        now = datetime.utcnow()
+        local_boards = set(session.exec(
+            select(MondayBoard.id).where(col(MondayBoard.id).in_(list({e.board_id for e in events})))
+        ).all())
+
+        touched: Dict[int, int] = {}  # item_id -> board_id of its last event
+        for event in sorted(events, key=lambda e: e.id):
+            if event.board_id not in local_boards or not event.item_id:
+                continue
+            if event.event_type in self.WEBHOOK_DELETE_EVENTS or event.event_type in self.WEBHOOK_REFRESH_EVENTS:
+                touched[event.item_id] = event.board_id
+
+        refresh_ids = list(touched)
+        delete_ids: Dict[int, int] = {}
+
+        try:
+            fetched = await self.get_items_by_ids(refresh_ids) if refresh_ids else []
+        except Exception as e:
+            session.rollback()
+            for event in events:
+                event.attempts = (event.attempts or 0) + 1
+                event.error = str(e)[:500]
+                if event.attempts >= self.WEBHOOK_MAX_ATTEMPTS:
+                    event.processed_at = now
+                session.add(event)
+            session.commit()
+            raise
+
+        # Items Monday no longer returns (or returns archived/deleted) are gone
+        fetched = [item for item in fetched if (item.get("state") or "active") == "active"]
+        returned = {int(item["id"]) for item in fetched}
+        for item_id in refresh_ids:
+            if item_id not in returned:
+                delete_ids[item_id] = touched[item_id]
+
+        existing = self._load_existing_assets(session, list(returned))
+        rows = []
+        for item in fetched:
+            item_id = int(item["id"])
+            board_id = int((item.get("board") or {}).get("id") or touched[item_id])
+            old_assets = existing.get(item_id) or {}
+            assets_map = {}
+            for asset in item.get("assets") or []:
+                assets_map[asset["id"]] = asset
+                for field in self.LOCAL_ASSET_FIELDS:
+                    if field in (old_assets.get(asset["id"]) or {}):
+                        asset[field] = old_assets[asset["id"]][field]
+            rows.append({
+                "id": item_id,
+                "board_id": board_id,
+                "name": item["name"],
+                "column_values": self._parse_column_values(item),
+                "assets": assets_map,
+            })
+
+        added, updated = self._bulk_upsert_items(session, rows, existing_ids=set(existing)) if rows else (0, 0)
+
+        deleted = 0
+        by_board: Dict[int, List[int]] = {}
+        for item_id, board_id in delete_ids.items():
+            by_board.setdefault(board_id, []).append(item_id)
+        for board_id, item_ids in by_board.items():
+            for chunk in self._chunks(item_ids, 500):
+                result = session.exec(delete(MondayItem).where(col(MondayItem.id).in_(chunk)))
+                deleted += result.rowcount or 0
+                self._delete_item_indexes(session, item_ids=chunk)
+                self._write_tombstones(session, board_id, chunk)
+                self._drop_asset_refs(session, item_ids=chunk)
+
+        for event in events:
+            event.processed_at = now
+            event.attempts = (event.attempts or 0) + 1
+            event.error = None if event.board_id in local_boards else "Board not synced locally"
+            session.add(event)
+        session.commit()
+        if delete_ids:
+            self.collect_asset_garbage(session)
+        return {"events": len(events), "added": added, "updated": updated, "deleted": deleted}
+
+    def board_company_id(self, session: Session, board_id: int) -> Optional[int]:
+        """Company whose API key serves background work on a board: the one behind its last sync job."""
+        return session.exec(
+            select(MondaySyncJob.company_id)
+            .where(MondaySyncJob.board_id == board_id, MondaySyncJob.company_id != None)
+            .order_by(MondaySyncJob.created_at.desc())
+        ).first()
+
     async def get_board_columns(self, session: Session, board_id: int) -> List[Dict[str, Any]]:
         """
         Fetches board column configuration from local DB (cached) or Monday.com API.
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical work: while a call for `key` is running, further callers
+    with the same key wait for it and get the same result (or exception) instead of starting
+    their own. Nothing is cached once the call finishes.
+
+    The work runs in its own task, so a caller that disconnects (cancelled) does not cancel it
+    for the others that are still waiting.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, list] = {}  # key -> [future, callers that joined]
+        self.stats = {"calls": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], share: Optional[Callable[[Any], Any]] = None) -> Any:
+        """
+        Runs fn() unless an identical call is in flight. If callers joined, each of them (and the
+        one that started the call) gets `share(result)` (e.g. copy.deepcopy) so they cannot
+        mutate each other's data.
+        """
+        self.stats["calls"] += 1
+        entry = self._calls.get(key)
+        if entry is not None and entry[0].get_loop() is asyncio.get_running_loop():
+            self.stats["shared"] += 1
+            entry[1] += 1
+            result = await asyncio.shield(entry[0])
+            return share(result) if share else result
+
+        entry = [asyncio.ensure_future(fn()), 0]
+        self._calls[key] = entry
+
+        def _forget(done: asyncio.Future):
+            if self._calls.get(key) is entry:
+                del self._calls[key]
+            if not done.cancelled():
+                done.exception()  # mark retrieved: nobody may be left waiting
+
+        entry[0].add_done_callback(_forget)
+        result = await asyncio.shield(entry[0])
+        return share(result) if share and entry[1] else result
+
+
+# Shared per process. Keys must include everything that makes results differ (e.g. the API key).
+proxy_flights = SingleFlight("proxy")
+query_flights = SingleFlight("query")
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import os
+import random
+import re
+import time
+from typing import Any, Dict, Optional
+
+
+class MondayAPIError(Exception):
+    """
+    Raised by MondayService.execute_query.
+    Subclasses Exception so existing `except Exception` callers keep working.
+    """
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+# Monday reports budget problems either as HTTP 429 or as GraphQL errors on a 200.
+_RETRYABLE_ERROR_MARKERS = (
+    "complexity",          # ComplexityException / "Complexity budget exhausted"
+    "rate limit",          # "Rate Limit Exceeded"
+    "ratelimit",
+    "maxconcurrency",      # maxConcurrencyExceeded
+    "internal server error",
+)
+_RESET_IN_RE = re.compile(r"reset in (\d+) seconds", re.IGNORECASE)
+
+COMPLEXITY_FIELD = "complexity { before after reset_in_x_seconds }"
+
+
+def with_complexity(query: str) -> str:
+    """Adds the complexity field to the top-level selection so every response reports the budget."""
+    if "complexity" in query or "{" not in query:
+        return query
+    return query.replace("{", "{ " + COMPLEXITY_FIELD + " ", 1)
+
+
+def parse_retry_hint(message: str) -> Optional[float]:
+    """Extracts 'reset in N seconds' from a Monday error message."""
+    match = _RESET_IN_RE.search(message or "")
+    return float(match.group(1)) if match else None
+
+
+def is_retryable_error(message: str) -> bool:
+    msg = (message or "").lower()
+    return any(marker in msg for marker in _RETRYABLE_ERROR_MARKERS)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(base / 2, min(cap, base * (2 ** attempt)))
+
+
+class ComplexityBudget:
+    """
+    Process-wide view of one Monday account's complexity budget.
+    Every MondayService using the same API key shares one instance, so concurrent
+    syncs are paced together instead of each one hitting the limit on its own.
+    """
+    DEFAULT_QUERY_COST = int(os.getenv("MONDAY_DEFAULT_QUERY_COST", "10000"))
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.remaining: Optional[int] = None  # Unknown until the first response
+        self.reset_at: float = 0.0
+        self._costs: Dict[str, int] = {}  # Learned cost per query shape
+
+    @staticmethod
+    def _shape(query: str) -> str:
+        return hashlib.sha1(query.encode("utf-8")).hexdigest()
+
+    def estimate(self, query: str) -> int:
+        return self._costs.get(self._shape(query), self.DEFAULT_QUERY_COST)
+
+    def learned_cost(self, query: str) -> Optional[int]:
+        """Cost of the last run of this query shape, or None if it has not run yet."""
+        return self._costs.get(self._shape(query))
+
+    async def acquire(self, query: str):
+        """Waits until the budget can cover this query, then reserves its estimated cost."""
+        cost = self.estimate(query)
+        async with self._lock:
+            while self.remaining is not None and self.remaining < cost:
+                wait = self.reset_at - time.monotonic()
+                if wait <= 0:
+                    # Window rolled over; the next response will tell us the real figure
+                    self.remaining = None
+                    break
+                print(f"[MONDAY_THROTTLE] Budget low ({self.remaining} < {cost}). Waiting {wait:.1f}s for reset.", flush=True)
+                await asyncio.sleep(min(wait, 60.0))
+            if self.remaining is not None:
+                self.remaining -= cost
+
+    def record(self, query: str, complexity: Optional[Dict[str, Any]]):
+        """Updates the budget from a response's `complexity { before after reset_in_x_seconds }`."""
+        if not complexity:
+            return
+        before, after = complexity.get("before"), complexity.get("after")
+        reset_in = complexity.get("reset_in_x_seconds")
+        if before is not None and after is not None:
+            self._costs[self._shape(query)] = max(int(before) - int(after), 1)
+            self.remaining = int(after)
+        if reset_in is not None:
+            self.reset_at = time.monotonic() + float(reset_in)
+
+    def exhaust(self, reset_in: Optional[float]):
+        """Marks the budget as spent after a complexity error."""
+        self.remaining = 0
+        self.reset_at = time.monotonic() + (reset_in if reset_in is not None else 60.0)
+
+
+_budgets: Dict[str, ComplexityBudget] = {}
+
+
+def get_budget(api_key: Optional[str]) -> ComplexityBudget:
+    key = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+    budget = _budgets.get(key)
+    if budget is None:
+        budget = _budgets[key] = ComplexityBudget()
+    return budget
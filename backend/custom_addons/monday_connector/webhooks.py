@@ -0,0 +1,109 @@
+import asyncio
+import os
+from typing import Dict, Optional
+
+from sqlmodel import Session, select
+
+from app.database import engine
+from .models import MondayWebhookEvent
+from .services import MondayService
+
+# Webhook inbox consumer. POST /webhooks stores each event (MondayWebhookEvent) and wakes this
+# loop, which waits BATCH_WINDOW_SECONDS for more events to arrive and then applies everything
+# pending in batches of BATCH_SIZE (MondayService.apply_webhook_events). Events that arrive
+# while the app is down are applied on the next start. Started by the addon's on_startup hook.
+ENABLED = os.getenv("MONDAY_WEBHOOKS_ENABLED", "true").lower() == "true"
+# Shared secret: Monday must call .../webhooks?token=<secret> (or send a JWT signed with it).
+# Required: without it the receiver only answers the challenge handshake and refuses events.
+SECRET = os.getenv("MONDAY_WEBHOOK_SECRET", "")
+BATCH_SIZE = int(os.getenv("MONDAY_WEBHOOK_BATCH_SIZE", "200"))
+BATCH_WINDOW_SECONDS = float(os.getenv("MONDAY_WEBHOOK_BATCH_WINDOW_SECONDS", "0.5"))
+POLL_SECONDS = 30.0
+
+_task: Optional[asyncio.Task] = None
+_wake: Optional[asyncio.Event] = None
+
+
+def notify():
+    """Called by the receiver after storing an event."""
+    if _wake is not None:
+        _wake.set()
+
+
+async def consume_once() -> int:
+    """
+    Applies one batch of pending events, oldest first. Returns the number of events applied.
+    On Postgres the batch is locked with SKIP LOCKED, so several consumers split the inbox
+    (re-applying an event is harmless: items are re-fetched, not patched).
+    """
+    with Session(engine) as session:
+        stmt = (
+            select(MondayWebhookEvent)
+            .where(MondayWebhookEvent.processed_at == None)
+            .order_by(MondayWebhookEvent.id)
+            .limit(BATCH_SIZE)
+        )
+        if engine.dialect.name == "postgresql":
+            stmt = stmt.with_for_update(skip_locked=True)
+        events = session.exec(stmt).all()
+        if not events:
+            return 0
+
+        # One service (API key) per company owning the boards in the batch
+        services: Dict[Optional[int], MondayService] = {}
+        by_company: Dict[Optional[int], list] = {}
+        resolver = MondayService(api_key=None)
+        company_of: Dict[int, Optional[int]] = {}
+        for event in events:
+            if event.board_id not in company_of:
+                company_of[event.board_id] = resolver.board_company_id(session, event.board_id)
+            by_company.setdefault(company_of[event.board_id], []).append(event)
+        applied = 0
+        for company_id, company_events in by_company.items():
+            if company_id not in services:
+                services[company_id] = MondayService(api_key=MondayService.resolve_api_key(session, company_id))
+            try:
+                result = await services[company_id].apply_webhook_events(session, company_events)
+            except Exception as e:
+                # Events stay in the inbox (attempts counted) and are retried next round
+                print(f"[WEBHOOKS] {len(company_events)} event(s) failed: {e}", flush=True)
+                continue
+            applied += len(company_events)
+            print(f"[WEBHOOKS] Applied {result}", flush=True)
+        return applied
+
+
+async def _loop():
+    print("[WEBHOOKS] Consumer started", flush=True)
+    while True:
+        try:
+            while await consume_once() >= BATCH_SIZE:
+                pass  # Backlog: keep going without waiting
+        except Exception as e:
+            print(f"[WEBHOOKS] Consumer error: {e}", flush=True)
+        try:
+            await asyncio.wait_for(_wake.wait(), POLL_SECONDS)
+            # Let a burst of events (e.g. a bulk edit on Monday) land in the same batch
+            await asyncio.sleep(BATCH_WINDOW_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+
+def start_consumer():
+    global _task, _wake
+    if not ENABLED or (_task and not _task.done()):
+        return
+    _wake = asyncio.Event()
+    _task = asyncio.create_task(_loop())
+
+
+async def stop_consumer():
+    global _task, _wake
+    if _task and not _task.done():
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+    _task = _wake = None
@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import httpx
+from sqlmodel import Session, select, update, col
+from sqlalchemy.exc import IntegrityError
+
+from app.database import engine
+from .models import MondaySyncJob
+from .services import MondayService
+
+# Multi-worker sync job runner.
+# Jobs are claimed with a lease (lease_owner / lease_expires_at on MondaySyncJob) that the
+# owner renews by heartbeat while the job runs. A worker that dies stops heartbeating, and any
+# other worker puts the job back in the queue once the lease expires (it resumes from its
+# checkpoint). A partial unique index allows one running job per board, so boards are synced
+# one job at a time while up to MAX_CONCURRENT_BOARDS boards run in parallel per worker.
+#
+# In the web process, MondayService.process_queue drains the queue after a job is created.
+# Standalone (set MONDAY_SYNC_INLINE_WORKER=false on the web app to leave all jobs to these):
+#     python scripts/run_sync_worker.py --boards 4
+MAX_CONCURRENT_BOARDS = int(os.getenv("MONDAY_SYNC_MAX_BOARDS", "2"))
+POLL_SECONDS = float(os.getenv("MONDAY_SYNC_POLL_SECONDS", "5"))
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def claim_job(session: Session, worker_id: str, lease_seconds: int) -> Optional[uuid.UUID]:
+    """
+    Leases the oldest pending job of a board with no running job. Returns its id, or None.
+
+    Postgres: candidates are read with FOR UPDATE SKIP LOCKED, so concurrent workers pick
+    different rows without waiting on each other. SQLite has no row locks (writers are
+    serialized anyway); the UPDATE ... WHERE status = 'pending' below is the compare-and-set
+    that makes a claim exclusive there. On both, the unique running-per-board index rejects
+    a second job of a board that another worker claimed in the meantime.
+    """
+    running = select(MondaySyncJob.board_id).where(MondaySyncJob.status == "running")
+    candidates = (
+        select(MondaySyncJob.id)
+        .where(MondaySyncJob.status == "pending")
+        .where(col(MondaySyncJob.board_id).not_in(running))
+        .order_by(MondaySyncJob.created_at.asc())
+        .limit(10)
+    )
+    if engine.dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+
+    for job_id in session.exec(candidates).all():
+        now = datetime.utcnow()
+        try:
+            result = session.exec(
+                update(MondaySyncJob)
+                .where(MondaySyncJob.id == job_id, MondaySyncJob.status == "pending")
+                .values(
+                    status="running",
+                    lease_owner=worker_id,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    heartbeat_at=now,
+                    attempts=MondaySyncJob.attempts + 1,
+                    progress_message="Starting...",
+                )
+            )
+            # Commits the claim (and releases the other candidates' row locks on Postgres)
+            session.commit()
+        except IntegrityError:
+            # Another job of this board started first
+            session.rollback()
+            continue
+        if result.rowcount == 1:
+            return job_id
+    session.rollback()
+    return None
+
+
+def renew_lease(session: Session, job_id: uuid.UUID, worker_id: str, lease_seconds: int) -> bool:
+    """Extends the lease. False if this worker no longer owns the job (recovered, reset or finished)."""
+    now = datetime.utcnow()
+    result = session.exec(
+        update(MondaySyncJob)
+        .where(MondaySyncJob.id == job_id, MondaySyncJob.status == "running", MondaySyncJob.lease_owner == worker_id)
+        .values(lease_expires_at=now + timedelta(seconds=lease_seconds), heartbeat_at=now)
+    )
+    session.commit()
+    return result.rowcount == 1
+
+
+def release_job(session: Session, job_id: uuid.UUID, worker_id: str):
+    """
+    Drops the lease after a run. A job still 'running' here was interrupted (shutdown or
+    cancellation): it goes back to the queue with its checkpoint for the next worker.
+    """
+    session.exec(
+        update(MondaySyncJob)
+        .where(MondaySyncJob.id == job_id, MondaySyncJob.lease_owner == worker_id, MondaySyncJob.status == "running")
+        .values(status="pending", progress_message="Interrupted. Queued again.")
+    )
+    session.exec(
+        update(MondaySyncJob)
+        .where(MondaySyncJob.id == job_id, MondaySyncJob.lease_owner == worker_id)
+        .values(lease_owner=None, lease_expires_at=None)
+    )
+    session.commit()
+
+
+class SyncWorker:
+    """
+    Claims and runs sync jobs, up to `max_boards` at once (each on a different board).
+    Each job runs with the API key of the company that queued it; jobs without a company
+    use `default_api_key`, else the MONDAY_API_KEY env var.
+    """
+
+    def __init__(self, max_boards: int = None, worker_id: str = None, lease_seconds: int = None,
+                 default_api_key: str = None, http_client: Optional[httpx.AsyncClient] = None):
+        self.max_boards = max(1, max_boards or MAX_CONCURRENT_BOARDS)
+        self.worker_id = worker_id or new_worker_id()
+        self.lease_seconds = lease_seconds or MondayService.SYNC_LEASE_SECONDS
+        self.default_api_key = default_api_key
+        self.http_client = http_client
+        self._running: Dict[uuid.UUID, asyncio.Task] = {}
+
+    def _fill(self) -> int:
+        """Claims jobs until all slots are busy or nothing is claimable. Returns the number started."""
+        started = 0
+        with Session(engine) as session:
+            while len(self._running) < self.max_boards:
+                job_id = claim_job(session, self.worker_id, self.lease_seconds)
+                if job_id is None:
+                    break
+                job = session.get(MondaySyncJob, job_id)
+                self._running[job_id] = asyncio.create_task(self._run_job(job_id, job.company_id))
+                print(f"[SYNC_WORKER] {self.worker_id} claimed job {job_id} (board {job.board_id}, attempt {job.attempts})", flush=True)
+                started += 1
+        return started
+
+    async def _heartbeat(self, job_id: uuid.UUID, task: asyncio.Task):
+        interval = max(1.0, self.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            with Session(engine) as session:
+                owned = renew_lease(session, job_id, self.worker_id, self.lease_seconds)
+            if not owned:
+                # Reset by an admin, or recovered after a stall: another worker may run it now
+                print(f"[SYNC_WORKER] Lost lease on job {job_id}. Stopping it.", flush=True)
+                task.cancel()
+                return
+
+    async def _run_job(self, job_id: uuid.UUID, company_id: Optional[int]):
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, asyncio.current_task()))
+        try:
+            with Session(engine) as session:
+                api_key = MondayService.resolve_api_key(session, company_id) if company_id else None
+                service = MondayService(api_key=api_key or self.default_api_key or os.getenv("MONDAY_API_KEY"),
+                                        http_client=self.http_client)
+                await service._execute_sync_job(session, job_id)
+        except asyncio.CancelledError:
+            print(f"[SYNC_WORKER] Job {job_id} cancelled", flush=True)
+        except Exception as e:
+            print(f"[SYNC_WORKER] Job {job_id} crashed: {e}", flush=True)
+        finally:
+            heartbeat.cancel()
+            with Session(engine) as session:
+                release_job(session, job_id, self.worker_id)
+            self._running.pop(job_id, None)
+
+    def recover_stale(self) -> int:
+        with Session(engine) as session:
+            recovered = MondayService(api_key="").recover_interrupted_jobs(session)
+        if recovered:
+            print(f"[SYNC_WORKER] Recovered {recovered} job(s) with expired leases", flush=True)
+        return recovered
+
+    async def drain(self):
+        """Runs jobs until the queue has nothing claimable and all started jobs finished."""
+        while True:
+            self._fill()
+            if not self._running:
+                return
+            await asyncio.wait(list(self._running.values()), return_when=asyncio.FIRST_COMPLETED)
+
+    async def run(self, stop: asyncio.Event):
+        """Polls the queue until `stop` is set, then lets running jobs go back to the queue."""
+        print(f"[SYNC_WORKER] {self.worker_id} started ({self.max_boards} boards, lease {self.lease_seconds}s)", flush=True)
+        last_recovery = 0.0
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            if loop.time() - last_recovery > self.lease_seconds / 2:
+                self.recover_stale()
+                last_recovery = loop.time()
+            self._fill()
+            waiters = [asyncio.ensure_future(stop.wait()), *self._running.values()]
+            await asyncio.wait(waiters, timeout=POLL_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+            waiters[0].cancel()
+        await self.shutdown()
+
+    async def shutdown(self):
+        """Cancels running jobs; they are re-queued with their checkpoint (release_job)."""
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        print(f"[SYNC_WORKER] {self.worker_id} stopped", flush=True)
+
+
+async def _main(max_boards: int):
+    from app.core import http_client, image_pool
+
+    client = await http_client.init_http_client()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    try:
+        await SyncWorker(max_boards=max_boards, http_client=client).run(stop)
+    finally:
+        await http_client.close_http_client()
+        image_pool.shutdown_image_pool()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs Monday.com sync jobs from the queue")
+    parser.add_argument("--boards", type=int, default=MAX_CONCURRENT_BOARDS, help="boards synced in parallel")
+    args = parser.parse_args(argv)
+    asyncio.run(_main(args.boards))
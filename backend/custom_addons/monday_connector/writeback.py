@@ -0,0 +1,105 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlmodel import Session, select
+
+from app.database import engine
+from .models import MondayPendingWrite
+from .services import MondayService
+
+# Write-behind flusher. Item edits made in write-behind mode (MondayService.WRITE_BEHIND or
+# ?write_behind=true) are committed locally and queued in MondayPendingWrite, one row per
+# item/column, so repeated edits collapse into the latest value. This loop waits
+# FLUSH_WINDOW_SECONDS after an edit for more to arrive, then pushes everything due in
+# batches of BATCH_SIZE (MondayService.push_pending_writes). Started by the addon's on_startup hook.
+ENABLED = os.getenv("MONDAY_WRITEBACK_ENABLED", "true").lower() == "true"
+BATCH_SIZE = int(os.getenv("MONDAY_WRITEBACK_BATCH_SIZE", "200"))
+FLUSH_WINDOW_SECONDS = float(os.getenv("MONDAY_WRITEBACK_FLUSH_WINDOW_SECONDS", "1.0"))
+POLL_SECONDS = 5.0  # Picks up retries whose backoff ran out
+
+_task: Optional[asyncio.Task] = None
+_wake: Optional[asyncio.Event] = None
+
+
+def notify():
+    """Called after an edit is queued."""
+    if _wake is not None:
+        _wake.set()
+
+
+async def flush_once() -> int:
+    """
+    Pushes one batch of due writes, oldest first. Returns the number of rows handled.
+    On Postgres the batch is locked with SKIP LOCKED while it is read, so several flushers
+    don't pick the same rows.
+    """
+    with Session(engine) as session:
+        stmt = (
+            select(MondayPendingWrite)
+            .where(MondayPendingWrite.status == "pending")
+            .where(MondayPendingWrite.next_attempt_at <= datetime.utcnow())
+            .order_by(MondayPendingWrite.next_attempt_at)
+            .limit(BATCH_SIZE)
+        )
+        if engine.dialect.name == "postgresql":
+            stmt = stmt.with_for_update(skip_locked=True)
+        writes = session.exec(stmt).all()
+        if not writes:
+            return 0
+
+        # One service (API key) per company that made the edits
+        by_company: Dict[Optional[int], list] = {}
+        for w in writes:
+            by_company.setdefault(w.company_id, []).append(w)
+        handled = 0
+        for company_id, company_writes in by_company.items():
+            service = MondayService(api_key=MondayService.resolve_api_key(session, company_id))
+            try:
+                result = await service.push_pending_writes(session, company_writes)
+            except Exception as e:
+                # Rows stay queued and are taken again next round
+                session.rollback()
+                print(f"[WRITE_BEHIND] {len(company_writes)} write(s) failed: {e}", flush=True)
+                continue
+            handled += len(company_writes)
+            print(f"[WRITE_BEHIND] Flushed {result}", flush=True)
+        return handled
+
+
+async def _loop():
+    print("[WRITE_BEHIND] Flusher started", flush=True)
+    while True:
+        try:
+            while await flush_once() >= BATCH_SIZE:
+                pass  # Backlog: keep going without waiting
+        except Exception as e:
+            print(f"[WRITE_BEHIND] Flusher error: {e}", flush=True)
+        try:
+            await asyncio.wait_for(_wake.wait(), POLL_SECONDS)
+            # Let a burst of edits (a scanner session) collapse into one push
+            await asyncio.sleep(FLUSH_WINDOW_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+
+def start_flusher():
+    global _task, _wake
+    if not ENABLED or (_task and not _task.done()):
+        return
+    _wake = asyncio.Event()
+    _task = asyncio.create_task(_loop())
+
+
+async def stop_flusher():
+    """Stops the loop. Writes still queued are pushed by the next start."""
+    global _task, _wake
+    if _task and not _task.done():
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+    _task = _wake = None
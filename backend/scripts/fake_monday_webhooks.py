@@ -0,0 +1,117 @@
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+# Sends Monday-style webhook events to the local receiver, for testing the webhook inbox
+# without a real Monday account. Payloads follow Monday's format ({"event": {...}}).
+#
+#   python scripts/fake_monday_webhooks.py --challenge
+#   python scripts/fake_monday_webhooks.py --board 123 --items 1-50 --count 200 --rate 50
+#
+# The consumer re-fetches every item an event names: items that exist on Monday are updated
+# locally, items Monday no longer returns are deleted locally (whatever the event type).
+
+DEFAULT_URL = "http://127.0.0.1:8000/api/v1/integrations/monday/webhooks"
+
+
+def make_event(kind: str, board_id: int, item_id: int, column_id: str = "text", value: str = None) -> dict:
+    """One Monday webhook payload. kind: update | create | delete | rename."""
+    event = {
+        "app": "monday",
+        "boardId": board_id,
+        "pulseId": item_id,
+        "triggerTime": datetime.now(timezone.utc).isoformat(),
+        "subscriptionId": 1,
+        "userId": 1,
+        "originalTriggerUuid": None,
+        "triggerUuid": uuid.uuid4().hex,
+    }
+    if kind == "update":
+        value = value if value is not None else f"value-{random.randint(0, 99999)}"
+        event.update(type="update_column_value", groupId="topics", pulseName=f"Item {item_id}",
+                     columnId=column_id, columnType="text", columnTitle=column_id,
+                     value={"value": value}, previousValue=None, changedAt=time.time(), isTopGroup=True)
+    elif kind == "create":
+        event.update(type="create_pulse", pulseName=f"Item {item_id}", groupId="topics", groupName="Group", columnValues={})
+    elif kind == "rename":
+        event.update(type="update_name", pulseName=f"Item {item_id} (renamed)", groupId="topics")
+    elif kind == "delete":
+        event.pop("pulseId")
+        event.update(type="delete_pulse", itemId=item_id, itemName=f"Item {item_id}")
+    else:
+        raise ValueError(f"Unknown event kind: {kind}")
+    return {"event": event}
+
+
+def parse_items(spec: str) -> list:
+    """'1-50' or '1,2,7' or '1-10,20'."""
+    ids = []
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            ids.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            ids.append(int(part))
+    return ids
+
+
+def parse_mix(spec: str) -> list:
+    """'update:8,create:1,delete:1' -> weighted list of kinds."""
+    kinds = []
+    for part in spec.split(","):
+        kind, _, weight = part.partition(":")
+        kinds.extend([kind.strip()] * int(weight or 1))
+    return kinds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sends fake Monday webhook events")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--token", default=None, help="MONDAY_WEBHOOK_SECRET of the receiver")
+    parser.add_argument("--challenge", action="store_true", help="only send the creation handshake")
+    parser.add_argument("--board", type=int, help="board ID")
+    parser.add_argument("--items", default="1-10", help="item IDs, e.g. 1-50 or 3,5,8")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=10.0, help="events per second (0 = as fast as possible)")
+    parser.add_argument("--mix", default="update:8,create:1,delete:1")
+    parser.add_argument("--duplicates", type=float, default=0.0, help="share of events sent twice (redeliveries)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    params = {"token": args.token} if args.token else {}
+    with httpx.Client(timeout=10.0) as client:
+        if args.challenge:
+            challenge = uuid.uuid4().hex
+            r = client.post(args.url, params=params, json={"challenge": challenge})
+            ok = r.status_code == 200 and r.json().get("challenge") == challenge
+            print(f"Challenge: {r.status_code} {r.text} -> {'OK' if ok else 'MISMATCH'}")
+            return
+
+        if not args.board:
+            parser.error("--board is required")
+        rng = random.Random(args.seed)
+        random.seed(args.seed)
+        items = parse_items(args.items)
+        kinds = parse_mix(args.mix)
+        counts = {}
+        for _ in range(args.count):
+            kind = rng.choice(kinds)
+            payload = make_event(kind, args.board, rng.choice(items))
+            sends = 2 if rng.random() < args.duplicates else 1
+            for _ in range(sends):
+                r = client.post(args.url, params=params, json=payload)
+                status = r.json().get("status") if r.status_code == 200 else r.status_code
+                counts[(kind, status)] = counts.get((kind, status), 0) + 1
+            if args.rate:
+                time.sleep(1 / args.rate)
+        for (kind, status), n in sorted(counts.items(), key=str):
+            print(f"{kind:>7} {status}: {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import sys
+import os
+
+# Add backend directory to sys.path
+sys.path.append(os.getcwd())
+
+# App models first: the connector's relationships and its import-time migration need them
+from app.models.user import User
+from app.models.company import Company
+from app.models.org_structure import *
+from app.models.rbac import *
+from app.models.marketplace import MarketplaceApp, InstalledApp
+from addons.employees.models import Employee
+from custom_addons.monday_connector.worker import main
+
+if __name__ == "__main__":
+    # Run from backend/: python scripts/run_sync_worker.py --boards 4
+    main()
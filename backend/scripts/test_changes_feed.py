@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+
+# Add backend directory to sys.path
+sys.path.append(os.getcwd())
+
+# App models first: the connector's relationships and its import-time migration need them
+from app.models.user import User
+from app.models.company import Company
+from app.models.org_structure import *
+from app.models.rbac import *
+from app.models.marketplace import MarketplaceApp, InstalledApp
+from addons.employees.models import Employee
+from sqlmodel import Session, delete
+from app.database import engine, create_db_and_tables
+from custom_addons.monday_connector.models import MondayBoard, MondayItem
+from custom_addons.monday_connector.services import MondayService
+
+# Checks the changes feed (GET /boards/{board_id}/changes) against the local DB:
+# an item deleted while a client is paging through a snapshot must show up in `deleted`
+# on the first delta pull after the snapshot.
+# Run from backend/: python scripts/test_changes_feed.py
+
+BOARD_ID = 990000001  # Scratch board, removed again at the end
+ITEM_IDS = list(range(BOARD_ID * 10, BOARD_ID * 10 + 6))
+
+
+def delete_item(service, session, item_id):
+    # What a sync prune or a webhook delete does
+    session.exec(delete(MondayItem).where(MondayItem.id == item_id))
+    service._delete_item_indexes(session, item_ids=[item_id])
+    service._write_tombstones(session, BOARD_ID, [item_id])
+    session.commit()
+
+
+def test_delete_during_snapshot():
+    service = MondayService(api_key=None)
+    service.CHANGES_SAFETY_LAG_SECONDS = 0
+    with Session(engine) as session:
+        service.delete_board(session, BOARD_ID)
+        session.add(MondayBoard(id=BOARD_ID, name="Changes feed test"))
+        for item_id in ITEM_IDS:
+            session.add(MondayItem(id=item_id, board_id=BOARD_ID, name=f"Item {item_id}"))
+        session.commit()
+        time.sleep(0.01)
+
+        try:
+            # Snapshot page 1
+            page = service.get_board_changes(session, BOARD_ID, limit=2)
+            sent = [item["id"] for item in page["items"]]
+            print(f"Snapshot page 1: {sent} has_more={page['has_more']} full_resync={page['full_resync']}")
+            assert page["full_resync"] and page["has_more"]
+
+            # One of the items the client already has goes away mid-snapshot
+            time.sleep(0.01)
+            deleted_id = int(sent[0])
+            delete_item(service, session, deleted_id)
+            print(f"Deleted item {deleted_id}")
+
+            # Rest of the snapshot
+            since = page["since"]
+            while page["has_more"]:
+                page = service.get_board_changes(session, BOARD_ID, since=since, limit=2)
+                since = page["since"]
+                print(f"Snapshot page: {[item['id'] for item in page['items']]} deleted={page['deleted']}")
+
+            # First delta pull
+            page = service.get_board_changes(session, BOARD_ID, since=since, limit=100)
+            print(f"Delta pull: {len(page['items'])} item(s), deleted={page['deleted']}")
+            assert str(deleted_id) in page["deleted"], "Delete made during the snapshot was not reported"
+
+            # And only once
+            page = service.get_board_changes(session, BOARD_ID, since=page["since"], limit=100)
+            assert not page["deleted"] and not page["items"]
+            print("SUCCESS: delete made during the snapshot reached the client")
+        finally:
+            service.delete_board(session, BOARD_ID)
+
+
+if __name__ == "__main__":
+    create_db_and_tables()
+    test_delete_during_snapshot()
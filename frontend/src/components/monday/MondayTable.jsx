@@ -56,7 +56,8 @@ const renderCell = (colVal, item, showImages, optimizeImages = false, isEditable
 
     // Image Handling (Unified with Card View)
     // Pass colVal.id to ensure we only get images for THIS column
-    const images = getItemImages(item, optimizeImages, colVal?.id);
+    // Avatars are 32px: ask for 2x for high-DPI screens
+    const images = getItemImages(item, optimizeImages, colVal?.id, 64);
     if (images.length > 0 && showImages) {
         return (
             <div className="flex -space-x-2 overflow-hidden hover:space-x-1 transition-all pl-2">
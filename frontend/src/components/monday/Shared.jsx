@@ -4,8 +4,15 @@ import { FiImage, FiRefreshCw, FiLoader } from 'react-icons/fi';
 import { useDebug } from '../../context/DebugContext';
 import api from '../../services/api';
 
+// Smallest entry of an asset's thumbnail ladder that is at least `width` px wide (null if none)
+export const pickThumbnail = (asset, width, format = 'webp') => {
+    const fits = (asset?.thumbnails || []).filter(t => t.format === format && t.width >= width);
+    return fits.length ? fits.reduce((a, b) => (b.width < a.width ? b : a)) : null;
+};
+
 // Helper to extract all images for an item
-export const getItemImages = (item, optimize = false, targetColumnId = null) => {
+// thumbnailWidth: display size in px; when set, optimized views use the smallest adequate thumbnail
+export const getItemImages = (item, optimize = false, targetColumnId = null, thumbnailWidth = null) => {
     const images = [];
     if (!item || !item.column_values) return images;
 
@@ -42,7 +49,11 @@ export const getItemImages = (item, optimize = false, targetColumnId = null) =>
                                         localOptimizedUrl = `${backendOrigin}${clean}`;
                                     }
 
-                                    if (optimize && localOptimizedUrl) {
+                                    const thumb = optimize && thumbnailWidth ? pickThumbnail(asset, thumbnailWidth) : null;
+                                    if (thumb) {
+                                        const clean = thumb.path.startsWith('/') ? thumb.path : `/${thumb.path}`;
+                                        localUrl = `${backendOrigin}${clean}`;
+                                    } else if (optimize && localOptimizedUrl) {
                                         localUrl = localOptimizedUrl;
                                     } else if (localOriginalUrl) {
                                         localUrl = localOriginalUrl;
@@ -62,8 +62,8 @@ class MondaySyncService {
                 abortController,
             });
 
-            // Poll for job status
-            const result = await this._pollJobStatus(jobId, onProgress, abortController.signal);
+            // Follow job progress (event stream, polling as fallback)
+            const result = await this._waitForJob(jobId, onProgress, abortController.signal);
 
             // Cleanup
             this.activeJobs.delete(jobId);
@@ -94,6 +94,88 @@ class MondaySyncService {
         }
     }
 
+    /**
+     * Wait for a job to finish: follow its event stream, fall back to polling if the stream
+     * can't be opened or drops before the job ends.
+     */
+    async _waitForJob(jobId, onProgress, signal) {
+        try {
+            const streamed = await this._streamJobStatus(jobId, onProgress, signal);
+            if (streamed) {
+                if (streamed.status === 'failed') {
+                    throw Object.assign(new Error(streamed.message || 'Sync failed'), { jobFailed: true });
+                }
+                return {
+                    success: true,
+                    message: streamed.message || 'Sync completed successfully',
+                    logs: streamed.logs,
+                };
+            }
+        } catch (error) {
+            if (error.jobFailed) throw error;
+            if (signal?.aborted) throw new Error('Sync cancelled by user');
+            console.warn('Job event stream unavailable, polling instead', error);
+        }
+        return this._pollJobStatus(jobId, onProgress, signal);
+    }
+
+    /**
+     * Read the job's Server-Sent Events (log / progress / end).
+     * Uses fetch rather than EventSource so the Authorization header can be sent.
+     * Returns { status, message, logs } once the job ends, or null if the stream closed early.
+     */
+    async _streamJobStatus(jobId, onProgress, signal) {
+        const token = localStorage.getItem('token');
+        const response = await fetch(`${api.defaults.baseURL}/integrations/monday/sync/jobs/${jobId}/events`, {
+            headers: {
+                Accept: 'text/event-stream',
+                ...(token ? { Authorization: `Bearer ${token}` } : {}),
+            },
+            signal,
+        });
+        if (!response.ok || !response.body) {
+            throw new Error(`Event stream failed with status ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const logs = [];
+        let state = { status: 'pending', message: '' };
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) return null;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                }
+                if (!data) continue; // keep-alive comment
+
+                const payload = JSON.parse(data);
+                if (event === 'log') logs.push(payload);
+                else if (event === 'progress' || event === 'end') state = payload;
+
+                if (onProgress) {
+                    onProgress({ status: state.status, message: state.message, logs: [...logs] });
+                }
+                if (event === 'end') {
+                    reader.cancel();
+                    return { status: state.status, message: state.message, logs };
+                }
+            }
+        }
+    }
+
     /**
      * Poll job status with retry logic
      */
@@ -926,6 +926,21 @@ const ItemDetailsDrawer = ({ item, onClose, showImages, optimizeImages, columnsM
 };
 
 // Component: Full Screen Image Gallery Modal
+// Rotation stores shared images as a new file, so the asset's paths can change
+const rotatedAssetPaths = (asset) => {
+    if (!asset) return {};
+    const paths = {};
+    if (asset.local_path !== undefined) {
+        paths.local_path = asset.local_path;
+        paths.local_url = asset.local_path;
+    }
+    if (asset.optimized_path !== undefined) {
+        paths.optimized_path = asset.optimized_path;
+        paths.optimized_url = asset.optimized_path;
+    }
+    return paths;
+};
+
 const ImageGalleryModal = ({ item, onClose, showImages, optimizeImages, columnsMap, onItemUpdate, onAssetUpdate, editableColumns, onNext, onPrev, hasNext, hasPrev, refreshKey, onRotationComplete, enterpriseSync, keepOriginals, onScan }) => {
     const [currentIndex, setCurrentIndex] = useState(item?.initialIndex || 0);
     const [viewOriginal, setViewOriginal] = useState(false); // Toggle between Optimized and Original
@@ -1467,6 +1482,7 @@ const ImageGalleryModal = ({ item, onClose, showImages, optimizeImages, columnsM
                 // Update local state: Reset rotation to 0, add timestamp to force reload
                 if (onAssetUpdate) {
                     onAssetUpdate(currentImage.itemId, currentImage.assetId || currentImage.id, {
+                        ...rotatedAssetPaths(res.data.asset),
                         rotation: 0,
                         _ts: timestamp // Helper to trigger cache bust in URL generation
                     });
@@ -1495,6 +1511,7 @@ const ImageGalleryModal = ({ item, onClose, showImages, optimizeImages, columnsM
                 const timestamp = Date.now();
                 if (onAssetUpdate) {
                     onAssetUpdate(currentImage.itemId, currentImage.assetId || currentImage.id, {
+                        ...rotatedAssetPaths(res.data.asset),
                         rotation: 0,
                         _ts: timestamp
                     });
@@ -2831,6 +2848,7 @@ const MondayAppView = () => {
     const [showSyncMenu, setShowSyncMenu] = useState(false);
     const [showBoardSelector, setShowBoardSelector] = useState(false); // Header Board Selector
     const [cursor, setCursor] = useState(null);
+    const fetchItemsRunRef = useRef(0); // Stops an older board's page loop after a board switch
     const [itemsLoading, setItemsLoading] = useState(false);
     const [refreshKey, setRefreshKey] = useState(0); // For cache busting
     const [searchParams, setSearchParams] = useSearchParams();
@@ -3591,20 +3609,30 @@ const MondayAppView = () => {
         // setBoardItems([]); // Optimization: Keep old items while loading to prevent flash
         setCursor(null);
 
+        const runId = ++fetchItemsRunRef.current;
+        const boardId = activeBoardId;
         try {
-            // Fetch from Local DB (via backend API)
-            // Backend now handles the "Fetch All" recursion internally during SYNC
-            // and returns all items from DB during GET.
-            const data = await marketplaceService.monday.getBoardItems(activeBoardId, null, 10000); // High limit for local DB
+            // Fetch from Local DB (via backend API). The endpoint returns pages of at most
+            // 10000 items with a cursor: keep reading until it is null so big boards load in full.
+            let data = await marketplaceService.monday.getBoardItems(boardId, null, 10000); // High limit for local DB
+            if (fetchItemsRunRef.current !== runId) return; // Board changed meanwhile
 
             // Debug Log
             console.log("DEBUG: fetchItems Raw Response", data);
 
-            const items = Array.isArray(data.items) ? data.items : [];
-            console.log(`DEBUG: Setting board items: ${items.length}`);
-
+            let items = Array.isArray(data.items) ? data.items : [];
             setBoardItems(items);
-            setCursor(null); // Local DB doesn't use cursor pagnation for now
+            setCursor(data.cursor || null);
+
+            while (data.cursor) {
+                data = await marketplaceService.monday.getBoardItems(boardId, data.cursor, 10000);
+                if (fetchItemsRunRef.current !== runId) return; // Board changed meanwhile
+                const page = Array.isArray(data.items) ? data.items : [];
+                items = [...items, ...page];
+                setBoardItems(items);
+                setCursor(data.cursor || null);
+            }
+            console.log(`DEBUG: Setting board items: ${items.length}`);
 
         } catch (error) {
             console.error("Fetch Error:", error);
@@ -3615,7 +3643,7 @@ const MondayAppView = () => {
             }
             toast.error('Error', 'Failed to fetch board items');
         } finally {
-            setItemsLoading(false);
+            if (fetchItemsRunRef.current === runId) setItemsLoading(false);
         }
     };
 
@@ -3625,7 +3653,7 @@ const MondayAppView = () => {
     }, [activeBoardId]);
 
     const handleLoadMore = async () => {
-        if (!activeBoardId || !cursor) return;
+        if (!activeBoardId || !cursor || itemsLoading) return; // fetchItems is still reading pages
 
         setItemsLoading(true);
         try {
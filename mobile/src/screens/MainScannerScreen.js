@@ -5,7 +5,7 @@ import { CameraView, useCameraPermissions } from 'expo-camera';
 import * as SecureStore from 'expo-secure-store';
 import { Search, LogOut, CheckCircle, RefreshCw, Filter, Database, CloudOff, CloudUpload, PieChart as ChartPie, Image as ImageIcon } from 'lucide-react-native';
 import api from '../services/api';
-import { initDB, saveItems, getItems, updateItemLocal, getUnsyncedItems, markAsSynced } from '../services/db';
+import { initDB, saveItems, getItems, updateItemLocal, getUnsyncedItems, markAsSynced, getChangesToken, setChangesToken, deleteItems, clearBoardItems } from '../services/db';
 import FilterModal from '../components/FilterModal';
 import SummaryModal from '../components/SummaryModal';
 
@@ -147,9 +147,24 @@ const MainScannerScreen = ({ onLogout }) => {
                 }
 
 
-                // B. PULL: Fetch from Server
-                console.log(`Fetching items from Server for board ${activeConfig.board_id}...`);
-                const itemsRes = await api.get(`/integrations/monday/boards/${activeConfig.board_id}/items?limit=1000`);
+                // B. PULL: Only what changed since the last pull (first pull is a full snapshot)
+                console.log(`Fetching changes from Server for board ${activeConfig.board_id}...`);
+                let changesToken = getChangesToken(activeConfig.board_id);
+                let changedCount = 0;
+                let hasMore = true;
+                while (hasMore) {
+                    const changesRes = await api.get(`/integrations/monday/boards/${activeConfig.board_id}/changes`, {
+                        params: changesToken ? { since: changesToken, limit: 1000 } : { limit: 1000 }
+                    });
+                    const changes = changesRes.data;
+                    if (changes.full_resync) clearBoardItems(activeConfig.board_id);
+                    saveItems(changes.items, activeConfig.board_id);
+                    deleteItems(changes.deleted);
+                    changedCount += changes.items.length + changes.deleted.length;
+                    changesToken = changes.since;
+                    setChangesToken(activeConfig.board_id, changesToken);
+                    hasMore = changes.has_more;
+                }
 
                 // Fetch Board Metadata for correct column titles
                 let boardColumns = [];
@@ -164,18 +179,11 @@ const MainScannerScreen = ({ onLogout }) => {
                     console.warn("Could not fetch board metadata for titles", e);
                 }
 
-                let serverItems = [];
-                if (itemsRes.data && Array.isArray(itemsRes.data.items)) {
-                    serverItems = itemsRes.data.items;
-                } else if (Array.isArray(itemsRes.data)) {
-                    serverItems = itemsRes.data;
-                }
+                const serverItems = getItems(activeConfig.board_id);
 
                 if (serverItems.length > 0) {
-                    console.log(`Synced ${serverItems.length} items from Server`);
+                    console.log(`Applied ${changedCount} changes from Server (${serverItems.length} items cached)`);
                     setItems(serverItems);
-                    // Save to Local DB
-                    saveItems(serverItems, activeConfig.board_id);
                     generateColumnsList(activeConfig, serverItems, boardColumns);
                 } else if (localData.length === 0) {
                     Alert.alert("No Items", "Connected to board, but no items were found.");
@@ -252,7 +260,7 @@ const MainScannerScreen = ({ onLogout }) => {
         if (!selectedItem) {
             // Scan to Find
             const searchColId = config?.search_column_id || 'name';
-            const foundItem = items.find(item => {
+            let foundItem = items.find(item => {
                 let colValuesMap = {};
                 if (Array.isArray(item.column_values)) {
                     item.column_values.forEach(cv => colValuesMap[cv.id] = cv.text || cv.value);
@@ -263,6 +271,17 @@ const MainScannerScreen = ({ onLogout }) => {
                 return String(textVal).trim() === String(data).trim();
             });
 
+            // Not in the local copy (not loaded yet / stale): ask the server's barcode index
+            if (!foundItem && config?.board_id) {
+                try {
+                    const lookupRes = await api.get(`/integrations/monday/boards/${config.board_id}/lookup`, { params: { code: data } });
+                    const serverItem = lookupRes.data?.items?.[0];
+                    if (serverItem) foundItem = items.find(i => String(i.id) === String(serverItem.id)) || serverItem;
+                } catch (e) {
+                    console.log("Server lookup failed (offline?)", e?.message);
+                }
+            }
+
             if (foundItem) {
                 setScanned(true);
                 Alert.alert("Item Found!", `Found: ${foundItem.name}\n\nSelect this item?`, [
@@ -15,6 +15,10 @@ export const initDB = () => {
                 is_synced INTEGER DEFAULT 1,
                 updated_at TEXT
             );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                board_id TEXT PRIMARY KEY,
+                changes_token TEXT
+            );
         `);
         console.log("Database initialized");
     } catch (e) {
@@ -114,3 +118,47 @@ export const updateItemLocal = (itemId, newItemData) => {
         console.error("Update Item Error:", e);
     }
 };
+
+// --- Delta sync (GET /boards/{id}/changes) ---
+
+export const getChangesToken = (boardId) => {
+    try {
+        const rows = db.getAllSync(`SELECT changes_token FROM sync_state WHERE board_id = ?`, [String(boardId)]);
+        return rows.length > 0 ? rows[0].changes_token : null;
+    } catch (e) {
+        console.error("Get Changes Token Error:", e);
+        return null;
+    }
+};
+
+export const setChangesToken = (boardId, token) => {
+    try {
+        db.runSync(
+            `INSERT OR REPLACE INTO sync_state (board_id, changes_token) VALUES (?, ?)`,
+            [String(boardId), token]
+        );
+    } catch (e) {
+        console.error("Set Changes Token Error:", e);
+    }
+};
+
+export const deleteItems = (itemIds) => {
+    if (!itemIds || itemIds.length === 0) return;
+    try {
+        db.withTransactionSync(() => {
+            // Dirty items are kept so their pending edits still get pushed
+            itemIds.forEach(id => db.runSync(`DELETE FROM items WHERE id = ? AND is_synced = 1`, [String(id)]));
+        });
+        console.log(`Deleted ${itemIds.length} items from Offline DB`);
+    } catch (e) {
+        console.error("Delete Items Error:", e);
+    }
+};
+
+export const clearBoardItems = (boardId) => {
+    try {
+        db.runSync(`DELETE FROM items WHERE board_id = ? AND is_synced = 1`, [String(boardId)]);
+    } catch (e) {
+        console.error("Clear Board Items Error:", e);
+    }
+};